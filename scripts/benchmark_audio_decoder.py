@@ -0,0 +1,96 @@
+"""Compare the FFmpeg subprocess and the in-process PyAV decoder.
+
+Opens N concurrent decoder sessions, as N websocket connections would, and
+streams the same WebM/Ogg file to each of them in MediaRecorder-sized
+messages. Reports the connect latency (start() until the first decoded PCM)
+and the CPU time per stream, children processes included.
+
+    python scripts/benchmark_audio_decoder.py sample.webm --streams 20 --speed 10
+"""
+
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+from whisperlivekit.ffmpeg_manager import FFmpegManager, FFmpegState
+from whisperlivekit.pyav_decoder import PyAVDecoderManager
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+DECODERS = {"ffmpeg": FFmpegManager, "pyav": PyAVDecoderManager}
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+async def session(manager_cls, messages, interval):
+    manager = manager_cls(sample_rate=SAMPLE_RATE, channels=1)
+    start = time.perf_counter()
+    await manager.start()
+    first_pcm = None
+    decoded = 0
+
+    async def reader():
+        nonlocal first_pcm, decoded
+        while True:
+            chunk = await manager.read_data(4096)
+            if not chunk:
+                if await manager.get_state() != FFmpegState.RUNNING:
+                    return
+                await asyncio.sleep(0.005)
+                continue
+            if first_pcm is None:
+                first_pcm = time.perf_counter() - start
+            decoded += len(chunk)
+
+    read_task = asyncio.create_task(reader())
+    for message in messages:
+        await manager.write_data(message)
+        await asyncio.sleep(interval)
+    # leave time for the decoder to catch up before closing its input
+    await asyncio.sleep(0.5)
+    await manager.stop()
+    read_task.cancel()
+    return first_pcm, decoded / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+
+async def run(name, messages, streams, interval):
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(*(session(DECODERS[name], messages, interval) for _ in range(streams)))
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+    latencies = [r[0] * 1000 for r in results if r[0] is not None]
+    audio_s = statistics.mean(r[1] for r in results)
+    if latencies:
+        print(f"{name:>6}: connect p50 {statistics.median(latencies):7.1f} ms | max {max(latencies):7.1f} ms | "
+              f"{cpu / streams * 1000:7.1f} ms CPU per stream for {audio_s:.1f}s of audio | wall {wall:.1f}s")
+    else:
+        print(f"{name:>6}: no audio decoded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="WebM/Opus or Ogg/Opus file, as sent by the browser.")
+    parser.add_argument("--streams", type=int, default=10, help="Concurrent sessions.")
+    parser.add_argument("--message-bytes", type=int, default=4096, help="Size of each websocket message.")
+    parser.add_argument("--speed", type=float, default=10.0, help="Send speed relative to realtime, assuming ~32 kbit/s Opus.")
+    parser.add_argument("--decoders", nargs="+", default=list(DECODERS), choices=list(DECODERS))
+    args = parser.parse_args()
+
+    with open(args.audio, "rb") as f:
+        data = f.read()
+    messages = [data[i:i + args.message_bytes] for i in range(0, len(data), args.message_bytes)]
+    interval = args.message_bytes / 4000 / args.speed
+
+    for name in args.decoders:
+        asyncio.run(run(name, messages, args.streams, interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Decoder throughput with and without cross-session continuous batching.
+
+Each simulated session owns its own kv_cache and random encoder features,
+runs the prompt forward pass on its own and then emits tokens one at a time,
+like AlignAtt.infer does. Sessions run on concurrent threads, as they do under
+asyncio.to_thread in the server.
+
+    python scripts/benchmark_decoder_batching.py --model base --streams 32 64
+"""
+
+import argparse
+import threading
+import time
+
+import torch
+
+from whisperlivekit.simul_whisper.batching import DecoderStepBatcher
+from whisperlivekit.whisper import load_model
+
+
+def run_session(model, batcher, n_tokens, seed, barrier):
+    generator = torch.Generator().manual_seed(seed)
+    device = model.device
+    audio_features = torch.randn(1, model.dims.n_audio_ctx, model.dims.n_audio_state, generator=generator).to(device)
+    prompt = torch.tensor([[50258, 50259, 50359, 50363]], device=device)
+    kv_cache = {}
+    barrier.wait()
+    with torch.no_grad():
+        logits, _ = model.decoder(prompt, audio_features, kv_cache=kv_cache, return_cross_attn=True)
+        token = logits[:, -1:].argmax(dim=-1)
+        for _ in range(n_tokens):
+            if batcher is None:
+                logits, _ = model.decoder(token, audio_features, kv_cache=kv_cache, return_cross_attn=True)
+            else:
+                logits, _ = batcher.step(token, audio_features, kv_cache, owner=seed)
+            token = logits[:, -1:].argmax(dim=-1)
+
+
+def measure(model, batcher, n_streams, n_tokens):
+    barrier = threading.Barrier(n_streams + 1)
+    threads = [
+        threading.Thread(target=run_session, args=(model, batcher, n_tokens, i, barrier))
+        for i in range(n_streams)
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return n_streams * n_tokens / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--streams", type=int, nargs="+", default=[32, 64])
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens decoded per session.")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    for n_streams in args.streams:
+        unbatched = measure(model, None, n_streams, args.tokens)
+        batcher = DecoderStepBatcher(model, max_batch_size=n_streams, window_ms=args.window_ms)
+        batched = measure(model, batcher, n_streams, args.tokens)
+        print(
+            f"{n_streams:3d} streams: {unbatched:8.1f} tok/s unbatched | {batched:8.1f} tok/s batched "
+            f"(mean batch {batcher.batcher.mean_batch_size:.1f}) | x{batched / unbatched:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
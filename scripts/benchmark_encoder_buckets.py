@@ -0,0 +1,79 @@
+"""Quality and speed of truncated encoder input against full 30 s padding.
+
+Replays the same audio file with the replay harness, once with the default
+padding and once per --encoder-bucket-s value, and compares each run with the
+full padding one: real-time factor, word emission latency, and word error
+rate of the final transcript, taking the full padding transcript as reference.
+The replay runs as fast as possible on a virtual clock unless --speed is
+given, so latencies only differ when the transcripts do.
+
+    python scripts/benchmark_encoder_buckets.py audio.wav --buckets 2 5 10 --model base --language en
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def final_transcript(path):
+    last = None
+    with open(path) as f:
+        for line in f:
+            last = json.loads(line)
+    if last is None:
+        return ""
+    texts = [line.get("text", "") for line in last.get("lines", [])]
+    texts.append(last.get("buffer_transcription", ""))
+    return " ".join(t.strip() for t in texts if t and t.strip())
+
+
+def run_replay(audio_file, bucket_s, replay_args, server_args):
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "responses.jsonl")
+        command = [sys.executable, "-m", "whisperlivekit.replay", audio_file, "--output", output, *replay_args,
+                   *server_args, "--encoder-bucket-s", str(bucket_s)]
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        # the summary is the indented JSON object printed last
+        lines = result.stdout.splitlines()
+        start = max(i for i, line in enumerate(lines) if line == "{")
+        summary = json.loads("\n".join(lines[start:]))
+        return summary, final_transcript(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio_file")
+    parser.add_argument("--buckets", type=float, nargs="+", default=[2.0, 5.0, 10.0], help="Bucket sizes to compare, in seconds.")
+    parser.add_argument("--speed", type=float, default=None, help="Replay at N x realtime, so latencies include compute time.")
+    args, server_args = parser.parse_known_args()
+    replay_args = ["--speed", str(args.speed)] if args.speed else []
+
+    reference_summary, reference = run_replay(args.audio_file, 0.0, replay_args, server_args)
+    print(f"{'bucket':>8} {'rtf':>8} {'cpu_s':>8} {'lat p50':>8} {'lat p90':>8} {'words':>6} {'WER vs 30s':>10}")
+    rows = [("30s", reference_summary, 0.0)]
+    for bucket_s in args.buckets:
+        summary, transcript = run_replay(args.audio_file, bucket_s, replay_args, server_args)
+        rows.append((f"{bucket_s:g}s", summary, word_error_rate(reference, transcript)))
+    for name, summary, wer in rows:
+        print(
+            f"{name:>8} {summary['rtf']:>8.4f} {summary['cpu_s']:>8.2f} {summary['latency_p50_s']:>8.3f} "
+            f"{summary['latency_p90_s']:>8.3f} {summary['n_words']:>6} {wer:>10.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Chunk-arrival latency of the FFmpeg stdout reader.
+
+Streams a WAV stream through a real ffmpeg process in realtime messages and
+measures, for each message, the time between its write to ffmpeg stdin and
+the reader getting its last sample. Two readers are compared:
+
+- polling: the previous loop, which checked the state under a lock on each
+  iteration, sized reads from elapsed wall-clock time, wrapped each read in
+  a 20s wait_for and slept 50ms when nothing was available;
+- event: the current loop, awaiting read_available() on pipe readiness.
+
+    python scripts/benchmark_ffmpeg_reader.py --seconds 30 --message-ms 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import struct
+import time
+
+from whisperlivekit.ffmpeg_manager import FFmpegManager, FFmpegState
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+def wav_header() -> bytes:
+    # streaming header: unknown data size
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * BYTES_PER_SAMPLE, BYTES_PER_SAMPLE, 16)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+async def polling_reader(manager, on_chunk):
+    beg = time.time()
+    while True:
+        state = await manager.get_state()
+        if state != FFmpegState.RUNNING:
+            return
+        now = time.time()
+        size = max(int(32000 * max(0.0, now - beg)), 4096)
+        beg = now
+        chunk = await manager.read_data(size)
+        if not chunk:
+            await asyncio.sleep(0.05)
+            continue
+        on_chunk(chunk)
+
+
+async def event_reader(manager, on_chunk):
+    while True:
+        chunk = await manager.read_available(32000 * 5)
+        if not chunk:
+            return
+        on_chunk(chunk)
+
+
+async def run(name, reader, seconds, message_ms):
+    manager = FFmpegManager(sample_rate=SAMPLE_RATE, channels=1)
+    await manager.start()
+    message_bytes = int(SAMPLE_RATE * message_ms / 1000) * BYTES_PER_SAMPLE
+    n_messages = int(seconds * 1000 / message_ms)
+    written_at = []
+    latencies = []
+    received = 0
+
+    def on_chunk(chunk):
+        nonlocal received
+        received += len(chunk)
+        now = time.perf_counter()
+        # every message whose last sample has now arrived
+        while len(latencies) < len(written_at) and (len(latencies) + 1) * message_bytes <= received:
+            latencies.append(now - written_at[len(latencies)])
+
+    read_task = asyncio.create_task(reader(manager, on_chunk))
+    await manager.write_data(wav_header())
+    payload = bytes(message_bytes)
+    start = time.perf_counter()
+    for i in range(n_messages):
+        await asyncio.sleep(max(0.0, start + i * message_ms / 1000 - time.perf_counter()))
+        written_at.append(time.perf_counter())
+        await manager.write_data(payload)
+    await asyncio.sleep(1.0)
+    await manager.stop()
+    read_task.cancel()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    if not latencies_ms:
+        print(f"{name:>8}: no audio received")
+        return
+    p99 = latencies_ms[min(len(latencies_ms) - 1, int(0.99 * len(latencies_ms)))]
+    print(f"{name:>8}: {len(latencies_ms)} messages | p50 {statistics.median(latencies_ms):7.1f} ms | "
+          f"p99 {p99:7.1f} ms | max {latencies_ms[-1]:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Seconds of audio to stream.")
+    parser.add_argument("--message-ms", type=float, default=20.0, help="Duration of each message written to ffmpeg.")
+    args = parser.parse_args()
+
+    asyncio.run(run("polling", polling_reader, args.seconds, args.message_ms))
+    asyncio.run(run("event", event_reader, args.seconds, args.message_ms))
+
+
+if __name__ == "__main__":
+    main()
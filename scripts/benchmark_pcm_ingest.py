@@ -0,0 +1,86 @@
+"""Microbenchmark for the PCM ingest path of AudioProcessor.handle_pcm_data.
+
+Compares the previous bytearray slicing + int16->float32 conversion with
+PCMRingBuffer, feeding the same stream of websocket-sized messages to both.
+Throughput is reported in bytes/sec of s16le input per core (single thread).
+
+    python scripts/benchmark_pcm_ingest.py --seconds 600 --message-ms 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from whisperlivekit.pcm_buffer import PCMRingBuffer
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+def legacy_ingest(messages, chunk_bytes, max_bytes):
+    pcm_buffer = bytearray()
+    total = 0
+    for message in messages:
+        pcm_buffer.extend(message)
+        if len(pcm_buffer) < chunk_bytes:
+            continue
+        size = min(len(pcm_buffer), max_bytes)
+        size = (size // BYTES_PER_SAMPLE) * BYTES_PER_SAMPLE
+        pcm_array = np.frombuffer(pcm_buffer[:size], dtype=np.int16).astype(np.float32) / 32768.0
+        pcm_buffer = pcm_buffer[size:]
+        total += pcm_array.size
+    return total
+
+
+def ring_ingest(messages, chunk_bytes, max_bytes):
+    ring = PCMRingBuffer(capacity_bytes=2 * max_bytes, max_read_bytes=max_bytes)
+    total = 0
+    for message in messages:
+        ring.write(message)
+        if len(ring) < chunk_bytes:
+            continue
+        pcm_array = ring.read_float(min(len(ring), max_bytes))
+        total += pcm_array.size
+    return total
+
+
+def run(name, fn, messages, n_bytes, chunk_bytes, max_bytes, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn(messages, chunk_bytes, max_bytes)
+        best = min(best, time.process_time() - start)
+    rate = n_bytes / best if best > 0 else float("inf")
+    print(f"{name:>8}: {best * 1000:8.1f} ms CPU | {rate / 1e6:8.1f} MB/s per core | "
+          f"{rate / (SAMPLE_RATE * BYTES_PER_SAMPLE):8.0f}x realtime per core")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=600.0, help="Seconds of audio to push through.")
+    parser.add_argument("--message-ms", type=float, default=20.0, help="Duration of each incoming message.")
+    parser.add_argument("--min-chunk-size", type=float, default=0.1, help="Same meaning as the server option.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    message_samples = int(SAMPLE_RATE * args.message_ms / 1000)
+    n_messages = int(args.seconds * 1000 / args.message_ms)
+    audio = rng.integers(-32768, 32767, size=message_samples * n_messages, dtype=np.int16).tobytes()
+    message_bytes = message_samples * BYTES_PER_SAMPLE
+    # odd-sized messages exercise the unaligned path, as FFmpeg reads do
+    messages = [audio[i:i + message_bytes + 1] for i in range(0, len(audio), message_bytes + 1)]
+
+    chunk_bytes = int(SAMPLE_RATE * args.min_chunk_size) * BYTES_PER_SAMPLE
+    max_bytes = 32000 * 5
+
+    assert legacy_ingest(messages, chunk_bytes, max_bytes) == ring_ingest(messages, chunk_bytes, max_bytes)
+    before = run("before", legacy_ingest, messages, len(audio), chunk_bytes, max_bytes, args.repeats)
+    after = run("after", ring_ingest, messages, len(audio), chunk_bytes, max_bytes, args.repeats)
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,33 @@
 import asyncio
 import logging
 import traceback
-from time import time
-from typing import Any, AsyncGenerator, List, Optional, Union
+from time import perf_counter, time
+from typing import Any, AsyncGenerator, Awaitable, Callable, List, Optional, Union
 
 import numpy as np
 
+from whisperlivekit import session_snapshot
+from whisperlivekit.chunk_controller import AdaptiveChunkController
 from whisperlivekit.core import (TranscriptionEngine,
                                  online_diarization_factory, online_factory,
                                  online_translation_factory)
 from whisperlivekit.ffmpeg_manager import FFmpegManager, FFmpegState
+from whisperlivekit.heartbeat import Heartbeat
+from whisperlivekit.inference_executor import (PRIORITY_FINAL,
+                                               PRIORITY_SPECULATIVE,
+                                               InferenceExecutor)
+from whisperlivekit.metrics import METRICS
+from whisperlivekit.opus_decoder import OpusPacketDecoder
+from whisperlivekit.pcm_buffer import PCMRingBuffer, share_chunk
+from whisperlivekit.resampler import PCMInputConverter
 from whisperlivekit.silero_vad_iterator import FixedVADIterator
-from whisperlivekit.timed_objects import (ASRToken, ChangeSpeaker, FrontData,
-                                          Segment, Silence, State, Transcript)
+from whisperlivekit.speculative_final import SpeculativeFinal
+from whisperlivekit.stage_queue import QueueOverloadError, StageQueue
+from whisperlivekit.timed_objects import (ASRToken, AudioGap, ChangeSpeaker,
+                                          FrontData, Segment, Silence,
+                                          SpeechEndHint, State, Transcript)
 from whisperlivekit.tokens_alignment import TokensAlignment
+from whisperlivekit.vad_pregate import EnergyPreGate
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -21,15 +35,20 @@ logger.setLevel(logging.DEBUG)
 
 SENTINEL = object() # unique sentinel object for end of stream marker
 MIN_DURATION_REAL_SILENCE = 5
+IDLE_REFRESH_INTERVAL = 1.0 # refresh of the remaining_time counters when nothing else changes
+# raw PCM formats accepted in the config handshake
+MIN_INPUT_SAMPLE_RATE = 8000
+MAX_INPUT_SAMPLE_RATE = 192000
+MAX_INPUT_CHANNELS = 8
 
-async def get_all_from_queue(queue: asyncio.Queue) -> Union[object, Silence, np.ndarray, List[Any]]:
+async def get_all_from_queue(queue: asyncio.Queue) -> Union[object, Silence, SpeechEndHint, np.ndarray, List[Any]]:
     items: List[Any] = []
 
     first_item = await queue.get()
     queue.task_done()
     if first_item is SENTINEL:
         return first_item
-    if isinstance(first_item, Silence):
+    if isinstance(first_item, (Silence, SpeechEndHint)):
         return first_item
     items.append(first_item)
     
@@ -39,12 +58,13 @@ async def get_all_from_queue(queue: asyncio.Queue) -> Union[object, Silence, np.
         next_item = queue._queue[0]
         if next_item is SENTINEL:
             break
-        if isinstance(next_item, Silence):
+        if isinstance(next_item, (Silence, SpeechEndHint)):
             break
         items.append(await queue.get())
         queue.task_done()
     if isinstance(items[0], np.ndarray):
-        return np.concatenate(items)
+        # a single chunk is handed over as is: np.concatenate would copy it
+        return items[0] if len(items) == 1 else np.concatenate(items)
     else: #translation
         return items
 
@@ -70,7 +90,26 @@ class AudioProcessor:
         self.bytes_per_sample = 2
         self.bytes_per_sec = self.samples_per_sec * self.bytes_per_sample
         self.max_bytes_per_sec = 32000 * 5  # 5 seconds of audio at 32 kHz
-        self.is_pcm_input = self.args.pcm_input
+        self.chunk_controller: Optional[AdaptiveChunkController] = None
+        if getattr(self.args, "adaptive_chunk", False):
+            self.chunk_controller = AdaptiveChunkController(
+                min_chunk_s=self.args.min_chunk_size,
+                max_chunk_s=self.args.max_chunk_size,
+                target_lag_s=self.args.target_lag,
+                increase_factor=self.args.chunk_increase_factor,
+                decrease_factor=self.args.chunk_decrease_factor,
+            )
+        # Opus packets are decoded in process: the session then runs as with PCM input
+        self.opus_decoder: Optional[OpusPacketDecoder] = None
+        if getattr(self.args, "opus_input", False):
+            self.opus_decoder = OpusPacketDecoder(sample_rate=16000, channels=1)
+        self.is_pcm_input = self.args.pcm_input or self.opus_decoder is not None
+        # raw PCM at another rate or channel count than 16 kHz mono, see set_input_format
+        self.input_converter: Optional[PCMInputConverter] = None
+        # stream time source; the replay harness injects a virtual clock, which then
+        # provides an async sleep(seconds) measured on itself
+        self.clock: Callable[[], float] = kwargs.get('clock') or time
+        self.clock_sleep: Callable[[float], Awaitable[None]] = getattr(self.clock, "sleep", asyncio.sleep)
 
         # State management
         self.is_stopping: bool = False
@@ -79,37 +118,72 @@ class AudioProcessor:
         self.lock: asyncio.Lock = asyncio.Lock()
         self.sep: str = " "  # Default separator
         self.last_response_content: FrontData = FrontData()
+        # set by the processors whenever something the results formatter shows has changed
+        self.state_changed: asyncio.Event = asyncio.Event()
+        self.min_results_interval: float = getattr(self.args, "min_results_interval", 0.05)
 
-        self.tokens_alignment: TokensAlignment = TokensAlignment(self.state, self.args, self.sep)
+        self.tokens_alignment: TokensAlignment = TokensAlignment(self.state, self.args, self.sep, self.clock)
         self.beg_loop: Optional[float] = None
 
         # Models and processing
         self.asr: Any = models.asr
         self.vac_model: Any = models.vac_model
+        self.asr_executor: Optional[InferenceExecutor] = getattr(models, "asr_executor", None)
+        self.inflight_calls: int = 0
+        self.translation_executor: Optional[InferenceExecutor] = getattr(models, "translation_executor", None)
         if self.args.vac:
-            self.vac: Optional[FixedVADIterator] = FixedVADIterator(models.vac_model)
+            pregate = EnergyPreGate() if getattr(self.args, "vad_pregate", False) else None
+            self.vac: Optional[FixedVADIterator] = FixedVADIterator(models.vad_service.open_stream(), pregate=pregate)
         else:
             self.vac: Optional[FixedVADIterator] = None
+        # final pass started when the VAD speech probability first drops, see SpeculativeFinal
+        self.speculative_final: Optional[SpeculativeFinal] = None
+        if self.vac and getattr(self.args, "speculative_final", False):
+            self.speculative_final = SpeculativeFinal()
+        self._speech_end_pending: bool = False
                          
         self.ffmpeg_manager: Optional[FFmpegManager] = None
         self.ffmpeg_reader_task: Optional[asyncio.Task] = None
         self._ffmpeg_error: Optional[str] = None
+        self._overload_error: Optional[str] = None
 
         if not self.is_pcm_input:
-            self.ffmpeg_manager = FFmpegManager(
-                sample_rate=self.sample_rate,
-                channels=self.channels
-            )
+            if getattr(self.args, "audio_decoder", "ffmpeg") == "pyav":
+                from whisperlivekit.pyav_decoder import PyAVDecoderManager
+                self.ffmpeg_manager = PyAVDecoderManager(
+                    sample_rate=self.sample_rate,
+                    channels=self.channels
+                )
+            else:
+                self.ffmpeg_manager = FFmpegManager(
+                    sample_rate=self.sample_rate,
+                    channels=self.channels,
+                    pool=getattr(models, "ffmpeg_pool", None),
+                )
             async def handle_ffmpeg_error(error_type: str):
                 logger.error(f"FFmpeg error: {error_type}")
                 self._ffmpeg_error = error_type
+                self._notify_change()
             self.ffmpeg_manager.on_error_callback = handle_ffmpeg_error
              
-        self.transcription_queue: Optional[asyncio.Queue] = asyncio.Queue() if self.args.transcription else None
-        self.diarization_queue: Optional[asyncio.Queue] = asyncio.Queue() if self.args.diarization else None
-        self.translation_queue: Optional[asyncio.Queue] = asyncio.Queue() if self.args.target_language else None
-        self.pcm_buffer: bytearray = bytearray()
+        max_queue_seconds = getattr(self.args, "max_queue_seconds", 0.0)
+        overload_policy = getattr(self.args, "queue_overload_policy", "drop_oldest")
+        self.transcription_queue: Optional[StageQueue] = StageQueue(
+            "transcription", max_queue_seconds, overload_policy, self.sample_rate
+        ) if self.args.transcription else None
+        self.diarization_queue: Optional[StageQueue] = StageQueue(
+            "diarization", max_queue_seconds, overload_policy, self.sample_rate
+        ) if self.args.diarization else None
+        # tokens only: they are batched by get_all_from_queue and never dropped
+        self.translation_queue: Optional[StageQueue] = StageQueue("translation") if self.args.target_language else None
+        self.pcm_buffer: PCMRingBuffer = PCMRingBuffer(
+            capacity_bytes=2 * self.max_bytes_per_sec,
+            max_read_bytes=self.max_bytes_per_sec,
+        )
         self.total_pcm_samples: int = 0
+        # stream time of the audio handed to the ASR, and audio inserted since the last process_iter
+        self.transcription_stream_time: float = 0.0
+        self.pending_audio_s: float = 0.0
         self.transcription_task: Optional[asyncio.Task] = None
         self.diarization_task: Optional[asyncio.Task] = None
         self.translation_task: Optional[asyncio.Task] = None
@@ -128,6 +202,32 @@ class AudioProcessor:
         if models.translation_model:
             self.translation = online_translation_factory(self.args, models.translation_model)
 
+        # stall detection, see watchdog
+        self.stall_threshold: float = getattr(self.args, "stall_threshold", 5.0)
+        self.stall_recovery: List[str] = list(getattr(self.args, "stall_recovery", []) or [])
+        self.heartbeats: dict = {}
+        if not self.is_pcm_input:
+            self.heartbeats["ffmpeg_reader"] = Heartbeat("ffmpeg_reader")
+        for name, processor in (("transcription", self.transcription), ("diarization", self.diarization), ("translation", self.translation)):
+            if processor:
+                self.heartbeats[name] = Heartbeat(name)
+        # heartbeat clock time of the first write to FFmpeg since its last output, None if all was read
+        self._ffmpeg_unread_since: Optional[float] = None
+        self._asr_reset_requested: bool = False
+
+    async def _run_blocking(self, executor: Optional[InferenceExecutor], fn, final: bool = False) -> Any:
+        """Run a blocking model call on the model's executor, or in the default pool if there is none."""
+        self.inflight_calls += 1
+        try:
+            if executor is None:
+                return await asyncio.to_thread(fn)
+            return await executor.run(fn, priority=PRIORITY_FINAL if final else PRIORITY_SPECULATIVE)
+        finally:
+            self.inflight_calls -= 1
+
+    def _notify_change(self) -> None:
+        self.state_changed.set()
+
     async def _push_silence_event(self) -> None:
         if self.transcription_queue:
             await self.transcription_queue.put(self.current_silence)
@@ -139,16 +239,17 @@ class AudioProcessor:
     async def _begin_silence(self) -> None:
         if self.current_silence:
             return
-        now = time() - self.beg_loop
+        now = self.clock() - self.beg_loop
         self.current_silence = Silence(
             is_starting=True, start=now
         )
+        self._notify_change()
         await self._push_silence_event()
 
     async def _end_silence(self) -> None:
         if not self.current_silence:
             return
-        now = time() - self.beg_loop
+        now = self.clock() - self.beg_loop
         self.current_silence.end = now
         self.current_silence.is_starting=False
         self.current_silence.has_ended=True
@@ -157,14 +258,150 @@ class AudioProcessor:
             self.state.new_tokens.append(self.current_silence)
         await self._push_silence_event()
         self.current_silence = None
+        self._notify_change()
 
     async def _enqueue_active_audio(self, pcm_chunk: np.ndarray) -> None:
+        """
+        Fan a chunk out to the transcription and diarization queues.
+
+        The chunk is copied once out of the ring buffer's reusable output and
+        made read-only, and every consumer gets a reference to that same
+        array: consumers must not write to it, and it is released when the
+        last of them drops its reference (see share_chunk).
+        """
         if pcm_chunk is None or pcm_chunk.size == 0:
             return
-        if self.transcription_queue:
-            await self.transcription_queue.put(pcm_chunk.copy())
-        if self.args.diarization and self.diarization_queue:
-            await self.diarization_queue.put(pcm_chunk.copy())
+        shared_chunk = share_chunk(pcm_chunk)
+        try:
+            if self.transcription_queue:
+                await self.transcription_queue.put(shared_chunk)
+            if self.args.diarization and self.diarization_queue:
+                await self.diarization_queue.put(shared_chunk)
+        except QueueOverloadError as e:
+            await self._reject_session(str(e))
+
+    async def _reject_session(self, reason: str) -> None:
+        """Stop the session because a stage queue is overloaded (reject policy)."""
+        if self.is_stopping:
+            return
+        logger.error(f"Rejecting session: {reason}")
+        self._overload_error = reason
+        self.is_stopping = True
+        self._notify_change()
+        if self.is_pcm_input:
+            if self.transcription_queue:
+                await self.transcription_queue.put(SENTINEL)
+        elif self.ffmpeg_manager:
+            # incoming audio is now ignored: end FFmpeg's output so that
+            # ffmpeg_stdout_reader returns and sends the sentinels
+            await self.ffmpeg_manager.stop()
+
+    def queue_stats(self) -> dict:
+        """Depth and drop counters of every stage queue."""
+        queues = (self.transcription_queue, self.diarization_queue, self.translation_queue)
+        return {queue.name: queue.stats() for queue in queues if queue}
+
+    async def wait_idle(self) -> None:
+        """Wait until every queued chunk has been processed and no model call is running."""
+        queues = [q for q in (self.transcription_queue, self.diarization_queue, self.translation_queue) if q]
+        while True:
+            for _ in range(3):
+                await asyncio.sleep(0)
+            if not any(q.qsize() for q in queues) and self.inflight_calls == 0:
+                return
+            await asyncio.sleep(0.005)
+
+    def _snapshot_config(self) -> dict:
+        """Settings a snapshot can only be restored under."""
+        return {
+            "backend_policy": self.args.backend_policy,
+            "model_size": self.args.model_size,
+            "lan": self.args.lan,
+            "transcription": self.args.transcription,
+            "vac": self.args.vac,
+            "diarization": self.args.diarization,
+            "diarization_backend": self.args.diarization_backend if self.args.diarization else None,
+            "sample_rate": self.sample_rate,
+        }
+
+    async def snapshot(self) -> bytes:
+        """
+        Serialize the streaming state of the session (see session_snapshot),
+        to restore it in another process with `restore`.
+
+        The caller stops feeding audio first; in-flight work is drained before
+        the state is captured. Not captured: audio still inside FFmpeg (use
+        --pcm-input for sessions that must migrate) and the nllw translation
+        buffer, which restarts empty.
+        """
+        if self.diarization and not hasattr(self.diarization, "snapshot_state"):
+            raise session_snapshot.SnapshotError(
+                f"{self.args.diarization_backend} diarization state cannot be snapshotted"
+            )
+        await self.wait_idle()
+        async with self.lock:
+            start = perf_counter()
+            with METRICS.timer("snapshot"):
+                saved = {
+                    "config": self._snapshot_config(),
+                    "elapsed": self.clock() - self.beg_loop if self.beg_loop else None,
+                    "pcm_tail": np.frombuffer(self.pcm_buffer.peek_bytes(), dtype=np.int16),
+                    "total_pcm_samples": self.total_pcm_samples,
+                    "transcription_stream_time": self.transcription_stream_time,
+                    "pending_audio_s": self.pending_audio_s,
+                    "chunk_s": self.chunk_controller.chunk_s if self.chunk_controller else None,
+                    "current_silence": self.current_silence,
+                    "state": {
+                        "tokens": list(self.state.tokens),
+                        "buffer_transcription": self.state.buffer_transcription,
+                        "end_buffer": self.state.end_buffer,
+                        "end_attributed_speaker": self.state.end_attributed_speaker,
+                        "new_tokens": list(self.state.new_tokens),
+                        "new_diarization": list(self.state.new_diarization),
+                        "new_tokens_buffer": self.state.new_tokens_buffer,
+                    },
+                    "tokens_alignment": self.tokens_alignment.snapshot_state(),
+                    "transcription": self.transcription.snapshot_state() if self.transcription else None,
+                    "vad": self.vac.snapshot_state() if self.vac else None,
+                    "diarization": self.diarization.snapshot_state() if self.diarization else None,
+                }
+                data = session_snapshot.dumps(saved)
+        logger.info(f"Session snapshot: {len(data)} bytes in {(perf_counter() - start) * 1000:.1f}ms")
+        return data
+
+    def restore(self, data: bytes) -> None:
+        """Load a `snapshot` into this new processor, before `create_tasks`."""
+        start = perf_counter()
+        with METRICS.timer("restore"):
+            saved = session_snapshot.loads(data)
+            config = self._snapshot_config()
+            mismatches = {k: (v, config.get(k)) for k, v in saved["config"].items() if config.get(k) != v}
+            if mismatches:
+                raise session_snapshot.SnapshotError(
+                    f"Snapshot taken with different settings (snapshot, here): {mismatches}"
+                )
+            if saved["elapsed"] is not None:
+                self.beg_loop = self.clock() - saved["elapsed"]
+                self.tokens_alignment.beg_loop = self.beg_loop
+            self.pcm_buffer.clear()
+            self.pcm_buffer.write(saved["pcm_tail"].tobytes())
+            self.total_pcm_samples = saved["total_pcm_samples"]
+            self.transcription_stream_time = saved["transcription_stream_time"]
+            self.pending_audio_s = saved["pending_audio_s"]
+            if self.chunk_controller and saved["chunk_s"] is not None:
+                self.chunk_controller.chunk_s = saved["chunk_s"]
+            self.current_silence = saved["current_silence"]
+            for key, value in saved["state"].items():
+                setattr(self.state, key, value)
+            self.tokens_alignment.restore_state(saved["tokens_alignment"])
+            if self.transcription:
+                self.transcription.restore_state(saved["transcription"])
+            if self.vac:
+                self.vac.restore_state(saved["vad"])
+            if self.diarization:
+                self.diarization.restore_state(saved["diarization"])
+        logger.info(f"Session restored from {len(data)} bytes in {(perf_counter() - start) * 1000:.1f}ms")
+        self._notify_change()
 
     def _slice_before_silence(self, pcm_array: np.ndarray, chunk_sample_start: int, silence_sample: Optional[int]) -> Optional[np.ndarray]:
         if silence_sample is None:
@@ -184,7 +421,7 @@ class AudioProcessor:
     async def get_current_state(self) -> State:
         """Get current state."""
         async with self.lock:
-            current_time = time()
+            current_time = self.clock()
             
             remaining_transcription = 0
             if self.state.end_buffer > 0:
@@ -201,37 +438,32 @@ class AudioProcessor:
             return self.state
 
     async def ffmpeg_stdout_reader(self) -> None:
-        """Read audio data from FFmpeg stdout and process it into the PCM pipeline."""
-        beg = time()
+        """
+        Read decoded audio from FFmpeg as soon as its output is readable and feed it to the PCM pipeline.
+
+        Each read returns whatever is available, up to the largest chunk handle_pcm_data
+        consumes, and only whole sample frames are written to the ring buffer.
+        """
+        frame_bytes = self.bytes_per_sample * self.channels
+        partial = b""
         while True:
             try:
+                with METRICS.timer("ffmpeg_read"):
+                    chunk = await self.ffmpeg_manager.read_available(self.max_bytes_per_sec)
+                if not chunk:
+                    logger.info(f"FFmpeg output ended, state: {self.ffmpeg_manager.state}")
+                    break
                 if self.is_stopping:
                     logger.info("Stopping ffmpeg_stdout_reader due to stopping flag.")
                     break
 
-                state = await self.ffmpeg_manager.get_state() if self.ffmpeg_manager else FFmpegState.STOPPED
-                if state == FFmpegState.FAILED:
-                    logger.error("FFmpeg is in FAILED state, cannot read data")
-                    break
-                elif state == FFmpegState.STOPPED:
-                    logger.info("FFmpeg is stopped")
-                    break
-                elif state != FFmpegState.RUNNING:
-                    await asyncio.sleep(0.1)
-                    continue
-
-                current_time = time()
-                elapsed_time = max(0.0, current_time - beg)
-                buffer_size = max(int(32000 * elapsed_time), 4096)  # dynamic read
-                beg = current_time
-
-                chunk = await self.ffmpeg_manager.read_data(buffer_size)
-                if not chunk:
-                    # No data currently available
-                    await asyncio.sleep(0.05)
-                    continue
-
-                self.pcm_buffer.extend(chunk)
+                self._ffmpeg_unread_since = None
+                self.heartbeats["ffmpeg_reader"].beat()
+                if partial:
+                    chunk = partial + chunk
+                aligned = len(chunk) - len(chunk) % frame_bytes
+                partial = chunk[aligned:]
+                self.pcm_buffer.write(memoryview(chunk)[:aligned])
                 await self.handle_pcm_data()
 
             except asyncio.CancelledError:
@@ -252,33 +484,79 @@ class AudioProcessor:
 
     async def transcription_processor(self) -> None:
         """Process audio chunks for transcription."""
-        cumulative_pcm_duration_stream_time = 0.0
-        
+        heartbeat = self.heartbeats["transcription"]
         while True:
             try:
                 # item = await self.transcription_queue.get()
                 item = await get_all_from_queue(self.transcription_queue)
                 if item is SENTINEL:
                     logger.debug("Transcription processor received sentinel. Finishing.")
+                    if self.speculative_final and self.speculative_final.active:
+                        await self._cancel_speculative_final()
                     break
+                heartbeat.beat()
+                if isinstance(item, SpeechEndHint):
+                    if item.pending and self.speculative_final and not self.speculative_final.active:
+                        self.speculative_final.start(
+                            self.transcription,
+                            # speculative work must not delay the confirmed finals of other sessions
+                            lambda: self._run_blocking(self.asr_executor, self.transcription.start_silence),
+                        )
+                    elif not item.pending and self.speculative_final and self.speculative_final.active:
+                        await self._cancel_speculative_final()
+                    continue
+                if self.speculative_final and self.speculative_final.active:
+                    if isinstance(item, np.ndarray):
+                        # the final pass owns the ASR state until it is confirmed or cancelled
+                        self.transcription_stream_time += len(item) / self.sample_rate
+                        self.speculative_final.hold(item, self.transcription_stream_time)
+                        continue
+                    if not (isinstance(item, Silence) and item.is_starting):
+                        await self._cancel_speculative_final()
+                if self._asr_reset_requested:
+                    self._asr_reset_requested = False
+                    logger.warning("Resetting the ASR buffer after a stall.")
+                    self.transcription.reset_buffer()
 
                 asr_internal_buffer_duration_s = len(getattr(self.transcription, 'audio_buffer', [])) / self.transcription.SAMPLING_RATE
-                transcription_lag_s = max(0.0, time() - self.beg_loop - self.state.end_buffer)
+                transcription_lag_s = max(0.0, self.clock() - self.beg_loop - self.state.end_buffer)
                 asr_processing_logs = f"internal_buffer={asr_internal_buffer_duration_s:.2f}s | lag={transcription_lag_s:.2f}s |"
-                stream_time_end_of_current_pcm = cumulative_pcm_duration_stream_time
+                stream_time_end_of_current_pcm = self.transcription_stream_time
                 new_tokens = []
                 current_audio_processed_upto = self.state.end_buffer
 
-                if isinstance(item, Silence):
-                    if item.is_starting:
-                        new_tokens, current_audio_processed_upto = await asyncio.to_thread(
-                            self.transcription.start_silence
+                if isinstance(item, AudioGap):
+                    # the audio on both sides of the gap is not contiguous: finish the buffered
+                    # audio, then resume at the stream time after the gap without inserting samples
+                    with heartbeat.operation("start_silence"):
+                        new_tokens, current_audio_processed_upto = await self._run_blocking(
+                            self.asr_executor, self.transcription.start_silence
                         )
+                    self.pending_audio_s = 0.0
+                    self.transcription_stream_time += item.duration
+                    self.transcription.skip_audio(self.transcription_stream_time)
+                    logger.info(asr_processing_logs + f" + Audio gap of {item.duration:.2f}s")
+                    new_tokens = new_tokens or []
+                    current_audio_processed_upto = max(current_audio_processed_upto, self.transcription_stream_time)
+                elif isinstance(item, Silence):
+                    if item.is_starting:
+                        with heartbeat.operation("start_silence"), METRICS.timer("finalize"):
+                            if self.speculative_final and self.speculative_final.active:
+                                (new_tokens, current_audio_processed_upto), held = await self.speculative_final.confirm()
+                                # trailing audio of the utterance, transcribed with the next one
+                                for pcm_array, stream_time_end in held:
+                                    self.transcription.insert_audio_chunk(pcm_array, stream_time_end)
+                                asr_processing_logs += f" + Speculative final confirmed"
+                            else:
+                                new_tokens, current_audio_processed_upto = await self._run_blocking(
+                                    self.asr_executor, self.transcription.start_silence, final=True
+                                )
+                        self.pending_audio_s = 0.0
                         asr_processing_logs += f" + Silence starting"
                     if item.has_ended:
                         asr_processing_logs += f" + Silence of = {item.duration:.2f}s"
-                        cumulative_pcm_duration_stream_time += item.duration
-                        current_audio_processed_upto = cumulative_pcm_duration_stream_time
+                        self.transcription_stream_time += item.duration
+                        current_audio_processed_upto = self.transcription_stream_time
                         self.transcription.end_silence(item.duration, self.state.tokens[-1].end if self.state.tokens else 0)
                     if self.state.tokens:
                         asr_processing_logs += f" | last_end = {self.state.tokens[-1].end} |"
@@ -291,10 +569,22 @@ class AudioProcessor:
                 elif isinstance(item, np.ndarray):
                     pcm_array = item
                     logger.info(asr_processing_logs)
-                    cumulative_pcm_duration_stream_time += len(pcm_array) / self.sample_rate
-                    stream_time_end_of_current_pcm = cumulative_pcm_duration_stream_time
+                    self.transcription_stream_time += len(pcm_array) / self.sample_rate
+                    stream_time_end_of_current_pcm = self.transcription_stream_time
                     self.transcription.insert_audio_chunk(pcm_array, stream_time_end_of_current_pcm)
-                    new_tokens, current_audio_processed_upto = await asyncio.to_thread(self.transcription.process_iter)
+                    self.pending_audio_s += len(pcm_array) / self.sample_rate
+                    if self.chunk_controller and self.pending_audio_s < self.chunk_controller.chunk_s:
+                        continue  # accumulate up to the effective chunk size before iterating
+                    iteration_start = perf_counter()
+                    with heartbeat.operation("process_iter"):
+                        new_tokens, current_audio_processed_upto = await self._run_blocking(
+                            self.asr_executor, self.transcription.process_iter
+                        )
+                    if self.chunk_controller:
+                        self.chunk_controller.update(
+                            transcription_lag_s, perf_counter() - iteration_start, self.pending_audio_s
+                        )
+                    self.pending_audio_s = 0.0
                     new_tokens = new_tokens or []
 
                 _buffer_transcript = self.transcription.get_buffer()
@@ -321,6 +611,7 @@ class AudioProcessor:
                     self.state.end_buffer = max(candidate_end_times)
                     self.state.new_tokens.extend(new_tokens)
                     self.state.new_tokens_buffer = _buffer_transcript
+                self._notify_change()
 
                 if self.translation_queue:
                     for token in new_tokens:
@@ -341,20 +632,31 @@ class AudioProcessor:
         logger.info("Transcription processor task finished.")
 
 
+    async def _cancel_speculative_final(self) -> None:
+        """Speech resumed: roll the ASR state back and transcribe the audio held during the final pass."""
+        held = await self.speculative_final.cancel(self.transcription)
+        for pcm_array, stream_time_end in held:
+            self.transcription.insert_audio_chunk(pcm_array, stream_time_end)
+            self.pending_audio_s += len(pcm_array) / self.sample_rate
+
     async def diarization_processor(self) -> None:
+        heartbeat = self.heartbeats["diarization"]
         while True:
             try:
                 item = await get_all_from_queue(self.diarization_queue)
                 if item is SENTINEL:
                     break
-                elif type(item) is Silence:
+                heartbeat.beat()
+                if isinstance(item, Silence):
                     if item.has_ended:
                         self.diarization.insert_silence(item.duration)
                     continue
 
                 self.diarization.insert_audio_chunk(item)
-                diarization_segments = await self.diarization.diarize()
+                with heartbeat.operation("diarize"):
+                    diarization_segments = await self.diarization.diarize()
                 self.state.new_diarization = diarization_segments
+                self._notify_change()
                 
             except Exception as e:
                 logger.warning(f"Exception in diarization_processor: {e}")
@@ -365,13 +667,15 @@ class AudioProcessor:
         # the idea is to ignore diarization for the moment. We use only transcription tokens. 
         # And the speaker is attributed given the segments used for the translation
         # in the future we want to have different languages for each speaker etc, so it will be more complex.
+        heartbeat = self.heartbeats["translation"]
         while True:
             try:
                 item = await get_all_from_queue(self.translation_queue)
                 if item is SENTINEL:
                     logger.debug("Translation processor received sentinel. Finishing.")
                     break
-                elif type(item) is Silence:
+                heartbeat.beat()
+                if type(item) is Silence:
                     if item.is_starting:
                         new_translation, new_translation_buffer = self.translation.validate_buffer_and_reset()
                     if item.has_ended:
@@ -382,31 +686,57 @@ class AudioProcessor:
                     pass
                 else:
                     self.translation.insert_tokens(item)
-                    new_translation, new_translation_buffer = await asyncio.to_thread(self.translation.process)
+                    with heartbeat.operation("translate"):
+                        new_translation, new_translation_buffer = await self._run_blocking(
+                            self.translation_executor, self.translation.process
+                        )
                 async with self.lock:
                     self.state.new_translation.append(new_translation)
                     self.state.new_translation_buffer = new_translation_buffer
+                self._notify_change()
             except Exception as e:
                 logger.warning(f"Exception in translation_processor: {e}")
                 logger.warning(f"Traceback: {traceback.format_exc()}")
         logger.info("Translation processor task finished.")
 
     async def results_formatter(self) -> AsyncGenerator[FrontData, None]:
-        """Format processing results for output."""
+        """
+        Format processing results for output.
+
+        Wakes up when a processor signals a change (or every IDLE_REFRESH_INTERVAL
+        to refresh the remaining time counters), and emits at most one response
+        per `min_results_interval` so that bursts of updates are coalesced.
+        """
+        last_emit: Optional[float] = None
         while True:
             try:
+                try:
+                    await asyncio.wait_for(self.state_changed.wait(), timeout=IDLE_REFRESH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                if last_emit is not None:
+                    coalesce_wait = self.min_results_interval - (self.clock() - last_emit)
+                    if coalesce_wait > 0:
+                        await self.clock_sleep(coalesce_wait)
+                self.state_changed.clear()
+
                 if self._ffmpeg_error:
                     yield FrontData(status="error", error=f"FFmpeg error: {self._ffmpeg_error}")
                     self._ffmpeg_error = None
                     await asyncio.sleep(1)
                     continue
 
-                self.tokens_alignment.update()
-                lines, buffer_diarization_text, buffer_translation_text = self.tokens_alignment.get_lines(
-                    diarization=self.args.diarization,
-                    translation=bool(self.translation),
-                    current_silence=self.current_silence
-                )
+                if self._overload_error:
+                    yield FrontData(status="error", error=self._overload_error)
+                    self._overload_error = None
+
+                with METRICS.timer("alignment"):
+                    self.tokens_alignment.update()
+                    lines, buffer_diarization_text, buffer_translation_text = self.tokens_alignment.get_lines(
+                        diarization=self.args.diarization,
+                        translation=bool(self.translation),
+                        current_silence=self.current_silence
+                    )
                 state = await self.get_current_state()
 
                 buffer_transcription_text = state.buffer_transcription.text if state.buffer_transcription else ''
@@ -422,20 +752,21 @@ class AudioProcessor:
                     buffer_diarization=buffer_diarization_text,
                     buffer_translation=buffer_translation_text,
                     remaining_time_transcription=state.remaining_time_transcription,
-                    remaining_time_diarization=state.remaining_time_diarization if self.args.diarization else 0
+                    remaining_time_diarization=state.remaining_time_diarization if self.args.diarization else 0,
+                    effective_chunk_size=round(self.chunk_controller.chunk_s, 2) if self.chunk_controller else 0.,
+                    n_final_lines=self.tokens_alignment.n_final_lines,
                 )
                                 
                 should_push = (response != self.last_response_content)
                 if should_push:
                     yield response
                     self.last_response_content = response
+                    last_emit = self.clock()
                 
                 if self.is_stopping and self._processing_tasks_done():
                     logger.info("Results formatter: All upstream processors are done and in stopping state. Terminating.")
                     return
-                
-                await asyncio.sleep(0.05)
-                
+
             except Exception as e:
                 logger.warning(f"Exception in results_formatter. Traceback: {traceback.format_exc()}")
                 await asyncio.sleep(0.5)
@@ -475,6 +806,11 @@ class AudioProcessor:
             self.all_tasks_for_cleanup.append(self.translation_task)
             processing_tasks_for_watchdog.append(self.translation_task)
         
+        # the formatter must also wake up when a processor finishes, to notice the end of the stream
+        for task in processing_tasks_for_watchdog:
+            task.add_done_callback(lambda _: self._notify_change())
+        self._notify_change()
+
         # Monitor overall system health
         self.watchdog_task = asyncio.create_task(self.watchdog(processing_tasks_for_watchdog))
         self.all_tasks_for_cleanup.append(self.watchdog_task)
@@ -482,15 +818,32 @@ class AudioProcessor:
         return self.results_formatter()
 
     async def watchdog(self, tasks_to_monitor: List[asyncio.Task]) -> None:
-        """Monitors the health of critical processing tasks."""
+        """
+        Monitors the health of critical processing tasks: unexpected
+        completions, queue drops, and stalls detected from the heartbeats
+        of each task (see `check_stalls`).
+        """
         tasks_remaining: List[asyncio.Task] = [task for task in tasks_to_monitor if task]
+        reported_drops: dict = {}
+        interval = max(0.5, self.stall_threshold / 2) if self.stall_threshold > 0 else 10
         while True:
             try:
                 if not tasks_remaining:
                     logger.info("Watchdog task finishing: all monitored tasks completed.")
                     return
 
-                await asyncio.sleep(10)
+                await asyncio.sleep(interval)
+
+                for name, stats in self.queue_stats().items():
+                    if stats["dropped"] > reported_drops.get(name, 0):
+                        logger.warning(
+                            f"{name} queue overloaded: {stats['dropped']} chunks "
+                            f"({stats['dropped_seconds']:.1f}s of audio) dropped so far, depth {stats['depth']}"
+                        )
+                        reported_drops[name] = stats["dropped"]
+
+                if self.stall_threshold > 0 and not self.is_stopping:
+                    await self.check_stalls()
                 
                 for i, task in enumerate(list(tasks_remaining)):
                     if task.done():
@@ -507,6 +860,47 @@ class AudioProcessor:
                 break
             except Exception as e:
                 logger.error(f"Error in watchdog task: {e}", exc_info=True)
+
+    def _pending_for(self, name: str) -> Optional[float]:
+        """Seconds the oldest work waiting for the task has been waiting, None if there is none."""
+        if name == "ffmpeg_reader":
+            if self._ffmpeg_unread_since is None:
+                return None
+            return self.heartbeats[name].clock() - self._ffmpeg_unread_since
+        queue = {
+            "transcription": self.transcription_queue,
+            "diarization": self.diarization_queue,
+            "translation": self.translation_queue,
+        }[name]
+        return queue.oldest_wait if queue else None
+
+    async def check_stalls(self) -> None:
+        """Report the tasks stalled for more than `stall_threshold` seconds and apply the recovery actions."""
+        tasks = {
+            "ffmpeg_reader": self.ffmpeg_reader_task,
+            "transcription": self.transcription_task,
+            "diarization": self.diarization_task,
+            "translation": self.translation_task,
+        }
+        for name, heartbeat in self.heartbeats.items():
+            task = tasks[name]
+            if task is None or task.done():
+                continue
+            reason = heartbeat.check(self.stall_threshold, self._pending_for(name))
+            if reason is None:
+                continue
+            logger.warning(f"{name} stalled: {reason} (stall #{heartbeat.stalls} of this session)")
+            if name == "transcription" and "reset-asr" in self.stall_recovery:
+                # the stuck call cannot be interrupted: the buffer is reset when it returns
+                self._asr_reset_requested = True
+            elif name == "ffmpeg_reader" and "restart-ffmpeg" in self.stall_recovery and self.ffmpeg_manager:
+                logger.warning("Restarting FFmpeg after a stall.")
+                self._ffmpeg_unread_since = None
+                await self.ffmpeg_manager.restart()
+
+    def health_stats(self) -> dict:
+        """Heartbeat of every processing task of the session."""
+        return {name: heartbeat.stats() for name, heartbeat in self.heartbeats.items()}
         
     async def cleanup(self) -> None:
         """Clean up resources when processing is complete."""
@@ -542,16 +936,42 @@ class AudioProcessor:
         return all(task.done() for task in tasks_to_check if task)
 
 
+    def set_input_format(self, sample_rate: int, channels: int) -> None:
+        """
+        Declare the sample rate and channel count of raw PCM input, as negotiated
+        with the client. Input is then downmixed and resampled to 16 kHz mono in
+        process, before the ring buffer.
+        """
+        if not self.args.pcm_input:
+            raise ValueError("The input format can only be set for raw PCM input (--pcm-input).")
+        if not isinstance(sample_rate, int) or not MIN_INPUT_SAMPLE_RATE <= sample_rate <= MAX_INPUT_SAMPLE_RATE:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        if not isinstance(channels, int) or not 1 <= channels <= MAX_INPUT_CHANNELS:
+            raise ValueError(f"Unsupported channel count: {channels}")
+        if self.total_pcm_samples or len(self.pcm_buffer):
+            logger.warning("Input format changed after audio was received.")
+        if sample_rate == self.sample_rate and channels == self.channels:
+            self.input_converter = None
+        else:
+            self.input_converter = PCMInputConverter(sample_rate, channels, target_rate=self.sample_rate)
+        logger.info(f"PCM input format: {sample_rate} Hz, {channels} channel(s).")
+
     async def process_audio(self, message: Optional[bytes]) -> None:
         """Process incoming audio data."""
 
         if not self.beg_loop:
-            self.beg_loop = time()
+            self.beg_loop = self.clock()
             self.current_silence = Silence(start=0.0, is_starting=True)
             self.tokens_alignment.beg_loop = self.beg_loop
 
         if not message:
             logger.info("Empty audio message received, initiating stop sequence.")
+            if self.is_pcm_input and not self.is_stopping:
+                # the end of the last utterance: resampler tail and the last partial chunk
+                if self.opus_decoder:
+                    self.pcm_buffer.write(self.opus_decoder.flush())
+                while len(self.pcm_buffer) >= self.bytes_per_sample:
+                    await self.handle_pcm_data(flush=True)
             self.is_stopping = True
              
             if self.transcription_queue:
@@ -567,29 +987,38 @@ class AudioProcessor:
             return
 
         if self.is_pcm_input:
-            self.pcm_buffer.extend(message)
+            if self.opus_decoder:
+                with METRICS.timer("opus_decode"):
+                    message = self.opus_decoder.decode(message)
+            elif self.input_converter:
+                with METRICS.timer("resample"):
+                    message = self.input_converter.convert(message)
+            self.pcm_buffer.write(message)
             await self.handle_pcm_data()
         else:
             if not self.ffmpeg_manager:
                 logger.error("FFmpeg manager not initialized for non-PCM input.")
                 return
             success = await self.ffmpeg_manager.write_data(message)
-            if not success:
+            if success:
+                if self._ffmpeg_unread_since is None:
+                    self._ffmpeg_unread_since = self.heartbeats["ffmpeg_reader"].clock()
+            else:
                 ffmpeg_state = await self.ffmpeg_manager.get_state()
                 if ffmpeg_state == FFmpegState.FAILED:
                     logger.error("FFmpeg is in FAILED state, cannot process audio")
                 else:
                     logger.warning("Failed to write audio data to FFmpeg")
 
-    async def handle_pcm_data(self) -> None:
-        # Process when enough data
-        if len(self.pcm_buffer) < self.bytes_per_sec:
+    async def handle_pcm_data(self, flush: bool = False) -> None:
+        # Process when enough data, or whatever is left at the end of the stream
+        if len(self.pcm_buffer) < (self.bytes_per_sample if flush else self.bytes_per_sec):
             return
 
         if len(self.pcm_buffer) > self.max_bytes_per_sec:
             logger.warning(
                 f"Audio buffer too large: {len(self.pcm_buffer) / self.bytes_per_sec:.2f}s. "
-                f"Consider using a smaller model."
+                f"Consider using a smaller model{'' if self.chunk_controller else ' or --adaptive-chunk'}."
             )
 
         chunk_size = min(len(self.pcm_buffer), self.max_bytes_per_sec)
@@ -597,8 +1026,8 @@ class AudioProcessor:
         
         if aligned_chunk_size == 0:
             return
-        pcm_array = self.convert_pcm_to_float(self.pcm_buffer[:aligned_chunk_size])
-        self.pcm_buffer = self.pcm_buffer[aligned_chunk_size:]
+        # View on the ring buffer's reusable output: consumers that keep it must copy.
+        pcm_array = self.pcm_buffer.read_float(aligned_chunk_size)
 
         num_samples = len(pcm_array)
         chunk_sample_start = self.total_pcm_samples
@@ -606,7 +1035,8 @@ class AudioProcessor:
 
         res = None
         if self.args.vac:
-            res = self.vac(pcm_array)
+            with METRICS.timer("vad"):
+                res = await self.vac.process_chunk(pcm_array)
 
         if res is not None:
             if "start" in res and self.current_silence:
@@ -623,6 +1053,15 @@ class AudioProcessor:
         if not self.current_silence:
             await self._enqueue_active_audio(pcm_array)
 
+        if self.speculative_final and self.transcription_queue:
+            # speech probability has dropped, but not for min_silence_duration_ms yet
+            pending = bool(self.vac.triggered and self.vac.temp_end) and not self.current_silence
+            if pending != self._speech_end_pending:
+                self._speech_end_pending = pending
+                # a confirmed end needs no hint: the Silence event settles the speculation
+                if pending or not self.current_silence:
+                    await self.transcription_queue.put(SpeechEndHint(pending))
+
         self.total_pcm_samples = chunk_sample_end
 
         if not self.args.transcription and not self.args.diarization:
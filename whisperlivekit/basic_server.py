@@ -4,10 +4,13 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 
 from whisperlivekit import (AudioProcessor, TranscriptionEngine,
                             get_inline_ui_html, parse_args)
+from whisperlivekit.client_messages import handle_client_message
+from whisperlivekit.delta_updates import DeltaEncoder
+from whisperlivekit.metrics import METRICS
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logging.getLogger().setLevel(logging.WARNING)
@@ -23,7 +26,11 @@ async def lifespan(app: FastAPI):
     transcription_engine = TranscriptionEngine(
         **vars(args),
     )
+    if transcription_engine.ffmpeg_pool:
+        await transcription_engine.ffmpeg_pool.start()
     yield
+    if transcription_engine.ffmpeg_pool:
+        await transcription_engine.ffmpeg_pool.close()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -39,11 +46,19 @@ async def get():
     return HTMLResponse(get_inline_ui_html())
 
 
-async def handle_websocket_results(websocket, results_generator):
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms in Prometheus text format (empty unless --metrics is set)."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+async def handle_websocket_results(websocket, results_generator, delta_encoder=None):
     """Consumes results from the audio processor and sends them via WebSocket."""
     try:
         async for response in results_generator:
-            await websocket.send_json(response.to_dict())
+            with METRICS.timer("json_send"):
+                payload = delta_encoder.encode(response) if delta_encoder else response.to_dict()
+                await websocket.send_json(payload)
         # when the results_generator finishes it means all audio has been processed
         logger.info("Results generator finished. Sending 'ready_to_stop' to client.")
         await websocket.send_json({"type": "ready_to_stop"})
@@ -63,17 +78,31 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info("WebSocket connection opened.")
 
     try:
-        await websocket.send_json({"type": "config", "useAudioWorklet": bool(args.pcm_input)})
+        await websocket.send_json({
+            "type": "config",
+            "useAudioWorklet": bool(args.pcm_input),
+            "useOpusPackets": bool(args.opus_input),
+            # default raw PCM format; a client may announce another one with a config message
+            "sampleRate": 16000,
+            "channels": 1,
+            "deltaUpdates": bool(args.delta_updates),
+        })
     except Exception as e:
         logger.warning(f"Failed to send config to client: {e}")
             
     results_generator = await audio_processor.create_tasks()
-    websocket_task = asyncio.create_task(handle_websocket_results(websocket, results_generator))
+    delta_encoder = DeltaEncoder() if args.delta_updates else None
+    websocket_task = asyncio.create_task(handle_websocket_results(websocket, results_generator, delta_encoder))
 
     try:
         while True:
-            message = await websocket.receive_bytes()
-            await audio_processor.process_audio(message)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                await handle_client_message(websocket, audio_processor, delta_encoder, message["text"])
+                continue
+            await audio_processor.process_audio(message.get("bytes"))
     except KeyError as e:
         if 'bytes' in str(e):
             logger.warning(f"Client has closed the connection.")
@@ -124,6 +153,11 @@ def main():
     if args.forwarded_allow_ips:
         uvicorn_kwargs = { **uvicorn_kwargs, "forwarded_allow_ips" : args.forwarded_allow_ips }
 
+    if args.workers > 1:
+        from whisperlivekit.sharding import run_supervisor
+        run_supervisor(args, uvicorn_kwargs)
+        return
+
     uvicorn.run(**uvicorn_kwargs)
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveChunkController:
+    """
+    Per-session controller of the amount of audio accumulated before each
+    ASR iteration.
+
+    Multiplicative increase / multiplicative decrease on two signals, the
+    transcription backlog (lag beyond the audio accumulated for the chunk)
+    and the real-time factor of the last iteration:
+
+    - behind (backlog above `target_lag_s`, or the iteration took longer than the
+      audio it processed): chunk *= increase_factor, up to `max_chunk_s`.
+      Fewer, larger iterations amortize the fixed cost of each pass.
+    - headroom (backlog below half the target and the iteration took less than
+      `headroom` of the audio duration): chunk *= decrease_factor, down to
+      `min_chunk_s`, to cut latency again.
+    """
+
+    def __init__(
+        self,
+        min_chunk_s: float,
+        max_chunk_s: float,
+        target_lag_s: float = 1.0,
+        increase_factor: float = 1.5,
+        decrease_factor: float = 0.8,
+        headroom: float = 0.5,
+    ) -> None:
+        if max_chunk_s < min_chunk_s:
+            raise ValueError(f"max chunk size ({max_chunk_s}s) is below min chunk size ({min_chunk_s}s)")
+        self.min_chunk_s = min_chunk_s
+        self.max_chunk_s = max_chunk_s
+        self.target_lag_s = target_lag_s
+        self.increase_factor = increase_factor
+        self.decrease_factor = decrease_factor
+        self.headroom = headroom
+        self.chunk_s = min_chunk_s
+
+    def update(self, lag_s: float, iteration_s: float, audio_s: float) -> float:
+        """
+        Feed the measurements of one ASR iteration and return the new chunk size.
+
+        `lag_s` is the transcription lag when the iteration started, which
+        includes the `audio_s` held back to fill the chunk: only the rest is
+        backlog, otherwise a chunk larger than the target lag would always
+        count as behind and never shrink again.
+        """
+        previous = self.chunk_s
+        rtf = iteration_s / audio_s if audio_s > 0 else 0.0
+        lag_s = max(0.0, lag_s - audio_s)
+        if lag_s > self.target_lag_s or rtf > 1.0:
+            self.chunk_s = min(self.max_chunk_s, self.chunk_s * self.increase_factor)
+        elif lag_s < self.target_lag_s / 2 and rtf < self.headroom:
+            self.chunk_s = max(self.min_chunk_s, self.chunk_s * self.decrease_factor)
+        if self.chunk_s != previous:
+            logger.debug(
+                f"Chunk size {previous:.2f}s -> {self.chunk_s:.2f}s (lag={lag_s:.2f}s, rtf={rtf:.2f})"
+            )
+        return self.chunk_s
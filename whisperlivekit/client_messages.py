@@ -0,0 +1,34 @@
+import json
+import logging
+from typing import Optional
+
+from whisperlivekit.delta_updates import DeltaEncoder
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_client_message(websocket, audio_processor, delta_encoder: Optional[DeltaEncoder], text: str) -> None:
+    """
+    Applies a text message of a WebSocket client, for every server:
+      - {"type": "config", "sampleRate": int, "channels": int}: the input format of its raw PCM,
+        answered with a config_ack, or an error if it is not supported.
+      - {"type": "resync"}: a snapshot with the next update, after a missed delta.
+        Ignored when delta updates are off.
+    Any other message is answered with an error and changes nothing.
+    """
+    try:
+        config = json.loads(text)
+        message_type = config.get("type")
+        if message_type == "resync":
+            if delta_encoder:
+                delta_encoder.request_snapshot()
+            return
+        if message_type != "config":
+            raise ValueError(f"Unexpected message type: {message_type}")
+        sample_rate, channels = config.get("sampleRate", 16000), config.get("channels", 1)
+        audio_processor.set_input_format(sample_rate, channels)
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Rejected client message: {e}")
+        await websocket.send_json({"type": "error", "error": str(e)})
+        return
+    await websocket.send_json({"type": "config_ack", "sampleRate": sample_rate, "channels": channels})
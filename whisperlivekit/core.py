@@ -1,9 +1,14 @@
 import logging
+import os
 import sys
 from argparse import Namespace
 
+from whisperlivekit.backend_support import module_available
+from whisperlivekit.ffmpeg_manager import FFmpegPool
+from whisperlivekit.inference_executor import InferenceExecutor
 from whisperlivekit.local_agreement.online_asr import OnlineASRProcessor
 from whisperlivekit.local_agreement.whisper_online import backend_factory
+from whisperlivekit.metrics import METRICS
 from whisperlivekit.simul_whisper import SimulStreamingASR
 
 
@@ -38,6 +43,8 @@ class TranscriptionEngine:
             "vac": True,
             "vac_onnx": False,
             "vac_chunk_size": 0.04,
+            "vad_pregate": False,
+            "speculative_final": False,
             "log_level": "DEBUG",
             "ssl_certfile": None,
             "ssl_keyfile": None,
@@ -45,6 +52,24 @@ class TranscriptionEngine:
             "transcription": True,
             "vad": True,
             "pcm_input": False,
+            "opus_input": False,
+            "audio_decoder": "ffmpeg",
+            "ffmpeg_pool_size": 0,
+            "adaptive_chunk": False,
+            "max_chunk_size": 2.0,
+            "target_lag": 1.0,
+            "chunk_increase_factor": 1.5,
+            "chunk_decrease_factor": 0.8,
+            "metrics": False,
+            "asr_workers": 0,
+            "translation_workers": 0,
+            "torch_threads_per_worker": 0,
+            "workers": 1,
+            "min_results_interval": 0.05,
+            "max_queue_seconds": 0.0,
+            "queue_overload_policy": "drop_oldest",
+            "stall_threshold": 5.0,
+            "stall_recovery": [],
             "disable_punctuation_split" : False,
             "diarization_backend": "sortformer",
             "backend_policy": "simulstreaming",
@@ -75,18 +100,28 @@ class TranscriptionEngine:
             global_params['vac'] = not kwargs['no_vac']
 
         self.args = Namespace(**{**global_params, **transcription_common_params})
+        if self.args.pcm_input and self.args.opus_input:
+            raise ValueError("--pcm-input and --opus-input cannot be used together")
+        if self.args.audio_decoder == "pyav" and not self.args.pcm_input and not module_available("av"):
+            raise Exception('To use --audio-decoder pyav, you must install PyAV: `pip install av`')
+        if self.args.opus_input and not module_available("av"):
+            raise Exception('To use --opus-input, you must install PyAV: `pip install av`')
         
         self.asr = None
         self.tokenizer = None
         self.diarization = None
         self.vac_model = None
+        self.vad_service = None
         
         if self.args.vac:
             from whisperlivekit.silero_vad_iterator import load_silero_vad
+            from whisperlivekit.vad_service import VADService
 
             # Use ONNX if specified, otherwise use JIT (default)
             use_onnx = kwargs.get('vac_onnx', False)
             self.vac_model = load_silero_vad(onnx=use_onnx)
+            # sessions keep their own VAD state and share batched model calls
+            self.vad_service = VADService(self.vac_model)
         
         backend_policy = self.args.backend_policy
         if self.args.transcription:
@@ -104,6 +139,13 @@ class TranscriptionEngine:
                     "init_prompt": None,
                     "static_init_prompt": None,
                     "max_context_tokens": None,
+                    "encoder_batch_size": 1,
+                    "encoder_batch_window_ms": 20.0,
+                    "encoder_batch_fairness": "fifo",
+                    "encoder_bucket_s": 0.0,
+                    "decoder_batch_size": 1,
+                    "decoder_batch_window_ms": 2.0,
+                    "shared_model": None,
                 }
                 simulstreaming_params = update_with_kwargs(simulstreaming_params, kwargs)
                 
@@ -169,6 +211,41 @@ class TranscriptionEngine:
                 }
                 translation_params = update_with_kwargs(translation_params, kwargs)
                 self.translation_model = load_model([self.args.lan], **translation_params) #in the future we want to handle different languages for different speakers
+
+        # 0 workers: blocking calls go through asyncio.to_thread, as before
+        torch_threads = self.args.torch_threads_per_worker or None
+        # a batched encoder pass or decoder step blocks its worker thread until the batch runs:
+        # with fewer threads than the batch size, a batch never fills and every call waits the full window
+        batch_sizes = [
+            getattr(self.asr, size, 1) or 1
+            for batcher, size in (("encoder_batcher", "encoder_batch_size"), ("decoder_batcher", "decoder_batch_size"))
+            if getattr(self.asr, batcher, None) is not None
+        ]
+        max_batch_size = max(batch_sizes, default=1)
+        asr_threads = self.args.asr_workers or min(32, (os.cpu_count() or 1) + 4)  # asyncio's default pool
+        if self.asr is not None and max_batch_size > asr_threads:
+            logger.warning(
+                f"Batch size {max_batch_size} is larger than the {asr_threads} ASR worker threads, so batches could never fill: "
+                f"using --asr-workers {max_batch_size}."
+            )
+            self.args.asr_workers = max_batch_size
+        self.asr_executor = None
+        self.translation_executor = None
+        if self.asr is not None and self.args.asr_workers > 0:
+            self.asr_executor = InferenceExecutor("asr", self.args.asr_workers, torch_threads)
+        if self.translation_model is not None and self.args.translation_workers > 0:
+            self.translation_executor = InferenceExecutor("translation", self.args.translation_workers, torch_threads)
+
+        self.ffmpeg_pool = None
+        uses_ffmpeg = not (self.args.pcm_input or self.args.opus_input) and self.args.audio_decoder == "ffmpeg"
+        if self.args.ffmpeg_pool_size > 0 and uses_ffmpeg:
+            self.ffmpeg_pool = FFmpegPool(self.args.ffmpeg_pool_size)
+
+        METRICS.configure(
+            enabled=self.args.metrics,
+            backend=getattr(self.asr, "encoder_backend", None) or getattr(self.asr, "backend_choice", None) or self.args.backend,
+            policy=backend_policy,
+        )
         TranscriptionEngine._initialized = True
 
 
@@ -0,0 +1,109 @@
+from time import time
+from typing import Any, Dict, List, Optional
+
+from whisperlivekit.timed_objects import FrontData
+
+SNAPSHOT_FIELDS = (
+    'status',
+    'buffer_transcription',
+    'buffer_diarization',
+    'buffer_translation',
+    'remaining_time_transcription',
+    'remaining_time_diarization',
+    'effective_chunk_size',
+)
+
+
+class DeltaEncoder:
+    """
+    Turns the FrontData responses of one session into delta messages.
+
+    A line is identified by its index in `lines`, which is stable: lines are
+    appended, and only the ones after `FrontData.n_final_lines` can still be
+    rewritten. Final lines are serialized once, when they become final, and
+    never compared again: each response only serializes and compares the
+    lines after them. A delta message carries the lines that changed since
+    the previous message, the new number of lines, and the scalar fields that
+    changed. A full snapshot is sent first, when the client asks for one
+    after missing a message (`request_snapshot`), and every
+    `snapshot_interval` seconds if one is given.
+    """
+
+    def __init__(self, snapshot_interval: Optional[float] = None) -> None:
+        self.snapshot_interval = snapshot_interval
+        self.seq = 0
+        # serialized final lines, and the number of FrontData lines they come from
+        self._final_lines: List[Dict[str, Any]] = []
+        self._n_final_segments = 0
+        # serialized lines after the final ones, as last sent
+        self._open_lines: List[Dict[str, Any]] = []
+        self._fields: Dict[str, Any] = {}
+        self._last_snapshot: Optional[float] = None
+
+    def request_snapshot(self) -> None:
+        """Send a full snapshot with the next message."""
+        self._last_snapshot = None
+
+    def encode(self, response: FrontData) -> Dict[str, Any]:
+        self.seq += 1
+        fields = self._scalar_fields(response)
+        if response.error and not response.lines:
+            # error notice outside of the transcript (FFmpeg, overload): the lines are unchanged
+            message = {'type': 'delta', 'seq': self.seq, 'n_lines': len(self._final_lines) + len(self._open_lines)}
+            message.update((key, value) for key, value in fields.items() if value != self._fields.get(key))
+            message['error'] = fields['error']
+            self._fields = fields
+            return message
+
+        if len(response.lines) < self._n_final_segments:
+            # transcript rebuilt from scratch
+            self._final_lines, self._open_lines, self._n_final_segments = [], [], 0
+            self.request_snapshot()
+        # id of the first line compared, and the lines sent from there on
+        first_open, previous = len(self._final_lines), self._open_lines
+        n_final = min(max(response.n_final_lines, self._n_final_segments), len(response.lines))
+        if n_final > self._n_final_segments:
+            self._final_lines.extend(FrontData(lines=response.lines[self._n_final_segments:n_final]).line_dicts())
+            self._n_final_segments = n_final
+        self._open_lines = response.line_dicts(n_final)
+        # the lines from first_open on, final or not, as they are now
+        current = self._final_lines[first_open:] + self._open_lines
+
+        now = time()
+        if self._last_snapshot is None or (
+            self.snapshot_interval is not None and now - self._last_snapshot >= self.snapshot_interval
+        ):
+            message = {'type': 'snapshot', 'seq': self.seq, 'lines': self._final_lines + self._open_lines, **fields}
+            self._last_snapshot = now
+        else:
+            message = self._delta(fields, first_open, previous, current)
+        self._fields = fields
+        return message
+
+    @staticmethod
+    def _scalar_fields(response: FrontData) -> Dict[str, Any]:
+        """The fields of `FrontData.to_dict` other than the lines."""
+        fields = {key: getattr(response, key) for key in SNAPSHOT_FIELDS}
+        if not response.effective_chunk_size:
+            del fields['effective_chunk_size']
+        if response.error:
+            fields['error'] = response.error
+        return fields
+
+    def _delta(
+        self, fields: Dict[str, Any], first_open: int, previous: List[Dict[str, Any]], current: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        changed = [
+            {'id': first_open + i, **line}
+            for i, line in enumerate(current)
+            if i >= len(previous) or previous[i] != line
+        ]
+        message: Dict[str, Any] = {'type': 'delta', 'seq': self.seq, 'n_lines': first_open + len(current)}
+        if changed:
+            message['lines'] = changed
+        for key in SNAPSHOT_FIELDS:
+            if fields.get(key) != self._fields.get(key):
+                message[key] = fields.get(key)
+        if 'error' in fields:
+            message['error'] = fields['error']
+        return message
@@ -171,9 +171,10 @@ class SortformerDiarizationOnline:
         logger.debug(f"Inserted silence of {silence_duration:.2f}s, new offset: {self.global_time_offset:.2f}s")
 
     def insert_audio_chunk(self, pcm_array: np.ndarray):
+        # pcm_array is a read-only chunk shared with the ASR: keep references, never write to it
         if self.debug:
-            self.audio_buffer.append(pcm_array.copy())
-        self.buffer_audio = np.concatenate([self.buffer_audio, pcm_array.copy()])
+            self.audio_buffer.append(pcm_array)
+        self.buffer_audio = np.concatenate([self.buffer_audio, pcm_array])
   
 
     async def diarize(self):
@@ -265,6 +266,33 @@ class SortformerDiarizationOnline:
             )
         return new_segments
                 
+    def snapshot_state(self) -> dict:
+        """Streaming model state and audio not diarized yet, for session_snapshot."""
+        with self.segment_lock:
+            global_time_offset = self.global_time_offset
+        return {
+            "streaming_state": dict(vars(self.streaming_state)),
+            "total_preds": self.total_preds,
+            "previous_chunk_features": self._previous_chunk_features,
+            "buffer_audio": self.buffer_audio.copy(),
+            "global_time_offset": global_time_offset,
+            "chunk_index": self._chunk_index,
+            "len_prediction": self._len_prediction,
+        }
+
+    def restore_state(self, saved: dict) -> None:
+        device = self.diar_model.device
+        for name, value in saved["streaming_state"].items():
+            setattr(self.streaming_state, name, value.to(device) if isinstance(value, torch.Tensor) else value)
+        self.total_preds = saved["total_preds"].to(device)
+        previous = saved["previous_chunk_features"]
+        self._previous_chunk_features = previous.to(device) if previous is not None else None
+        self.buffer_audio = saved["buffer_audio"]
+        with self.segment_lock:
+            self.global_time_offset = saved["global_time_offset"]
+        self._chunk_index = saved["chunk_index"]
+        self._len_prediction = saved["len_prediction"]
+
     def get_segments(self) -> List[SpeakerSegment]:
         """Get a copy of the current speaker segments."""
         with self.segment_lock:
@@ -9,10 +9,13 @@ from typing import Optional
 import torch
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 from whisperlivekit import AudioProcessor, TranscriptionEngine, parse_args
+from whisperlivekit.client_messages import handle_client_message
+from whisperlivekit.delta_updates import DeltaEncoder
+from whisperlivekit.metrics import METRICS
 from whisperlivekit.enhanced_ui import get_enhanced_ui_html
 
 logging.basicConfig(level=logging.INFO)
@@ -33,7 +36,7 @@ class TranscriptionResponse(BaseModel):
     language: Optional[str] = None
     segments: list = []
 
-def release_gpu_resources():
+async def release_gpu_resources():
     """真正释放 GPU 资源"""
     global transcription_engine
     
@@ -42,6 +45,17 @@ def release_gpu_resources():
     
     logger.info("Releasing GPU resources...")
     
+    # 停止推理线程池
+    for executor_name in ('asr_executor', 'translation_executor'):
+        executor = getattr(transcription_engine, executor_name, None)
+        if executor:
+            executor.shutdown()
+
+    # 关闭预热的 FFmpeg 进程池，等待补充任务结束、空闲进程退出后再释放模型
+    ffmpeg_pool = getattr(transcription_engine, 'ffmpeg_pool', None)
+    if ffmpeg_pool:
+        await ffmpeg_pool.close()
+
     # 删除模型引用
     if hasattr(transcription_engine, 'asr') and transcription_engine.asr:
         del transcription_engine.asr
@@ -70,7 +84,7 @@ async def check_idle_timeout():
             async with resource_lock:
                 if transcription_engine and time.time() - last_activity_time > idle_timeout:
                     logger.info(f"Idle timeout ({idle_timeout}s) reached, releasing GPU resources")
-                    release_gpu_resources()
+                    await release_gpu_resources()
 
 async def ensure_model_loaded():
     """懒加载：确保模型已加载"""
@@ -94,7 +108,8 @@ async def lifespan(app: FastAPI):
     asyncio.create_task(check_idle_timeout())
     yield
     # 关闭时释放资源
-    release_gpu_resources()
+    async with resource_lock:
+        await release_gpu_resources()
 
 app = FastAPI(
     title="WhisperLiveKit API",
@@ -140,6 +155,12 @@ async def health_check():
         **gpu_info
     }
 
+@app.get("/metrics")
+async def metrics():
+    """各处理阶段的延迟直方图（Prometheus 文本格式，需 --metrics 开启）"""
+    # 不更新 last_activity_time：定期抓取不应阻止空闲释放模型
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/api/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio(file: UploadFile = File(...)):
     """
@@ -173,15 +194,27 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info("WebSocket connection opened")
     
     try:
-        await websocket.send_json({"type": "config", "useAudioWorklet": bool(args.pcm_input)})
+        await websocket.send_json({
+            "type": "config",
+            "useAudioWorklet": bool(args.pcm_input),
+            "useOpusPackets": bool(args.opus_input),
+            # 默认的 PCM 格式，客户端可以发送 config 消息声明其他采样率和声道数
+            "sampleRate": 16000,
+            "channels": 1,
+            "deltaUpdates": bool(args.delta_updates),
+        })
     except Exception as e:
         logger.warning(f"Failed to send config: {e}")
     
     results_generator = await audio_processor.create_tasks()
     
+    delta_encoder = DeltaEncoder() if args.delta_updates else None
+
     async def handle_results():
         async for response in results_generator:
-            await websocket.send_json(response.to_dict())
+            with METRICS.timer("json_send"):
+                payload = delta_encoder.encode(response) if delta_encoder else response.to_dict()
+                await websocket.send_json(payload)
             last_activity_time = time.time()
         await websocket.send_json({"type": "ready_to_stop"})
     
@@ -189,8 +222,14 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         while True:
-            message = await websocket.receive_bytes()
-            await audio_processor.process_audio(message)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                # 客户端的文本消息：PCM 输入格式声明或 delta 重新同步请求
+                await handle_client_message(websocket, audio_processor, delta_encoder, message["text"])
+                continue
+            await audio_processor.process_audio(message.get("bytes"))
             last_activity_time = time.time()
     except (KeyError, WebSocketDisconnect):
         logger.info("WebSocket disconnected")
@@ -1,8 +1,11 @@
 import asyncio
 import contextlib
 import logging
+from collections import Counter, deque
 from enum import Enum
-from typing import Callable, Optional
+from typing import Callable, Deque, List, Optional, Tuple
+
+from whisperlivekit.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -36,19 +39,147 @@ class FFmpegState(Enum):
     RESTARTING = "restarting"
     FAILED = "failed"
 
+async def spawn_ffmpeg(sample_rate: int, channels: int) -> asyncio.subprocess.Process:
+    """Start an ffmpeg process decoding any container on stdin to s16le PCM on stdout."""
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "pipe:1"
+    ]
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+
+class FFmpegPool:
+    """
+    Idle ffmpeg processes spawned ahead of time, so that connecting sessions
+    and restarts do not wait for a fork/exec.
+
+    A process decodes a single stream: a session takes one at connect time and
+    only gives it back if it never wrote to it. A background task refills the
+    pool to `size` idle processes after each checkout, one spawn at a time so
+    that a connection burst does not turn into a burst of forks.
+    """
+
+    def __init__(self, size: int, sample_rate: int = 16000, channels: int = 1) -> None:
+        self.size = size
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._idle: Deque[asyncio.subprocess.Process] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self.checkouts: Counter = Counter()
+        METRICS.add_collector(self.metric_samples)
+
+    async def start(self) -> None:
+        """Start refilling in the running loop. Called on first use, or at startup to pre-warm."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # processes spawned by a previous event loop cannot be used from this one
+            for process in self._idle:
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+            self._idle.clear()
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._refill_task = loop.create_task(self._refill())
+        self._wakeup.set()
+
+    async def acquire(self) -> asyncio.subprocess.Process:
+        await self.start()
+        while self._idle:
+            process = self._idle.popleft()
+            if process.returncode is None:
+                self.checkouts["warm"] += 1
+                self._wakeup.set()
+                return process
+        self.checkouts["cold"] += 1
+        self._wakeup.set()
+        return await spawn_ffmpeg(self.sample_rate, self.channels)
+
+    def release(self, process: asyncio.subprocess.Process) -> bool:
+        """Give back a process that never received data. Returns False if the caller must close it."""
+        if process.returncode is not None or len(self._idle) >= self.size:
+            return False
+        if self._loop is not asyncio.get_running_loop():
+            return False
+        self._idle.append(process)
+        return True
+
+    async def _refill(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while len(self._idle) < self.size:
+                try:
+                    self._idle.append(await spawn_ffmpeg(self.sample_rate, self.channels))
+                except FileNotFoundError:
+                    logger.error(ERROR_INSTALL_INSTRUCTIONS)
+                    return
+                except Exception as e:
+                    logger.error(f"Error pre-spawning FFmpeg: {e}")
+                    break
+
+    async def close(self) -> None:
+        METRICS.remove_collector(self.metric_samples)
+        if self._refill_task:
+            self._refill_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refill_task
+            self._refill_task = None
+        while self._idle:
+            process = self._idle.popleft()
+            if process.stdin and not process.stdin.is_closing():
+                process.stdin.close()
+            await process.wait()
+
+    def metric_samples(self) -> List[Tuple[str, str, str, float]]:
+        return [
+            ("whisperlivekit_ffmpeg_pool_idle", "gauge", "", len(self._idle)),
+            ("whisperlivekit_ffmpeg_pool_checkouts_total", "counter", 'result="warm"', self.checkouts["warm"]),
+            ("whisperlivekit_ffmpeg_pool_checkouts_total", "counter", 'result="cold"', self.checkouts["cold"]),
+        ]
+
+
 class FFmpegManager:
-    def __init__(self, sample_rate: int = 16000, channels: int = 1):
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, pool: Optional[FFmpegPool] = None):
         self.sample_rate = sample_rate
         self.channels = channels
+        self.pool = pool
 
         self.process: Optional[asyncio.subprocess.Process] = None
+        self._written = False
+        self._reading = False
+        self._restarting = False
         self._stderr_task: Optional[asyncio.Task] = None
 
         self.on_error_callback: Optional[Callable[[str], None]] = None
 
+        # wakes read_available() when the process it was reading exits or is replaced
+        self._state_changed = asyncio.Event()
         self.state = FFmpegState.STOPPED
         self._state_lock = asyncio.Lock()
 
+    @property
+    def state(self) -> FFmpegState:
+        return self._state
+
+    @state.setter
+    def state(self, value: FFmpegState) -> None:
+        self._state = value
+        self._state_changed.set()
+
     async def start(self) -> bool:
         async with self._state_lock:
             if self.state != FFmpegState.STOPPED:
@@ -57,24 +188,11 @@ class FFmpegManager:
             self.state = FFmpegState.STARTING
 
         try:
-            cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel", "error",
-                "-i", "pipe:0",
-                "-f", "s16le",
-                "-acodec", "pcm_s16le",
-                "-ac", str(self.channels),
-                "-ar", str(self.sample_rate),
-                "pipe:1"
-            ]
-
-            self.process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            if self.pool is not None:
+                self.process = await self.pool.acquire()
+            else:
+                self.process = await spawn_ffmpeg(self.sample_rate, self.channels)
+            self._written = False
 
             self._stderr_task = asyncio.create_task(self._drain_stderr())
 
@@ -106,6 +224,16 @@ class FFmpegManager:
                 return
             self.state = FFmpegState.STOPPED
 
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._stderr_task
+            self._stderr_task = None
+
+        # a pending read_available() would keep reading the stdout of a process given back to the pool
+        if (self.process and not self._written and not self._reading
+                and self.pool is not None and self.pool.release(self.process)):
+            self.process = None
         if self.process:
             if self.process.stdin and not self.process.stdin.is_closing():
                 self.process.stdin.close()
@@ -113,11 +241,6 @@ class FFmpegManager:
             await self.process.wait()
             self.process = None
 
-        if self._stderr_task:
-            self._stderr_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._stderr_task
-
         logger.info("FFmpeg stopped.")
 
     async def write_data(self, data: bytes) -> bool:
@@ -127,6 +250,7 @@ class FFmpegManager:
                 return False
 
         try:
+            self._written = True
             self.process.stdin.write(data)
             await self.process.stdin.drain()
             return True
@@ -157,6 +281,33 @@ class FFmpegManager:
                 await self.on_error_callback("read_error")
             return None
 
+    async def read_available(self, max_size: int) -> bytes:
+        """
+        Wait until decoded PCM is available and return it, up to `max_size` bytes.
+
+        Returns b"" once FFmpeg is stopped or failed and its output is drained.
+        Unlike `read_data`, this takes no lock and sets no timeout: a single
+        reader can await it in a loop, woken by pipe readiness only. A restart
+        is transparent: reading continues on the new process.
+        """
+        self._reading = True
+        try:
+            while True:
+                process = self.process
+                if process is not None:
+                    data = await process.stdout.read(max_size)
+                    if data:
+                        return data
+                    if process is not self.process:
+                        continue
+                if not self._restarting and self.state in (FFmpegState.STOPPED, FFmpegState.FAILED):
+                    return b""
+                # the process exited on its own, or is being replaced
+                self._state_changed.clear()
+                await self._state_changed.wait()
+        finally:
+            self._reading = False
+
     async def get_state(self) -> FFmpegState:
         async with self._state_lock:
             return self.state
@@ -170,9 +321,10 @@ class FFmpegManager:
 
         logger.info("Restarting FFmpeg...")
 
+        self._restarting = True
         try:
             await self.stop()
-            await asyncio.sleep(1)  # short delay before restarting
+            # with a pool, start() takes an already running process
             return await self.start()
         except Exception as e:
             logger.error(f"Error during FFmpeg restart: {e}")
@@ -181,6 +333,9 @@ class FFmpegManager:
             if self.on_error_callback:
                 await self.on_error_callback("restart_failed")
             return False
+        finally:
+            self._restarting = False
+            self._state_changed.set()
 
     async def _drain_stderr(self):
         try:
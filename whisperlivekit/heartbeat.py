@@ -0,0 +1,91 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from whisperlivekit.metrics import METRICS
+
+# stalls detected per task, over all sessions of the process
+STALL_COUNTS: Counter = Counter()
+_stall_lock = threading.Lock()
+
+
+def _stall_samples() -> List[Tuple[str, str, str, float]]:
+    with _stall_lock:
+        return [
+            ("whisperlivekit_task_stalls_total", "counter", f'task="{task}"', count)
+            for task, count in sorted(STALL_COUNTS.items())
+        ]
+
+
+METRICS.add_collector(_stall_samples)
+
+
+class Heartbeat:
+    """
+    Liveness of one processing loop of a session.
+
+    The loop calls `beat()` each time it makes progress and wraps its long
+    blocking operations in `operation(name)`. The watchdog then calls
+    `check()`: the loop is stalled when an operation has been running for
+    more than the threshold, or when work has been waiting for it that long
+    and it has not made progress since. The wait is measured from when the
+    work arrived, not from the last beat, so a loop that was idle is not
+    reported as soon as new work comes in. Each stall is reported once, until the loop
+    makes progress again.
+    """
+
+    def __init__(self, name: str, clock: Callable[[], float] = monotonic) -> None:
+        self.name = name
+        self.clock = clock
+        self.last_beat = clock()
+        self.operation_name: Optional[str] = None
+        self.operation_start: Optional[float] = None
+        self.stalls = 0
+        self.stalled = False
+
+    def beat(self) -> None:
+        self.last_beat = self.clock()
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        self.operation_name = name
+        self.operation_start = self.clock()
+        try:
+            yield
+        finally:
+            self.operation_name = None
+            self.operation_start = None
+            self.beat()
+
+    def check(self, threshold: float, pending_for: Optional[float]) -> Optional[str]:
+        """
+        Return the reason of a new stall, None if the loop is healthy or the stall was already reported.
+        `pending_for` is how long the oldest work waiting for the loop has been waiting, None if there is none.
+        """
+        now = self.clock()
+        if self.operation_start is not None and now - self.operation_start > threshold:
+            reason = f"{self.operation_name} running for {now - self.operation_start:.1f}s"
+        elif pending_for is not None and min(pending_for, now - self.last_beat) > threshold:
+            reason = f"no progress for {min(pending_for, now - self.last_beat):.1f}s with work pending"
+        else:
+            self.stalled = False
+            return None
+        if self.stalled:
+            return None
+        self.stalled = True
+        self.stalls += 1
+        with _stall_lock:
+            STALL_COUNTS[self.name] += 1
+        return reason
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            "since_last_beat": round(now - self.last_beat, 3),
+            "operation": self.operation_name,
+            "operation_age": round(now - self.operation_start, 3) if self.operation_start is not None else None,
+            "stalled": self.stalled,
+            "stalls": self.stalls,
+        }
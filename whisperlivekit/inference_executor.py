@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import queue
+import threading
+from itertools import count
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from whisperlivekit.metrics import METRICS
+
+try:
+    import torch
+except ImportError:  # mlx-only installs
+    torch = None
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_FINAL = 0        # start_silence / is_last: commits text the user is waiting for
+PRIORITY_SPECULATIVE = 1  # regular process_iter calls
+
+_STOP = object()
+
+
+class InferenceExecutor:
+    """
+    Fixed-size pool of worker threads for blocking model calls, shared by all
+    sessions using the same model.
+
+    Unlike asyncio.to_thread, the pool is sized per model and each worker
+    limits torch intra-op parallelism to `torch_threads`, so that
+    n_workers * torch_threads can be kept within the number of cores.
+    Pending calls are served by priority, then in submission order.
+    """
+
+    def __init__(self, name: str, n_workers: int, torch_threads: Optional[int] = None) -> None:
+        self.name = name
+        self.n_workers = max(1, n_workers)
+        self.torch_threads = torch_threads
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = count()
+        self._lock = threading.Lock()
+        self._started_at = perf_counter()
+        self._busy_s = 0.0
+        self._n_tasks = 0
+        self._wait_s = 0.0
+        self._max_wait_s = 0.0
+        self._workers: List[threading.Thread] = []
+        for i in range(self.n_workers):
+            worker = threading.Thread(target=self._worker, name=f"{name}-inference-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        METRICS.add_collector(self.metric_samples)
+        logger.info(
+            f"{name} inference executor: {self.n_workers} workers, "
+            f"{torch_threads or 'default'} torch threads per worker"
+        )
+
+    def _worker(self) -> None:
+        if torch is not None and self.torch_threads:
+            # with OpenMP builds this only limits the parallel regions started from this thread
+            torch.set_num_threads(self.torch_threads)
+        while True:
+            _, _, task = self._queue.get()
+            if task is _STOP:
+                return
+            fn, args, loop, future, submitted_at = task
+            started_at = perf_counter()
+            wait_s = started_at - submitted_at
+            METRICS.observe(f"{self.name}_executor_wait", wait_s)
+            try:
+                result, error = fn(*args), None
+            except BaseException as e:
+                result, error = None, e
+            with self._lock:
+                self._busy_s += perf_counter() - started_at
+                self._n_tasks += 1
+                self._wait_s += wait_s
+                self._max_wait_s = max(self._max_wait_s, wait_s)
+            try:
+                loop.call_soon_threadsafe(self._set_result, future, result, error)
+            except RuntimeError:  # the session's loop is already closed
+                pass
+
+    @staticmethod
+    def _set_result(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def run(self, fn: Callable, *args: Any, priority: int = PRIORITY_SPECULATIVE) -> Any:
+        """Run `fn(*args)` on a worker and return its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((priority, next(self._seq), (fn, args, loop, future, perf_counter())))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = perf_counter() - self._started_at
+            return {
+                "workers": self.n_workers,
+                "pending": self._queue.qsize(),
+                "tasks": self._n_tasks,
+                "utilization": round(self._busy_s / (elapsed * self.n_workers), 4) if elapsed > 0 else 0.0,
+                "mean_wait_s": round(self._wait_s / self._n_tasks, 4) if self._n_tasks else 0.0,
+                "max_wait_s": round(self._max_wait_s, 4),
+            }
+
+    def metric_samples(self) -> List[Tuple[str, str, str, float]]:
+        stats = self.stats()
+        labels = f'executor="{self.name}"'
+        return [
+            ("whisperlivekit_executor_utilization", "gauge", labels, stats["utilization"]),
+            ("whisperlivekit_executor_pending", "gauge", labels, stats["pending"]),
+            ("whisperlivekit_executor_tasks_total", "counter", labels, stats["tasks"]),
+        ]
+
+    def shutdown(self) -> None:
+        METRICS.remove_collector(self.metric_samples)
+        for _ in self._workers:
+            # after any pending call
+            self._queue.put((PRIORITY_SPECULATIVE + 1, next(self._seq), _STOP))
@@ -4,6 +4,8 @@ from typing import List, Optional, Tuple
 
 import numpy as np
 
+from whisperlivekit import session_snapshot as snapshot
+from whisperlivekit.metrics import METRICS
 from whisperlivekit.timed_objects import ASRToken, Sentence, Transcript
 
 logger = logging.getLogger(__name__)
@@ -173,6 +175,15 @@ class OnlineASRProcessor:
 
         self.global_time_offset += silence_duration
 
+    def skip_audio(self, resume_time: float):
+        """
+        Continue after audio dropped under overload: nothing is inserted for the gap,
+        the buffer starts over at `resume_time`. Committed tokens stay as prompt.
+        """
+        committed = self.committed
+        self.init(offset=resume_time)
+        self.committed = committed
+
     def insert_silence(self, silence_duration, offset):
         """
         Backwards compatibility shim for legacy callers that still use insert_silence.
@@ -208,7 +219,53 @@ class OnlineASRProcessor:
         Get the unvalidated buffer in string format.
         """
         return self.concatenate_tokens(self.transcript_buffer.buffer)
-        
+
+    def reset_buffer(self):
+        """Drop the audio and hypothesis not committed yet, e.g. after a stall. Committed tokens stay as prompt."""
+        committed = self.committed
+        self.init(offset=self.get_audio_buffer_end_time())
+        self.committed = committed
+
+    def snapshot_state(self) -> dict:
+        """Audio buffer, hypothesis buffer and committed tokens, for session_snapshot."""
+        saved = self.checkpoint()
+        saved["audio_buffer"] = snapshot.pcm16(self.audio_buffer)
+        return saved
+
+    def restore_state(self, saved: dict) -> None:
+        self.rollback({**saved, "audio_buffer": snapshot.from_pcm16(saved["audio_buffer"])})
+
+    def checkpoint(self) -> dict:
+        """
+        In-memory copy of the state, to roll back a speculative pass. The audio
+        buffer is only ever replaced, never written in place, so it is shared.
+        """
+        hypothesis = self.transcript_buffer
+        return {
+            "audio_buffer": self.audio_buffer,
+            "buffer_time_offset": self.buffer_time_offset,
+            "global_time_offset": self.global_time_offset,
+            "time_of_last_asr_output": self.time_of_last_asr_output,
+            "committed": list(self.committed),
+            "hypothesis": {
+                "committed_in_buffer": list(hypothesis.committed_in_buffer),
+                "buffer": list(hypothesis.buffer),
+                "new": list(hypothesis.new),
+                "last_committed_time": hypothesis.last_committed_time,
+                "last_committed_word": hypothesis.last_committed_word,
+            },
+        }
+
+    def rollback(self, saved: dict) -> None:
+        self.init()
+        self.audio_buffer = saved["audio_buffer"]
+        self.buffer_time_offset = saved["buffer_time_offset"]
+        self.global_time_offset = saved["global_time_offset"]
+        self.time_of_last_asr_output = saved["time_of_last_asr_output"]
+        self.committed = saved["committed"]
+        for key, value in saved["hypothesis"].items():
+            setattr(self.transcript_buffer, key, value)
+
 
     def process_iter(self) -> Tuple[List[ASRToken], float]:
         """
@@ -221,7 +278,8 @@ class OnlineASRProcessor:
         logger.debug(
             f"Transcribing {len(self.audio_buffer)/self.SAMPLING_RATE:.2f} seconds from {self.buffer_time_offset:.2f}"
         )
-        res = self.asr.transcribe(self.audio_buffer, init_prompt=prompt_text)
+        with METRICS.timer("asr_transcribe"):
+            res = self.asr.transcribe(self.audio_buffer, init_prompt=prompt_text)
         tokens = self.asr.ts_words(res)
         self.transcript_buffer.insert(tokens, self.buffer_time_offset)
         committed_tokens = self.transcript_buffer.flush()
@@ -0,0 +1,125 @@
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+# Latency buckets in seconds, from sub-millisecond VAD calls to multi-second encoder passes.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+METRIC_NAME = "whisperlivekit_stage_duration_seconds"
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Latency histogram with Prometheus-style upper-bound buckets, sum and count."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "StageMetrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.stage, perf_counter() - self.start)
+
+
+class StageMetrics:
+    """
+    Per-stage latency histograms of the processing pipeline, shared by all sessions.
+
+    Disabled by default: `timer` then returns a shared no-op context manager and
+    `observe` returns immediately, so instrumented code paths cost one attribute
+    check. Durations are wall-clock; on GPU, asynchronous kernels may be
+    accounted to the stage that waits for them.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.labels: Dict[str, str] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        # callables returning (metric name, type, labels, value) samples, e.g. executor gauges
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, float]]]] = []
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, backend: str = "", policy: str = "") -> None:
+        self.enabled = enabled
+        self.labels = {"backend": backend, "policy": policy}
+
+    def timer(self, stage: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, str, str, float]]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], List[Tuple[str, str, str, float]]]) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each processing stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        base_labels = ",".join(f'{k}="{v}"' for k, v in self.labels.items())
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}"' + (f",{base_labels}" if base_labels else "")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+            collectors = list(self._collectors)
+
+        samples: Dict[Tuple[str, str], List[str]] = {}
+        for collector in collectors:
+            for name, kind, labels, value in collector():
+                samples.setdefault((name, kind), []).append(f"{name}{{{labels}}} {value}")
+        for (name, kind), family in samples.items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+
+METRICS = StageMetrics()
@@ -0,0 +1,73 @@
+"""
+Decoder of the --opus-input stream: raw Opus packets sent without any
+container, each prefixed with its length as a big-endian uint16.
+
+Packets are decoded in process with PyAV's Opus decoder and resampled to
+16 kHz mono s16le for the PCM ring buffer, so neither a container nor an
+ffmpeg subprocess is involved. A packet may be split across websocket
+messages, and several packets may share one message.
+"""
+
+import logging
+import struct
+
+logger = logging.getLogger(__name__)
+
+try:
+    import av
+except ImportError:
+    av = None
+
+LENGTH_PREFIX = struct.Struct(">H")
+OPUS_SAMPLE_RATE = 48000
+
+
+class OpusPacketDecoder:
+    def __init__(self, sample_rate: int = 16000, channels: int = 1) -> None:
+        if av is None:
+            raise ImportError("--opus-input requires PyAV: `pip install av`")
+        layout = "mono" if channels == 1 else "stereo"
+        self._codec = av.CodecContext.create("opus", "r")
+        # without a container there is no OpusHead: the stream layout must be given
+        self._codec.sample_rate = OPUS_SAMPLE_RATE
+        self._codec.layout = layout
+        self._resampler = av.AudioResampler(format="s16", layout=layout, rate=sample_rate)
+        self._pending = bytearray()
+        self.packets = 0
+        self.corrupted_packets = 0
+
+    def decode(self, message: bytes) -> bytes:
+        """Decode the complete packets of `message`, keeping a trailing partial packet for the next call."""
+        self._pending += message
+        pcm = []
+        offset = 0
+        while len(self._pending) - offset >= LENGTH_PREFIX.size:
+            (length,) = LENGTH_PREFIX.unpack_from(self._pending, offset)
+            end = offset + LENGTH_PREFIX.size + length
+            if end > len(self._pending):
+                break
+            packet = bytes(self._pending[offset + LENGTH_PREFIX.size:end])
+            offset = end
+            if length:
+                pcm.extend(self._decode_packet(packet))
+        del self._pending[:offset]
+        return b"".join(pcm)
+
+    def _decode_packet(self, packet: bytes):
+        self.packets += 1
+        try:
+            frames = self._codec.decode(av.Packet(packet))
+        except av.error.FFmpegError as e:
+            # a lost or damaged packet is a gap, not the end of the stream
+            self.corrupted_packets += 1
+            logger.warning(f"Dropping undecodable Opus packet ({len(packet)} bytes): {e}")
+            return []
+        return [
+            out.to_ndarray().tobytes()
+            for frame in frames
+            for out in self._resampler.resample(frame)
+        ]
+
+    def flush(self) -> bytes:
+        """Drain the samples still buffered in the resampler, at the end of the stream."""
+        return b"".join(out.to_ndarray().tobytes() for out in self._resampler.resample(None))
@@ -2,7 +2,7 @@
 from argparse import ArgumentParser
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = ArgumentParser(description="Whisper FastAPI Online Server")
     parser.add_argument(
         "--host",
@@ -159,6 +159,22 @@ def parse_args():
     parser.add_argument(
         "--vac-chunk-size", type=float, default=0.04, help="VAC sample size in seconds."
     )
+    parser.add_argument(
+        "--vad-pregate",
+        action="store_true",
+        default=False,
+        dest="vad_pregate",
+        help="Skip the Silero VAD on clearly silent windows, detected from the energy of each speech band relative to its adaptive noise "
+        "floor. Skip rate and agreement with Silero on sampled windows are exported on /metrics.",
+    )
+    parser.add_argument(
+        "--speculative-final",
+        action="store_true",
+        default=False,
+        dest="speculative_final",
+        help="Start the final ASR pass of an utterance as soon as the VAD speech probability drops, instead of after the minimum "
+        "silence duration. The result is discarded if speech resumes. Requires the VAD.",
+    )
 
     parser.add_argument(
         "--no-vad",
@@ -196,6 +212,146 @@ def parse_args():
         default=False,
         help="If set, raw PCM (s16le) data is expected as input and FFmpeg will be bypassed. Frontend will use AudioWorklet instead of MediaRecorder."
     )
+    parser.add_argument(
+        "--opus-input",
+        action="store_true",
+        default=False,
+        dest="opus_input",
+        help="If set, raw Opus packets, each prefixed with its length as a big-endian uint16, are expected as input and decoded in process "
+        "with PyAV (`pip install av`), without FFmpeg. Frontend will encode with WebCodecs instead of MediaRecorder.",
+    )
+    parser.add_argument(
+        "--audio-decoder",
+        type=str,
+        default="ffmpeg",
+        choices=["ffmpeg", "pyav"],
+        dest="audio_decoder",
+        help="Decoder of compressed input (WebM/Ogg): one ffmpeg subprocess per connection, or in-process decoding with PyAV (`pip install av`), "
+        "which avoids the process spawn at connect time. Ignored with --pcm-input.",
+    )
+    parser.add_argument(
+        "--ffmpeg-pool-size",
+        type=int,
+        default=0,
+        dest="ffmpeg_pool_size",
+        help="Number of idle ffmpeg processes kept ready for new connections and restarts, refilled in the background. 0 spawns one per connection.",
+    )
+    parser.add_argument(
+        "--adaptive-chunk",
+        action="store_true",
+        default=False,
+        dest="adaptive_chunk",
+        help="Adapt the audio accumulated before each ASR iteration to the transcription lag of each session, between --min-chunk-size and --max-chunk-size.",
+    )
+    parser.add_argument(
+        "--max-chunk-size",
+        type=float,
+        default=2.0,
+        dest="max_chunk_size",
+        help="Upper bound of the effective chunk size with --adaptive-chunk, in seconds.",
+    )
+    parser.add_argument(
+        "--target-lag",
+        type=float,
+        default=1.0,
+        dest="target_lag",
+        help="With --adaptive-chunk, the chunk size grows above this transcription lag (seconds) and shrinks below half of it.",
+    )
+    parser.add_argument(
+        "--chunk-increase-factor",
+        type=float,
+        default=1.5,
+        dest="chunk_increase_factor",
+        help="With --adaptive-chunk, multiplier applied to the chunk size when the ASR falls behind.",
+    )
+    parser.add_argument(
+        "--chunk-decrease-factor",
+        type=float,
+        default=0.8,
+        dest="chunk_decrease_factor",
+        help="With --adaptive-chunk, multiplier applied to the chunk size when there is headroom.",
+    )
+    parser.add_argument(
+        "--asr-workers",
+        type=int,
+        default=0,
+        dest="asr_workers",
+        help="Number of worker threads running ASR model calls for all sessions. 0 uses asyncio's default thread pool. A batched encoder pass or decoder step holds its thread until the batch runs, so a batch holds at most this many sessions: it is raised to --encoder-batch-size / --decoder-batch-size when they are larger.",
+    )
+    parser.add_argument(
+        "--translation-workers",
+        type=int,
+        default=0,
+        dest="translation_workers",
+        help="Number of worker threads running translation model calls for all sessions. 0 uses asyncio's default thread pool.",
+    )
+    parser.add_argument(
+        "--torch-threads-per-worker",
+        type=int,
+        default=0,
+        dest="torch_threads_per_worker",
+        help="torch intra-op threads of each ASR/translation worker. Keep workers x threads within the number of cores. 0 keeps torch's default.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        dest="workers",
+        help="Number of server processes. Above 1, a supervisor listening on --host/--port routes each new session to the least loaded "
+        "worker process (listening on the next ports, on 127.0.0.1). SimulStreaming whisper weights are loaded once and shared between workers.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        default=False,
+        dest="metrics",
+        help="Record per-stage latency histograms and expose them at /metrics in Prometheus text format.",
+    )
+    parser.add_argument(
+        "--delta-updates",
+        action="store_true",
+        default=False,
+        dest="delta_updates",
+        help="Send only the transcript lines that changed instead of the whole transcript on every update. A full snapshot is sent first, and again when the client reports a missed update with {\"type\": \"resync\"}.",
+    )
+    parser.add_argument(
+        "--min-results-interval",
+        type=float,
+        default=0.05,
+        dest="min_results_interval",
+        help="Minimum seconds between two transcript updates sent to a client. Updates arriving faster are coalesced.",
+    )
+    parser.add_argument(
+        "--max-queue-seconds",
+        type=float,
+        default=0.0,
+        dest="max_queue_seconds",
+        help="Maximum seconds of audio waiting in the transcription and diarization queues of a session. 0 means unbounded.",
+    )
+    parser.add_argument(
+        "--queue-overload-policy",
+        type=str,
+        default="drop_oldest",
+        choices=["drop_oldest", "merge", "reject"],
+        dest="queue_overload_policy",
+        help="What to do when --max-queue-seconds is exceeded: drop the oldest audio and mark the gap, merge into the queued chunk (lossless, no latency bound), or reject the session.",
+    )
+    parser.add_argument(
+        "--stall-threshold",
+        type=float,
+        default=5.0,
+        dest="stall_threshold",
+        help="Seconds after which a session task is reported as stalled: a model call still running, or work waiting without progress. 0 disables stall detection.",
+    )
+    parser.add_argument(
+        "--stall-recovery",
+        nargs="*",
+        default=[],
+        choices=["reset-asr", "restart-ffmpeg"],
+        dest="stall_recovery",
+        help="Actions taken on a stall: reset-asr drops the ASR buffer once the stuck call returns; restart-ffmpeg restarts a starved FFmpeg "
+        "(the client must then resend a stream header for container formats such as WebM).",
+    )
     # SimulStreaming-specific arguments
     simulstreaming_group = parser.add_argument_group('SimulStreaming arguments (only used with --backend simulstreaming)')
 
@@ -295,6 +451,56 @@ def parse_args():
         help="Max context tokens for the model. Default is 0.",
     )
     
+    simulstreaming_group.add_argument(
+        "--encoder-batch-size",
+        type=int,
+        default=1,
+        dest="encoder_batch_size",
+        help="Max number of sessions whose encoder passes are run as one batched forward pass. 1 disables cross-session batching. Only used with the native whisper encoder.",
+    )
+
+    simulstreaming_group.add_argument(
+        "--encoder-batch-window-ms",
+        type=float,
+        default=20.0,
+        dest="encoder_batch_window_ms",
+        help="How long the first session waits for others to join an encoder batch, in milliseconds.",
+    )
+
+    simulstreaming_group.add_argument(
+        "--encoder-batch-fairness",
+        type=str,
+        default="fifo",
+        choices=["fifo", "round_robin"],
+        dest="encoder_batch_fairness",
+        help="Order in which waiting sessions fill an encoder batch: arrival order, or least recently served session first.",
+    )
+
+    simulstreaming_group.add_argument(
+        "--encoder-bucket-s",
+        type=float,
+        default=0.0,
+        dest="encoder_bucket_s",
+        help="Run the encoder on the audio buffer padded to the next multiple of this many seconds, instead of always padding it to 30 s. "
+        "Inputs of the same bucket are batched together. 0 keeps the full 30 s padding. Only used with the native whisper encoder.",
+    )
+
+    simulstreaming_group.add_argument(
+        "--decoder-batch-size",
+        type=int,
+        default=1,
+        dest="decoder_batch_size",
+        help="Max number of sessions whose decoding steps share one decoder forward pass (continuous batching). 1 disables it. Requires --beams 1.",
+    )
+
+    simulstreaming_group.add_argument(
+        "--decoder-batch-window-ms",
+        type=float,
+        default=2.0,
+        dest="decoder_batch_window_ms",
+        help="How long a decoding step waits for other sessions to join the batch, in milliseconds.",
+    )
+
     simulstreaming_group.add_argument(
         "--model-path",
         type=str,
@@ -317,7 +523,7 @@ def parse_args():
         help="600M or 1.3B",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     args.transcription = not args.no_transcription
     args.vad = not args.no_vad    
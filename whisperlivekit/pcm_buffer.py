@@ -0,0 +1,159 @@
+import logging
+import threading
+import weakref
+from collections import Counter
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from whisperlivekit.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = 2
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+# chunks handed out by share_chunk and not released yet, over all sessions of the process
+SHARED_CHUNKS: Counter = Counter()
+_shared_lock = threading.Lock()
+
+
+def _shared_chunk_samples() -> List[Tuple[str, str, str, float]]:
+    with _shared_lock:
+        counts = dict(SHARED_CHUNKS)
+    return [
+        ("whisperlivekit_shared_pcm_chunks", "gauge", "", counts.get("live", 0)),
+        ("whisperlivekit_shared_pcm_bytes", "gauge", "", counts.get("live_bytes", 0)),
+        ("whisperlivekit_shared_pcm_chunks_total", "counter", "", counts.get("shared", 0)),
+    ]
+
+
+METRICS.add_collector(_shared_chunk_samples)
+
+
+def _release_chunk(nbytes: int) -> None:
+    with _shared_lock:
+        SHARED_CHUNKS["live"] -= 1
+        SHARED_CHUNKS["live_bytes"] -= nbytes
+
+
+def share_chunk(pcm_chunk: np.ndarray) -> np.ndarray:
+    """
+    Copy a chunk once into a read-only array that every consumer may reference.
+
+    The array is released when its last reference is dropped (queue item, ASR
+    segment tensor, diarization buffer, or any view on it), through CPython's
+    reference counting: consumers never release it explicitly, so none of them
+    can free memory another still reads. The release is tracked, and live
+    chunks and bytes are exported on /metrics to show that they are returned.
+    """
+    shared = pcm_chunk.copy()
+    shared.flags.writeable = False
+    with _shared_lock:
+        SHARED_CHUNKS["live"] += 1
+        SHARED_CHUNKS["live_bytes"] += shared.nbytes
+        SHARED_CHUNKS["shared"] += 1
+    weakref.finalize(shared, _release_chunk, shared.nbytes)
+    return shared
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity ring buffer for s16le PCM ingest.
+
+    Bytes are written into a preallocated bytearray and read back as float32
+    samples converted in place into a reusable output buffer. The array returned
+    by `read_float` is a view on that buffer: it is only valid until the next
+    read, so consumers that keep it must copy it.
+    """
+
+    def __init__(self, capacity_bytes: int, max_read_bytes: int) -> None:
+        capacity_bytes = max(capacity_bytes, max_read_bytes, BYTES_PER_SAMPLE)
+        self._capacity = self._aligned(capacity_bytes, round_up=True)
+        self._storage = bytearray(self._capacity)
+        self._bytes = np.frombuffer(self._storage, dtype=np.uint8)
+        self._samples = np.frombuffer(self._storage, dtype=np.int16)
+        self._out = np.empty(self._aligned(max_read_bytes, round_up=True) // BYTES_PER_SAMPLE, dtype=np.float32)
+        self._read_pos = 0
+        self._size = 0
+
+    @staticmethod
+    def _aligned(n_bytes: int, round_up: bool = False) -> int:
+        if round_up:
+            n_bytes += BYTES_PER_SAMPLE - 1
+        return (n_bytes // BYTES_PER_SAMPLE) * BYTES_PER_SAMPLE
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_read_bytes(self) -> int:
+        return len(self._out) * BYTES_PER_SAMPLE
+
+    def clear(self) -> None:
+        self._read_pos = 0
+        self._size = 0
+
+    def _grow(self, needed: int) -> None:
+        new_capacity = self._capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        logger.warning(
+            f"PCM ring buffer overflow: growing from {self._capacity} to {new_capacity} bytes."
+        )
+        data = self.peek_bytes()
+        self._capacity = new_capacity
+        self._storage = bytearray(new_capacity)
+        self._bytes = np.frombuffer(self._storage, dtype=np.uint8)
+        self._samples = np.frombuffer(self._storage, dtype=np.int16)
+        self._bytes[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        self._read_pos = 0
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """Append raw bytes, growing the storage only if the buffer would overflow."""
+        n = len(data)
+        if n == 0:
+            return
+        if self._size + n > self._capacity:
+            self._grow(self._size + n)
+        src = np.frombuffer(data, dtype=np.uint8)
+        write_pos = (self._read_pos + self._size) % self._capacity
+        first = min(n, self._capacity - write_pos)
+        self._bytes[write_pos:write_pos + first] = src[:first]
+        if first < n:
+            self._bytes[:n - first] = src[first:]
+        self._size += n
+
+    def peek_bytes(self) -> bytes:
+        """Return a copy of the buffered bytes without consuming them."""
+        end = self._read_pos + self._size
+        if end <= self._capacity:
+            return bytes(self._storage[self._read_pos:end])
+        return bytes(self._storage[self._read_pos:]) + bytes(self._storage[:end - self._capacity])
+
+    def read_float(self, n_bytes: int) -> np.ndarray:
+        """
+        Consume up to `n_bytes` (rounded down to whole samples) and return them
+        as normalized float32 samples, as a view on the reusable output buffer.
+        """
+        n_bytes = self._aligned(min(n_bytes, self._size, self.max_read_bytes))
+        n_samples = n_bytes // BYTES_PER_SAMPLE
+        out = self._out[:n_samples]
+        if n_samples == 0:
+            return out
+        # read_pos and capacity are both sample-aligned, so both halves are too.
+        start = self._read_pos // BYTES_PER_SAMPLE
+        first = min(n_samples, (self._capacity - self._read_pos) // BYTES_PER_SAMPLE)
+        out[:first] = self._samples[start:start + first]
+        if first < n_samples:
+            out[first:] = self._samples[:n_samples - first]
+        out *= INT16_SCALE
+        self._read_pos = (self._read_pos + n_bytes) % self._capacity
+        self._size -= n_bytes
+        if self._size == 0:
+            self._read_pos = 0
+        return out
@@ -0,0 +1,222 @@
+"""
+In-process audio decoding with PyAV (libav bindings), as an alternative to
+one `ffmpeg` subprocess per connection.
+
+`PyAVDecoderManager` has the same interface as `FFmpegManager`. The bytes
+written by the client are fed to a blocking file-like object read by one
+decoder thread per session, which demuxes the WebM/Ogg stream incrementally,
+decodes and resamples it to s16le mono, and hands the PCM back to the event
+loop. No process is forked at connect time, and there is no pipe I/O.
+"""
+
+import asyncio
+import io
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from whisperlivekit.ffmpeg_manager import FFmpegState
+
+logger = logging.getLogger(__name__)
+
+try:
+    import av
+except ImportError:
+    av = None
+
+
+class _FeedReader(io.RawIOBase):
+    """Non-seekable, blocking file object fed from the event loop and read by the decoder thread."""
+
+    def __init__(self) -> None:
+        self._chunks: Deque[bytes] = deque()
+        self._offset = 0
+        self._eof = False
+        self._cond = threading.Condition()
+
+    def feed(self, data: bytes) -> None:
+        with self._cond:
+            self._chunks.append(bytes(data))
+            self._cond.notify()
+
+    def end(self) -> None:
+        with self._cond:
+            self._eof = True
+            self._cond.notify()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readinto(self, buffer) -> int:
+        with self._cond:
+            while not self._chunks and not self._eof:
+                self._cond.wait()
+            if not self._chunks:
+                return 0
+            chunk = self._chunks[0]
+            n = min(len(buffer), len(chunk) - self._offset)
+            buffer[:n] = chunk[self._offset:self._offset + n]
+            self._offset += n
+            if self._offset == len(chunk):
+                self._chunks.popleft()
+                self._offset = 0
+            return n
+
+
+class PyAVDecoderManager:
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, read_timeout: float = 20.0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.read_timeout = read_timeout
+
+        self.on_error_callback: Optional[Callable[[str], None]] = None
+
+        self.state = FFmpegState.STOPPED
+        self._state_lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[_FeedReader] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pcm = bytearray()
+        self._pcm_ready = asyncio.Event()
+        self._decoder_done = False
+        self._restarting = False
+
+    async def start(self) -> bool:
+        async with self._state_lock:
+            if self.state != FFmpegState.STOPPED:
+                logger.warning(f"PyAV decoder already running in state: {self.state}")
+                return False
+            self.state = FFmpegState.STARTING
+
+        if av is None:
+            logger.error("PyAV is not installed: `pip install av`, or use --audio-decoder ffmpeg.")
+            async with self._state_lock:
+                self.state = FFmpegState.FAILED
+            if self.on_error_callback:
+                await self.on_error_callback("pyav_not_found")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._reader = _FeedReader()
+        self._pcm = bytearray()
+        self._pcm_ready.clear()
+        self._decoder_done = False
+        self._thread = threading.Thread(target=self._decode, args=(self._reader,), name="pyav-decoder", daemon=True)
+        self._thread.start()
+
+        async with self._state_lock:
+            self.state = FFmpegState.RUNNING
+        logger.info("PyAV decoder started.")
+        return True
+
+    def _decode(self, reader: _FeedReader) -> None:
+        """Decoder thread: demux and decode until the input ends."""
+        error = None
+        try:
+            layout = "mono" if self.channels == 1 else "stereo"
+            resampler = av.AudioResampler(format="s16", layout=layout, rate=self.sample_rate)
+            with av.open(reader, mode="r") as container:
+                stream = container.streams.audio[0]
+                for frame in container.decode(stream):
+                    for out in resampler.resample(frame):
+                        self._deliver(out.to_ndarray().tobytes())
+                for out in resampler.resample(None):
+                    self._deliver(out.to_ndarray().tobytes())
+        except Exception as e:
+            error = e
+        finally:
+            self._loop.call_soon_threadsafe(self._on_decoder_done, error)
+
+    def _deliver(self, data: bytes) -> None:
+        self._loop.call_soon_threadsafe(self._on_pcm, data)
+
+    def _on_pcm(self, data: bytes) -> None:
+        self._pcm += data
+        self._pcm_ready.set()
+
+    def _on_decoder_done(self, error: Optional[Exception]) -> None:
+        self._decoder_done = True
+        self._pcm_ready.set()
+        # errors on a truncated stream after stop() are expected
+        if error is not None and self.state == FFmpegState.RUNNING:
+            logger.error(f"PyAV decoding error: {error}")
+            self.state = FFmpegState.FAILED
+            if self.on_error_callback:
+                asyncio.ensure_future(self.on_error_callback("decode_error"))
+
+    async def stop(self):
+        async with self._state_lock:
+            if self.state == FFmpegState.STOPPED:
+                return
+            self.state = FFmpegState.STOPPED
+
+        if self._reader:
+            self._reader.end()
+        if self._thread:
+            # the decoder drains what was fed and exits at end of input
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        logger.info("PyAV decoder stopped.")
+
+    async def write_data(self, data: bytes) -> bool:
+        async with self._state_lock:
+            if self.state != FFmpegState.RUNNING:
+                logger.warning(f"Cannot write, PyAV decoder state: {self.state}")
+                return False
+        self._reader.feed(data)
+        return True
+
+    async def read_data(self, size: int) -> Optional[bytes]:
+        async with self._state_lock:
+            if self.state != FFmpegState.RUNNING:
+                logger.warning(f"Cannot read, PyAV decoder state: {self.state}")
+                return None
+
+        if not self._pcm and not self._decoder_done:
+            try:
+                await asyncio.wait_for(self._pcm_ready.wait(), timeout=self.read_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("PyAV decoder read timeout.")
+                return None
+        data = bytes(self._pcm[:size])
+        del self._pcm[:size]
+        if not self._pcm:
+            self._pcm_ready.clear()
+        return data
+
+    async def read_available(self, max_size: int) -> bytes:
+        """Wait for decoded PCM and return it, up to `max_size` bytes. b"" once the decoder has finished."""
+        while True:
+            if self._pcm:
+                data = bytes(self._pcm[:max_size])
+                del self._pcm[:max_size]
+                return data
+            if self._decoder_done and not self._restarting:
+                return b""
+            self._pcm_ready.clear()
+            await self._pcm_ready.wait()
+
+    async def get_state(self) -> FFmpegState:
+        async with self._state_lock:
+            return self.state
+
+    async def restart(self) -> bool:
+        async with self._state_lock:
+            if self.state == FFmpegState.RESTARTING:
+                logger.warning("Restart already in progress.")
+                return False
+            self.state = FFmpegState.RESTARTING
+
+        logger.info("Restarting PyAV decoder...")
+        # no process to respawn: a new container is opened on the next bytes
+        self._restarting = True
+        try:
+            await self.stop()
+            return await self.start()
+        finally:
+            self._restarting = False
+            self._pcm_ready.set()
@@ -0,0 +1,283 @@
+"""
+Offline replay of an audio file through the full AudioProcessor pipeline.
+
+The processor runs on an injected clock instead of wall-clock time:
+
+- as fast as possible (default): a VirtualClock advances by the duration of
+  each chunk, and the pipeline is drained before the next chunk is fed.
+  Emission latencies then only depend on the streaming policy, not on the
+  hardware, and are reproducible run to run.
+- `--speed N`: chunks are fed at N x realtime on a ScaledClock, so the
+  latencies also include compute time, as in a live session.
+
+The results formatter coalesces updates over `--min-results-interval` of
+the same clock, so responses are paced as in a live session in both modes.
+
+`--migrate-at T` snapshots the session after T seconds of audio and continues
+on a new processor restored from the snapshot, as a live migration would; the
+report then includes the snapshot size and the snapshot/restore times.
+
+The report also gives the mean wait between a confirmed end of speech and
+its final tokens (compare with and without --speculative-final); it only
+reflects compute time with `--speed`.
+
+    python -m whisperlivekit.replay audio.wav --output responses.jsonl [server options]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from whisperlivekit.audio_processor import AudioProcessor
+from whisperlivekit.core import TranscriptionEngine
+from whisperlivekit.metrics import METRICS
+from whisperlivekit.timed_objects import FrontData
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class VirtualClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+        # coroutines waiting in sleep(), e.g. the results formatter coalescing updates
+        self.sleepers = 0
+        self._advanced: Optional[asyncio.Event] = None
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+        if self._advanced:
+            self._advanced.set()
+
+    async def sleep(self, seconds: float) -> None:
+        """Wait until the clock has been advanced by `seconds`."""
+        if self._advanced is None:
+            self._advanced = asyncio.Event()
+        target = self.now + seconds
+        self.sleepers += 1
+        try:
+            while self.now < target:
+                self._advanced.clear()
+                await self._advanced.wait()
+        finally:
+            self.sleepers -= 1
+
+
+class ScaledClock:
+    """Wall clock running `speed` times faster, starting at 0."""
+
+    def __init__(self, speed: float) -> None:
+        self.speed = speed
+        self._origin = time.perf_counter()
+
+    def __call__(self) -> float:
+        return (time.perf_counter() - self._origin) * self.speed
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds / self.speed)
+
+
+@dataclass
+class ReplayReport:
+    audio_duration_s: float
+    wall_s: float
+    cpu_s: float
+    rtf: float
+    n_words: int
+    n_responses: int
+    latency_mean_s: float
+    latency_p50_s: float
+    latency_p90_s: float
+    latency_max_s: float
+    snapshot_bytes: int = 0
+    snapshot_ms: float = 0.0
+    restore_ms: float = 0.0
+    # wall-clock wait between a confirmed end of speech and its final tokens (the "finalize" stage)
+    n_finalizations: int = 0
+    finalize_mean_ms: float = 0.0
+    # (stream time of emission, response)
+    responses: List[Tuple[float, Dict[str, Any]]] = field(default_factory=list, repr=False)
+    # (word, end of the word in the audio, stream time of emission)
+    words: List[Tuple[str, float, float]] = field(default_factory=list, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k not in ("responses", "words")}
+
+
+def _finalize_totals() -> Tuple[int, float]:
+    histogram = METRICS._histograms.get("finalize")
+    return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+
+async def _settle(processor: AudioProcessor, clock: VirtualClock) -> None:
+    """
+    Wait until every queued chunk has been processed and the last change was formatted,
+    or is held back by the formatter until the clock advances (coalescing).
+    """
+    queues = [q for q in (processor.transcription_queue, processor.diarization_queue, processor.translation_queue) if q]
+    while True:
+        for _ in range(3):
+            await asyncio.sleep(0)
+        if (
+            not any(q.qsize() for q in queues)
+            and processor.inflight_calls == 0
+            and (not processor.state_changed.is_set() or clock.sleepers)
+        ):
+            return
+        await asyncio.sleep(0.001)
+
+
+async def _drain(processor: AudioProcessor, collector: asyncio.Task, clock: VirtualClock) -> None:
+    """
+    Wait for the results of a stopping processor. On a VirtualClock, time goes on
+    while the pipeline drains, so that the last coalescing wait of the formatter elapses.
+    """
+    while not collector.done():
+        await _settle(processor, clock)
+        clock.advance(max(processor.min_results_interval, 0.01))
+        await asyncio.wait([collector], timeout=0.001)
+
+
+async def replay(
+    processor: AudioProcessor,
+    audio: np.ndarray,
+    clock,
+    speed: Optional[float] = None,
+    chunk_s: float = 0.1,
+    migrate_at: Optional[float] = None,
+) -> ReplayReport:
+    """
+    Feed `audio` (float32, 16 kHz mono) to a processor created with
+    `clock=clock` and pcm input, and record every response it produces.
+    `speed=None` replays as fast as possible on a VirtualClock.
+    `migrate_at` moves the session to a new processor, through a snapshot,
+    after that many seconds of audio.
+    """
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    chunk_bytes = int(chunk_s * SAMPLE_RATE) * 2
+    responses: List[Tuple[float, FrontData]] = []
+    words: List[Tuple[str, float, float]] = []
+    migration: Dict[str, Any] = {}
+
+    async def collect(processor: AudioProcessor, results_generator) -> None:
+        async for response in results_generator:
+            # clocks start with the audio, and token times are positions in the audio
+            now = clock()
+            responses.append((now, response))
+            tokens = processor.state.tokens
+            # a restored processor starts with the tokens seen before the migration
+            for token in tokens[len(words):]:
+                words.append((token.text, token.end, now))
+
+    async def migrate(processor: AudioProcessor, collector: asyncio.Task):
+        start = time.perf_counter()
+        data = await processor.snapshot()
+        migration["snapshot_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        migration["snapshot_bytes"] = len(data)
+        await processor.cleanup()
+        if speed is None:
+            await _drain(processor, collector, clock)
+        await collector
+        restored = AudioProcessor(transcription_engine=TranscriptionEngine(), clock=clock)  # the engine is a singleton
+        start = time.perf_counter()
+        restored.restore(data)
+        migration["restore_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return restored, asyncio.create_task(collect(restored, await restored.create_tasks()))
+
+    finalize_count, finalize_sum = _finalize_totals()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    results_generator = await processor.create_tasks()
+    collector = asyncio.create_task(collect(processor, results_generator))
+
+    for offset in range(0, len(pcm), chunk_bytes):
+        chunk = pcm[offset:offset + chunk_bytes]
+        chunk_end = (offset + len(chunk)) / 2 / SAMPLE_RATE
+        if migrate_at is not None and not migration and offset / 2 / SAMPLE_RATE >= migrate_at:
+            processor, collector = await migrate(processor, collector)
+        if speed is None:
+            clock.advance(len(chunk) / 2 / SAMPLE_RATE)
+            await processor.process_audio(chunk)
+            await _settle(processor, clock)
+        else:
+            # the chunk is only available once it has been "recorded"
+            delay = (chunk_end - clock()) / speed
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await processor.process_audio(chunk)
+
+    await processor.process_audio(b"")
+    if speed is None:
+        await _drain(processor, collector, clock)
+    await collector
+    await processor.cleanup()
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+    finalize_count, finalize_sum = (a - b for a, b in zip(_finalize_totals(), (finalize_count, finalize_sum)))
+
+    audio_duration = len(audio) / SAMPLE_RATE
+    latencies = np.array([emitted - end for _, end, emitted in words]) if words else np.zeros(1)
+    return ReplayReport(
+        audio_duration_s=round(audio_duration, 3),
+        wall_s=round(wall_s, 3),
+        cpu_s=round(cpu_s, 3),
+        rtf=round(wall_s / audio_duration, 4) if audio_duration else 0.0,
+        n_words=len(words),
+        n_responses=len(responses),
+        latency_mean_s=round(float(latencies.mean()), 3),
+        latency_p50_s=round(float(np.percentile(latencies, 50)), 3),
+        latency_p90_s=round(float(np.percentile(latencies, 90)), 3),
+        latency_max_s=round(float(latencies.max()), 3),
+        n_finalizations=finalize_count,
+        finalize_mean_ms=round(finalize_sum / finalize_count * 1000, 2) if finalize_count else 0.0,
+        **migration,
+        responses=[(t, r.to_dict()) for t, r in responses],
+        words=words,
+    )
+
+
+def main() -> None:
+    from whisperlivekit.parse_args import parse_args
+    from whisperlivekit.warmup import load_file
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio_file")
+    parser.add_argument("--speed", type=float, default=None, help="Replay at N x realtime instead of as fast as possible.")
+    parser.add_argument("--chunk-ms", type=float, default=100.0, help="Size of the audio messages sent to the processor.")
+    parser.add_argument("--output", default=None, help="Write every response with its stream time to this JSONL file.")
+    parser.add_argument("--migrate-at", type=float, default=None, help="Move the session to a new processor through a snapshot after this many seconds of audio.")
+    replay_args, server_argv = parser.parse_known_args()
+
+    args = parse_args(server_argv)
+    args.pcm_input = True  # bypass FFmpeg: its output pacing depends on wall-clock time
+    args.metrics = True  # for the finalize stage of the report
+    engine = TranscriptionEngine(**vars(args))
+
+    audio = load_file(replay_args.audio_file)
+    if audio is None:
+        raise SystemExit(f"Could not load {replay_args.audio_file}")
+
+    clock = VirtualClock() if replay_args.speed is None else ScaledClock(replay_args.speed)
+    processor = AudioProcessor(transcription_engine=engine, clock=clock)
+    report = asyncio.run(replay(processor, audio, clock, replay_args.speed, replay_args.chunk_ms / 1000.0, replay_args.migrate_at))
+
+    if replay_args.output:
+        with open(replay_args.output, "w") as f:
+            for stream_time, response in report.responses:
+                f.write(json.dumps({"t": round(stream_time, 3), **response}) + "\n")
+    print(json.dumps(report.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
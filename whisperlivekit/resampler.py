@@ -0,0 +1,80 @@
+import logging
+from math import gcd
+from typing import Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = 2
+
+
+class StreamingResampler:
+    """
+    Polyphase rational resampler for a stream of float32 chunks.
+
+    The rate ratio is reduced to up/down; a Kaiser-windowed sinc low-pass is
+    split into `up` phases, and each output sample is the dot product of one
+    phase with the last input samples. The input tail is carried between
+    chunks, so the output of a stream is the same however it is chunked.
+    All output samples of a chunk are computed in one vectorized pass.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_width: int = 16, beta: float = 8.0, rolloff: float = 0.95) -> None:
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        # taps per phase, in input samples: wider when decimating, to keep the transition band narrow
+        self.taps = 2 * half_width * max(1, -(-self.down // self.up))
+        n = self.up * self.taps
+        # cutoff relative to the upsampled Nyquist frequency
+        cutoff = rolloff / max(self.up, self.down)
+        t = np.arange(n) - (n - 1) / 2
+        h = self.up * cutoff * np.sinc(cutoff * t) * np.kaiser(n, beta)
+        # phases[p, j] = h[p + j * up], reversed so that a window of input in time order can be used directly
+        self._phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        self._window = np.arange(self.taps)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        # position of the next output sample on the upsampled grid, relative to the start of the next chunk
+        self._next = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        n_in = len(samples)
+        if n_in == 0:
+            return np.zeros(0, dtype=np.float32)
+        buf = np.concatenate((self._history, samples.astype(np.float32, copy=False)))
+        positions = np.arange(self._next, n_in * self.up, self.down)
+        # input sample positions // up ends the window, which starts taps - 1 samples before it in buf
+        windows = buf[(positions // self.up)[:, None] + self._window]
+        out = np.einsum("nk,nk->n", self._phases[positions % self.up], windows)
+        self._next = (positions[-1] + self.down if len(positions) else self._next) - n_in * self.up
+        self._history = buf[len(buf) - (self.taps - 1):]
+        return out
+
+
+class PCMInputConverter:
+    """
+    Converts interleaved s16le PCM at any rate and channel count into 16 kHz
+    mono s16le, keeping partial frames and resampler state between messages.
+    """
+
+    def __init__(self, sample_rate: int, channels: int, target_rate: int = 16000) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = BYTES_PER_SAMPLE * channels
+        self.resampler = StreamingResampler(sample_rate, target_rate) if sample_rate != target_rate else None
+        self._partial = b""
+
+    def convert(self, data: Union[bytes, bytearray, memoryview]) -> memoryview:
+        if self._partial:
+            data = self._partial + bytes(data)
+        aligned = len(data) - len(data) % self.frame_bytes
+        self._partial = bytes(data[aligned:])
+        samples = np.frombuffer(data, dtype=np.int16, count=aligned // BYTES_PER_SAMPLE)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        else:
+            samples = samples.astype(np.float32)
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        return memoryview(np.clip(np.rint(samples), -32768, 32767).astype(np.int16)).cast("B")
@@ -0,0 +1,127 @@
+"""
+Binary serialization of the streaming state of a session.
+
+Each stateful component exposes `snapshot_state()`, returning a tree of dicts,
+lists, scalars, numpy arrays, torch tensors and timed objects, and
+`restore_state(state)` to load it back. This module turns such a tree into a
+compact byte string and back:
+
+    MAGIC | version (u8) | zlib( header length (u32) | JSON header | array blob )
+
+Arrays and tensors are stored raw in the blob and referenced from the JSON
+header by index, timed objects (ASRToken, Silence, SpeakerSegment...) by class
+name. Only classes of `whisperlivekit.timed_objects` can be decoded, so loading
+a snapshot never instantiates arbitrary types.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+import torch
+
+from whisperlivekit import timed_objects
+
+MAGIC = b"WLKSNAP"
+VERSION = 1
+_HEADER_LEN = struct.Struct("<I")
+
+
+class SnapshotError(RuntimeError):
+    """The session state cannot be snapshotted, or the snapshot cannot be restored."""
+
+
+def pcm16(audio) -> np.ndarray:
+    """
+    Audio as int16 for storage. It was decoded from s16le PCM (or is digital
+    silence), so the round trip through `from_pcm16` is lossless.
+    """
+    if isinstance(audio, torch.Tensor):
+        audio = audio.detach().cpu().numpy()
+    return np.round(np.asarray(audio, dtype=np.float32) * 32768.0).clip(-32768, 32767).astype(np.int16)
+
+
+def from_pcm16(samples: np.ndarray) -> np.ndarray:
+    return samples.astype(np.float32) / 32768.0
+
+
+def _encode(value: Any, arrays: List[np.ndarray]) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _encode(v, arrays) for k, v in value.items()}
+    if isinstance(value, torch.Tensor):
+        arrays.append(value.detach().cpu().numpy())
+        return {"__tensor__": len(arrays) - 1}
+    if isinstance(value, np.ndarray):
+        arrays.append(value)
+        return {"__array__": len(arrays) - 1}
+    cls = type(value)
+    if getattr(timed_objects, cls.__name__, None) is cls:
+        return {"__timed__": cls.__name__, "fields": _encode(vars(value), arrays)}
+    raise SnapshotError(f"Cannot snapshot a value of type {cls.__name__}")
+
+
+def _decode(value: Any, arrays: List[np.ndarray]) -> Any:
+    if isinstance(value, list):
+        return [_decode(v, arrays) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__array__" in value:
+        return arrays[value["__array__"]]
+    if "__tensor__" in value:
+        return torch.from_numpy(arrays[value["__tensor__"]])
+    if "__timed__" in value:
+        cls = getattr(timed_objects, value["__timed__"], None)
+        if not isinstance(cls, type) or cls.__module__ != timed_objects.__name__:
+            raise SnapshotError(f"Unknown timed object {value['__timed__']!r} in snapshot")
+        # bypass __init__: SilentSegment and friends override fields there
+        obj = cls.__new__(cls)
+        obj.__dict__.update(_decode(value["fields"], arrays))
+        return obj
+    return {k: _decode(v, arrays) for k, v in value.items()}
+
+
+def dumps(state: Dict[str, Any], level: int = 1) -> bytes:
+    """Serialize a state tree. `level` is the zlib level: 1 is fast and already halves PCM-heavy states."""
+    arrays: List[np.ndarray] = []
+    tree = _encode(state, arrays)
+    offset = 0
+    specs = []
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        specs.append({"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+    header = json.dumps({"tree": tree, "arrays": specs}, separators=(",", ":")).encode("utf-8")
+    body = b"".join([_HEADER_LEN.pack(len(header)), header] + [np.ascontiguousarray(a).tobytes() for a in arrays])
+    return MAGIC + bytes([VERSION]) + zlib.compress(body, level)
+
+
+def loads(data: bytes) -> Dict[str, Any]:
+    """Deserialize a state tree produced by `dumps`. Arrays are writable copies."""
+    if not data.startswith(MAGIC):
+        raise SnapshotError("Not a session snapshot")
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version} (expected {VERSION})")
+    try:
+        body = zlib.decompress(data[len(MAGIC) + 1:])
+    except zlib.error as e:
+        raise SnapshotError(f"Corrupted snapshot: {e}") from e
+    (header_len,) = _HEADER_LEN.unpack_from(body)
+    blob_start = _HEADER_LEN.size + header_len
+    header = json.loads(body[_HEADER_LEN.size:blob_start].decode("utf-8"))
+    arrays = []
+    for spec in header["arrays"]:
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = blob_start + spec["offset"]
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=start).reshape(spec["shape"])
+        arrays.append(array.copy())
+    return _decode(header["tree"], arrays)
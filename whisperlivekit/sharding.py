@@ -0,0 +1,262 @@
+"""
+Multi-process session sharding.
+
+With `--workers K` (K > 1), `whisperlivekit-server` runs as a supervisor:
+
+- the SimulStreaming whisper weights are loaded once, moved to shared memory,
+  and handed to K worker processes, so that memory does not grow with K;
+- each worker runs its own event loop, TranscriptionEngine and the regular
+  basic_server app on 127.0.0.1, on the ports following --port;
+- the supervisor listens on --host/--port, sends each new /asr session to the
+  live worker with the fewest open sessions, and relays the messages both ways.
+
+Tokenization, alignment and JSON encoding of different sessions then run on
+different GILs. Weights of other backends (faster-whisper / mlx encoders,
+LocalAgreement backends) cannot be shared and are loaded by each worker.
+"""
+
+import asyncio
+import logging
+import os
+from argparse import Namespace
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import torch
+import torch.multiprocessing as mp
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse
+
+from whisperlivekit.web.web_interface import get_inline_ui_html
+
+logger = logging.getLogger(__name__)
+
+WORKER_HOST = "127.0.0.1"
+READY_POLL_INTERVAL = 0.5
+
+
+def _share_weights(model: torch.nn.Module) -> bool:
+    """Move the dense parameters and buffers of `model` to shared memory."""
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            # sparse buffers (alignment heads) have no storage of their own;
+            # torch.multiprocessing shares their indices and values when pickling
+            if not tensor.is_sparse:
+                tensor.share_memory_()
+    except RuntimeError as e:
+        logger.warning(f"Could not move model weights to shared memory, each worker will load its own copy: {e}")
+        return False
+    return True
+
+
+def load_shared_model(args: Namespace) -> Optional[torch.nn.Module]:
+    """Load the whisper model of the SimulStreaming backend once, in shared memory."""
+    if args.backend_policy != "simulstreaming" or not args.transcription:
+        logger.warning("Only SimulStreaming whisper weights can be shared: each worker loads its own model.")
+        return None
+    from whisperlivekit.core import TranscriptionEngine
+
+    # transcription only: diarization, translation and VAD models are small and loaded per worker
+    engine = TranscriptionEngine(**{
+        **vars(args),
+        "diarization": False,
+        "target_language": "",
+        "no_vac": True,
+        "asr_workers": 0,
+        "ffmpeg_pool_size": 0,
+    })
+    asr = engine.asr
+    if asr.encoder_backend != "whisper":
+        logger.warning(
+            f"The {asr.encoder_backend} encoder cannot be shared between processes and is loaded by each worker. "
+            "Only the whisper decoder weights are shared."
+        )
+    if not _share_weights(asr.shared_model):
+        return None
+    return asr.shared_model
+
+
+def _run_worker(index: int, port: int, args: Namespace, shared_model: Optional[torch.nn.Module]) -> None:
+    """Entry point of a worker process: build the engine around the shared weights and serve basic_server."""
+    import uvicorn
+
+    from whisperlivekit.core import TranscriptionEngine
+
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s - worker {index} - %(levelname)s - %(message)s")
+    if not args.torch_threads_per_worker:
+        # K processes each using every core would oversubscribe the CPU
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // args.workers))
+
+    kwargs: Dict[str, Any] = dict(vars(args))
+    if shared_model is not None:
+        kwargs["shared_model"] = shared_model
+    # the engine is a singleton: the lifespan of basic_server gets this instance
+    TranscriptionEngine(**kwargs)
+
+    from whisperlivekit import basic_server
+    uvicorn.run(basic_server.app, host=WORKER_HOST, port=port, log_level="warning", lifespan="on")
+
+
+class ShardWorker:
+    """A worker process and the sessions the supervisor routed to it."""
+
+    def __init__(self, index: int, port: int, process: mp.Process) -> None:
+        self.index = index
+        self.port = port
+        self.process = process
+        self.ready = False
+        self.active_sessions = 0
+        self.total_sessions = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{WORKER_HOST}:{self.port}/asr"
+
+    def is_available(self) -> bool:
+        return self.ready and self.process.is_alive()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "port": self.port,
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "ready": self.ready,
+            "active_sessions": self.active_sessions,
+            "total_sessions": self.total_sessions,
+        }
+
+
+class SessionRouter:
+    """Routes each new session to the available worker with the fewest open sessions."""
+
+    def __init__(self, workers: List[ShardWorker]) -> None:
+        self.workers = workers
+
+    def pick(self) -> Optional[ShardWorker]:
+        available = [w for w in self.workers if w.is_available()]
+        if not available:
+            return None
+        return min(available, key=lambda w: (w.active_sessions, w.total_sessions))
+
+    async def wait_ready(self, worker: ShardWorker) -> None:
+        """Poll the worker port until it accepts connections (model loading can take a while)."""
+        while worker.process.is_alive():
+            try:
+                _, writer = await asyncio.open_connection(WORKER_HOST, worker.port)
+            except OSError:
+                await asyncio.sleep(READY_POLL_INTERVAL)
+                continue
+            writer.close()
+            worker.ready = True
+            logger.info(f"Worker {worker.index} (pid {worker.process.pid}) ready on port {worker.port}")
+            return
+        logger.error(f"Worker {worker.index} exited with code {worker.process.exitcode} before being ready")
+
+
+async def _relay(websocket: WebSocket, upstream) -> None:
+    """Forward messages between the client and the worker until either side closes."""
+
+    async def client_to_worker() -> None:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                await upstream.send(message["bytes"])
+            elif message.get("text") is not None:
+                await upstream.send(message["text"])
+
+    async def worker_to_client() -> None:
+        async for message in upstream:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+
+    tasks = [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        if task.exception() and not isinstance(task.exception(), (WebSocketDisconnect, websockets.exceptions.ConnectionClosed)):
+            logger.warning(f"Session relay stopped: {task.exception()!r}")
+
+
+def create_supervisor_app(router: SessionRouter) -> FastAPI:
+    ready_tasks: List[asyncio.Task] = []
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        ready_tasks.extend(asyncio.create_task(router.wait_ready(w)) for w in router.workers)
+        yield
+        for task in ready_tasks:
+            task.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/")
+    async def get():
+        return HTMLResponse(get_inline_ui_html())
+
+    @app.get("/shards")
+    async def shards():
+        """State of each worker process and of the sessions routed to it."""
+        return JSONResponse([w.stats() for w in router.workers])
+
+    @app.websocket("/asr")
+    async def websocket_endpoint(websocket: WebSocket):
+        worker = router.pick()
+        if worker is None:
+            logger.warning("No worker available, rejecting session.")
+            await websocket.close(code=1013)  # try again later
+            return
+        worker.active_sessions += 1
+        worker.total_sessions += 1
+        try:
+            async with websockets.connect(worker.url, max_size=None) as upstream:
+                await websocket.accept()
+                logger.info(f"Session routed to worker {worker.index} ({worker.active_sessions} active)")
+                await _relay(websocket, upstream)
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            logger.error(f"Could not reach worker {worker.index}: {e}")
+            await websocket.close(code=1011)
+        finally:
+            worker.active_sessions -= 1
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass  # already closed
+
+    return app
+
+
+def run_supervisor(args: Namespace, uvicorn_kwargs: Dict[str, Any]) -> None:
+    """Start `args.workers` worker processes and serve the routing supervisor in this process."""
+    import uvicorn
+
+    shared_model = load_shared_model(args)
+    ctx = mp.get_context("spawn")
+    workers = []
+    for index in range(args.workers):
+        port = args.port + 1 + index
+        process = ctx.Process(
+            target=_run_worker,
+            args=(index, port, args, shared_model),
+            name=f"wlk-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        workers.append(ShardWorker(index, port, process))
+    logger.info(f"Started {len(workers)} workers on ports {args.port + 1}-{args.port + len(workers)}")
+
+    app = create_supervisor_app(SessionRouter(workers))
+    try:
+        uvicorn.run(**{**uvicorn_kwargs, "app": app})
+    finally:
+        for worker in workers:
+            worker.process.terminate()
+        for worker in workers:
+            worker.process.join(timeout=10)
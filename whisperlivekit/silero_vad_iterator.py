@@ -1,5 +1,6 @@
 import warnings
 from pathlib import Path
+from typing import List
 
 import numpy as np
 import torch
@@ -100,6 +101,31 @@ class OnnxWrapper():
         out = torch.from_numpy(out)
         return out
 
+    def forward_windows(self, windows: np.ndarray, sr: int) -> List[float]:
+        """
+        Speech probabilities of consecutive windows of one stream, shape
+        (n_windows, num_samples), carrying the state and context through them.
+        Same results as calling the wrapper on each window, without the
+        per-window torch conversions.
+        """
+        context_size = 64 if sr == 16000 else 32
+        if not self._last_batch_size or self._last_sr != sr or self._last_batch_size != 1:
+            self.reset_states(1)
+        state = self._state.numpy()
+        context = self._context.numpy() if len(self._context) else np.zeros((1, context_size), dtype=np.float32)
+        sr_input = np.array(sr, dtype='int64')
+        probs = []
+        for window in windows:
+            x = np.concatenate((context, window[None, :]), axis=1)
+            out, state = self.session.run(None, {'input': x, 'state': state, 'sr': sr_input})
+            probs.append(float(out[0, 0]))
+            context = x[:, -context_size:]
+        self._state = torch.from_numpy(state)
+        self._context = torch.from_numpy(context)
+        self._last_sr = sr
+        self._last_batch_size = 1
+        return probs
+
 
 def load_silero_vad(model_path: str = None, onnx: bool = False, opset_version: int = 16):
     """
@@ -231,9 +257,12 @@ class VADIterator:
                 raise TypeError("Audio cannot be casted to tensor. Cast it manually")
 
         window_size_samples = len(x[0]) if x.dim() == 2 else len(x)
-        self.current_sample += window_size_samples
-
         speech_prob = self.model(x, self.sampling_rate).item()
+        return self._step(speech_prob, window_size_samples, return_seconds, time_resolution)
+
+    def _step(self, speech_prob: float, window_size_samples: int, return_seconds=False, time_resolution: int = 1):
+        """Advance the start/end state machine by one window of known speech probability."""
+        self.current_sample += window_size_samples
 
         if (speech_prob >= self.threshold) and self.temp_end:
             self.temp_end = 0
@@ -257,21 +286,121 @@ class VADIterator:
         return None
 
 
+MODEL_STATE_ATTRIBUTES = ("_state", "_context", "_last_sr", "_last_batch_size")
+
+
 class FixedVADIterator(VADIterator):
     """
     Fixed VAD Iterator that handles variable-length audio chunks, not only exactly 512 frames at once.
+
+    Samples that do not fill a window are kept in a fixed-size carry buffer.
+    All complete windows of a chunk are laid out in one reusable array and
+    evaluated in a single call, in order since each window depends on the RNN
+    state left by the previous one, with a single host sync for all their
+    probabilities. The start/end events are the same as window by window.
     """
 
+    WINDOW_SIZE = 512
+    CONTEXT_SIZE = 64
+
+    def __init__(self, model, *args, pregate=None, **kwargs):
+        # optional EnergyPreGate skipping the model on clearly silent windows
+        self.pregate = pregate
+        super().__init__(model, *args, **kwargs)
+
     def reset_states(self):
         super().reset_states()
-        self.buffer = np.array([], dtype=np.float32)
+        self._pending = np.zeros(self.WINDOW_SIZE, dtype=np.float32)
+        self._n_pending = 0
+        self._windows = np.zeros((0, self.WINDOW_SIZE), dtype=np.float32)
+
+    @property
+    def buffer(self) -> np.ndarray:
+        """Samples waiting for a complete window."""
+        return self._pending[:self._n_pending]
+
+    def _complete_windows(self, x: np.ndarray) -> np.ndarray:
+        """Append `x` to the carried samples and return the complete windows, keeping the rest."""
+        x = np.asarray(x, dtype=np.float32).reshape(-1)
+        n_windows = (self._n_pending + len(x)) // self.WINDOW_SIZE
+        if n_windows == 0:
+            self._pending[self._n_pending:self._n_pending + len(x)] = x
+            self._n_pending += len(x)
+            return self._windows[:0]
+        if len(self._windows) < n_windows:
+            self._windows = np.zeros((n_windows, self.WINDOW_SIZE), dtype=np.float32)
+        windows = self._windows[:n_windows]
+        flat = windows.reshape(-1)
+        flat[:self._n_pending] = self._pending[:self._n_pending]
+        used = len(flat) - self._n_pending
+        flat[self._n_pending:] = x[:used]
+        rest = len(x) - used
+        self._pending[:rest] = x[used:]
+        self._n_pending = rest
+        return windows
+
+    @torch.no_grad()
+    def _speech_probs(self, windows: np.ndarray) -> List[float]:
+        forward_windows = getattr(self.model, "forward_windows", None)
+        if forward_windows is not None:
+            return forward_windows(windows, self.sampling_rate)
+        batch = torch.from_numpy(windows)
+        return torch.cat([self.model(batch[i:i + 1], self.sampling_rate) for i in range(len(batch))]).flatten().tolist()
 
     def __call__(self, x, return_seconds=False):
-        self.buffer = np.append(self.buffer, x)
+        windows = self._complete_windows(x)
+        if len(windows) == 0:
+            return None
+        begin, end = self._gated_range(windows)
+        probs = self._speech_probs(windows[begin:end]) if begin < end else []
+        return self._events(self._after_gate(windows, begin, end, probs), return_seconds)
+
+    async def process_chunk(self, x, return_seconds=False):
+        """Same as calling the iterator, for a model that is a VADStream of a shared VADService."""
+        windows = self._complete_windows(x)
+        if len(windows) == 0:
+            return None
+        begin, end = self._gated_range(windows)
+        probs = await self.model.submit(windows[begin:end]) if begin < end else []
+        return self._events(self._after_gate(windows, begin, end, probs), return_seconds)
+
+    def _gated_range(self, windows: np.ndarray):
+        """
+        Windows [begin, end) to give to the model. Only the silent windows at
+        the edges of the chunk are skipped: the model then sees a contiguous
+        run, whose context is set from the real audio preceding it.
+        """
+        if self.pregate is None:
+            return 0, len(windows)
+        evaluated = np.flatnonzero(~self.pregate.silent(windows))
+        if len(evaluated) == 0:
+            self._set_context(windows[-1])
+            return len(windows), len(windows)
+        begin, end = int(evaluated[0]), int(evaluated[-1]) + 1
+        if begin > 0:
+            self._set_context(windows[begin - 1])
+        return begin, end
+
+    def _after_gate(self, windows: np.ndarray, begin: int, end: int, probs: List[float]) -> List[float]:
+        """Probabilities of all windows, skipped ones counting as silence."""
+        if self.pregate is None:
+            return probs
+        if end < len(windows):
+            self._set_context(windows[-1])
+        agreements = [probs[i - begin] < self.threshold for i in self.pregate.audited]
+        self.pregate.record(len(windows) - (end - begin), end - begin, agreements)
+        return [0.0] * begin + list(probs) + [0.0] * (len(windows) - end)
+
+    def _set_context(self, window: np.ndarray) -> None:
+        # the RNN state carries over the skipped silence; the context must be the audio just before the next window
+        if hasattr(self.model, "_context"):
+            self.model._context = torch.from_numpy(window[None, -self.CONTEXT_SIZE:].copy())
+
+    def _events(self, speech_probs: List[float], return_seconds=False):
+        """Run the start/end state machine over consecutive windows, merged into one event as before."""
         ret = None
-        while len(self.buffer) >= 512:
-            r = super().__call__(self.buffer[:512], return_seconds=return_seconds)
-            self.buffer = self.buffer[512:]
+        for speech_prob in speech_probs:
+            r = self._step(speech_prob, self.WINDOW_SIZE, return_seconds=return_seconds)
             if ret is None:
                 ret = r
             elif r is not None:
@@ -283,6 +412,29 @@ class FixedVADIterator(VADIterator):
                         del ret["end"]
         return ret if ret != {} else None
 
+    def snapshot_state(self) -> dict:
+        """
+        Iterator position and the model's RNN state. Both the ONNX wrapper and
+        the silero JIT model keep the latter in `_state`, `_context`,
+        `_last_sr` and `_last_batch_size`.
+        """
+        return {
+            "triggered": self.triggered,
+            "temp_end": self.temp_end,
+            "current_sample": self.current_sample,
+            "buffer": self.buffer.copy(),
+            "model": {name: getattr(self.model, name) for name in MODEL_STATE_ATTRIBUTES if hasattr(self.model, name)},
+        }
+
+    def restore_state(self, saved: dict) -> None:
+        self.triggered = saved["triggered"]
+        self.temp_end = saved["temp_end"]
+        self.current_sample = saved["current_sample"]
+        self._n_pending = len(saved["buffer"])
+        self._pending[:self._n_pending] = saved["buffer"]
+        for name, value in saved["model"].items():
+            setattr(self.model, name, value)
+
 
 if __name__ == "__main__":
     model = load_silero_vad(onnx=False)
@@ -3,6 +3,7 @@ import logging
 import os
 import platform
 import sys
+import warnings
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -12,6 +13,8 @@ import torch
 from whisperlivekit.backend_support import (faster_backend_available,
                                             mlx_backend_available)
 from whisperlivekit.model_paths import detect_model_format, resolve_model_path
+from whisperlivekit.simul_whisper.batching import (DecoderStepBatcher,
+                                                    EncoderBatcher)
 from whisperlivekit.simul_whisper.config import AlignAttConfig
 from whisperlivekit.simul_whisper.simul_whisper import AlignAtt
 from whisperlivekit.timed_objects import ASRToken, ChangeSpeaker, Transcript
@@ -61,6 +64,8 @@ class SimulStreamingOnlineProcessor:
             loaded_model=self.asr.shared_model,
             mlx_encoder=self.asr.mlx_encoder,
             fw_encoder=self.asr.fw_encoder,
+            encoder_batcher=self.asr.encoder_batcher,
+            decoder_batcher=self.asr.decoder_batcher,
         )
 
     def start_silence(self):
@@ -85,11 +90,22 @@ class SimulStreamingOnlineProcessor:
             self.model.refresh_segment(complete=True)
             self.model.global_time_offset = silence_duration + offset
 
+    def skip_audio(self, resume_time: float):
+        """
+        Continue after audio dropped under overload: nothing is inserted for the gap,
+        the buffer starts over and the next chunk is timed from `resume_time`.
+        """
+        self.end = resume_time
+        self.reset_buffer()
+
     def insert_audio_chunk(self, audio: np.ndarray, audio_stream_end_time):
         """Append an audio chunk to be processed by SimulStreaming."""
             
-        # Convert numpy array to torch tensor
-        audio_tensor = torch.from_numpy(audio).float()
+        # Shares the (float32, read-only) chunk memory: no copy. AlignAtt only reads
+        # its segments (torch.cat, log-mel), so torch's warning does not apply here.
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="The given NumPy array is not writable", category=UserWarning)
+            audio_tensor = torch.from_numpy(audio).float()
         self.end = audio_stream_end_time  # Aligned with whisperstreaming backend behavior
         self.model.insert_audio(audio_tensor)
 
@@ -127,6 +143,41 @@ class SimulStreamingOnlineProcessor:
             logger.exception(f"SimulStreaming processing error: {e}")
             return [], self.end
 
+    def reset_buffer(self):
+        """Drop the audio and hypothesis not committed yet, e.g. after a stall. Later tokens keep their stream times."""
+        self.model.refresh_segment(complete=True)
+        self.model.global_time_offset = self.end
+        self.buffer = []
+
+    def snapshot_state(self) -> dict:
+        return {
+            "end": self.end,
+            "buffer": list(self.buffer),
+            "committed": list(self.committed),
+            "decoder": self.model.snapshot_state(),
+        }
+
+    def restore_state(self, saved: dict) -> None:
+        self.end = saved["end"]
+        self.buffer = saved["buffer"]
+        self.committed = saved["committed"]
+        self.model.restore_state(saved["decoder"])
+
+    def checkpoint(self) -> dict:
+        """In-memory copy of the state, to roll back a speculative pass (see AlignAtt.checkpoint)."""
+        return {
+            "end": self.end,
+            "buffer": list(self.buffer),
+            "committed": list(self.committed),
+            "decoder": self.model.checkpoint(),
+        }
+
+    def rollback(self, saved: dict) -> None:
+        self.end = saved["end"]
+        self.buffer = saved["buffer"]
+        self.committed = saved["committed"]
+        self.model.rollback(saved["decoder"])
+
     def warmup(self, audio, init_prompt=""):
         """Warmup the SimulStreaming model."""
         try:
@@ -138,6 +189,9 @@ class SimulStreamingOnlineProcessor:
             logger.exception(f"SimulStreaming warmup failed: {e}")
 
     def __del__(self):
+        for batcher in (getattr(self.asr, "encoder_batcher", None), getattr(self.asr, "decoder_batcher", None)):
+            if batcher is not None and hasattr(self, "model"):
+                batcher.forget(id(self.model))
         gc.collect()
         torch.cuda.empty_cache()
 
@@ -206,7 +260,13 @@ class SimulStreamingASR():
                 init_prompt=self.init_prompt,
                 max_context_tokens=self.max_context_tokens,
                 static_init_prompt=self.static_init_prompt,
+                encoder_bucket_s=getattr(self, "encoder_bucket_s", 0.0) or 0.0,
         )  
+        if self.cfg.encoder_bucket_s and self.encoder_backend != "whisper":
+            logger.warning(
+                f"Truncated encoder input only applies to the native whisper encoder, not {self.encoder_backend}. "
+                "Use --disable-fast-encoder to enable it."
+            )
         
         # Set up tokenizer for translation if needed
         if self.direct_english_translation:
@@ -237,7 +297,37 @@ class SimulStreamingASR():
                 device='auto',
                 compute_type='auto',
             )
-        self.shared_model = self.load_model()
+        # a worker process of the sharding supervisor receives the weights in shared memory
+        if getattr(self, "shared_model", None) is None:
+            self.shared_model = self.load_model()
+
+        self.encoder_batcher = None
+        batch_size = getattr(self, "encoder_batch_size", 1) or 1
+        if batch_size > 1:
+            if self.encoder_backend != "whisper":
+                logger.warning(
+                    f"Encoder batching only applies to the native whisper encoder, not {self.encoder_backend}. "
+                    "Use --disable-fast-encoder to enable it."
+                )
+            else:
+                self.encoder_batcher = EncoderBatcher(
+                    self.shared_model,
+                    max_batch_size=batch_size,
+                    window_ms=getattr(self, "encoder_batch_window_ms", 20.0),
+                    fairness=getattr(self, "encoder_batch_fairness", "fifo"),
+                )
+
+        self.decoder_batcher = None
+        decoder_batch_size = getattr(self, "decoder_batch_size", 1) or 1
+        if decoder_batch_size > 1:
+            if self.beams != 1:
+                logger.warning("Decoder batching only supports a single hypothesis (--beams 1). Ignoring --decoder-batch-size.")
+            else:
+                self.decoder_batcher = DecoderStepBatcher(
+                    self.shared_model,
+                    max_batch_size=decoder_batch_size,
+                    window_ms=getattr(self, "decoder_batch_window_ms", 2.0),
+                )
 
 
     def _resolve_encoder_backend(self, preferred_backend, compatible_whisper_mlx, compatible_faster_whisper):
@@ -0,0 +1,306 @@
+import logging
+import threading
+from itertools import count
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+FAIRNESS_POLICIES = ("fifo", "round_robin")
+
+
+class _Request:
+    __slots__ = ("payload", "key", "owner", "seq", "done", "result", "error")
+
+    def __init__(self, payload: Any, key: Hashable, owner: Hashable, seq: int) -> None:
+        self.payload = payload
+        self.key = key
+        self.owner = owner
+        self.seq = seq
+        self.done = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Collects blocking requests coming from concurrent session threads and runs
+    them as a single batch.
+
+    There is no dedicated worker thread: the first caller that finds no batch in
+    progress becomes the leader, waits up to `window_s` for other sessions to
+    join, runs the batch and hands every caller its own result. Only requests
+    sharing the same `key` (e.g. the input shape) are batched together.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        window_s: float = 0.02,
+        fairness: str = "fifo",
+        name: str = "batcher",
+    ) -> None:
+        if fairness not in FAIRNESS_POLICIES:
+            raise ValueError(f"fairness must be one of {FAIRNESS_POLICIES}, got {fairness!r}")
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_s = max(0.0, window_s)
+        self.fairness = fairness
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._pending: List[_Request] = []
+        self._leader_active = False
+        self._seq = count()
+        self._served = count()
+        self._last_served: Dict[Hashable, int] = {}
+
+        self.n_batches = 0
+        self.n_requests = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.n_requests / self.n_batches if self.n_batches else 0.0
+
+    def submit(self, payload: Any, key: Hashable = None, owner: Hashable = None) -> Any:
+        """Block until `payload` has been processed in some batch and return its result."""
+        request = _Request(payload, key, owner, next(self._seq))
+        with self._cond:
+            self._pending.append(request)
+            self._cond.notify_all()
+            while not request.done:
+                if self._leader_active:
+                    self._cond.wait()
+                    continue
+                self._leader_active = True
+                batch = self._collect_locked()
+                self._cond.release()
+                try:
+                    self._execute(batch)
+                finally:
+                    self._cond.acquire()
+                    self._leader_active = False
+                    self._cond.notify_all()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _priority(self, request: _Request):
+        if self.fairness == "round_robin":
+            return (self._last_served.get(request.owner, -1), request.seq)
+        return (request.seq,)
+
+    def _collect_locked(self) -> List[_Request]:
+        deadline = monotonic() + self.window_s
+        key = min(self._pending, key=self._priority).key
+        while True:
+            candidates = [r for r in self._pending if r.key == key]
+            remaining = deadline - monotonic()
+            if len(candidates) >= self.max_batch_size or remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        batch: List[_Request] = []
+        owners = set()
+        for request in sorted(candidates, key=self._priority):
+            # one slot per session and per batch, so a chatty session cannot starve the others
+            if request.owner is not None and request.owner in owners:
+                continue
+            batch.append(request)
+            owners.add(request.owner)
+            if len(batch) >= self.max_batch_size:
+                break
+        for request in batch:
+            self._pending.remove(request)
+            self._last_served[request.owner] = next(self._served)
+        return batch
+
+    def _execute(self, batch: List[_Request]) -> None:
+        try:
+            results = self.run_batch([r.payload for r in batch])
+            for request, result in zip(batch, results):
+                request.result = result
+        except BaseException as e:
+            logger.exception(f"{self.name}: batch of {len(batch)} failed: {e}")
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done = True
+            self.n_batches += 1
+            self.n_requests += len(batch)
+
+    def forget(self, owner: Hashable) -> None:
+        """Drop fairness bookkeeping for a session that went away."""
+        with self._cond:
+            self._last_served.pop(owner, None)
+
+
+class EncoderBatcher:
+    """
+    Runs `model.encoder` once for the mel spectrograms of every session that
+    asked for it within the batching window, and returns each session its slice
+    of the encoder features.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 8,
+        window_ms: float = 20.0,
+        fairness: str = "fifo",
+    ) -> None:
+        self.model = model
+        self.batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=max_batch_size,
+            window_s=window_ms / 1000.0,
+            fairness=fairness,
+            name="encoder batcher",
+        )
+        logger.info(
+            f"Cross-session encoder batching enabled: batch size {max_batch_size}, "
+            f"window {window_ms}ms, fairness {fairness}"
+        )
+
+    @torch.no_grad()
+    def _run_batch(self, mels: List[torch.Tensor]) -> List[torch.Tensor]:
+        if len(mels) == 1:
+            return [self.model.encoder(mels[0])]
+        features = self.model.encoder(torch.cat(mels, dim=0))
+        return list(features.split(1, dim=0))
+
+    def encode(self, mel: torch.Tensor, owner: Hashable = None) -> torch.Tensor:
+        """mel: (1, n_mels, n_frames). Returns (1, n_frames // 2, n_audio_state)."""
+        key = (tuple(mel.shape[1:]), mel.device, mel.dtype)
+        return self.batcher.submit(mel, key=key, owner=owner)
+
+    def forget(self, owner: Hashable) -> None:
+        self.batcher.forget(owner)
+
+
+def _attention(attn, q: torch.Tensor, k: torch.Tensor, v: torch.Tensor, key_mask: Optional[torch.Tensor] = None):
+    """Same computation as MultiHeadAttention.qkv_attention, with a per-row key padding mask."""
+    n_batch, n_ctx, n_state = q.shape
+    scale = (n_state // attn.n_head) ** -0.25
+    q = q.view(*q.shape[:2], attn.n_head, -1).permute(0, 2, 1, 3)
+    k = k.view(*k.shape[:2], attn.n_head, -1).permute(0, 2, 1, 3)
+    v = v.view(*v.shape[:2], attn.n_head, -1).permute(0, 2, 1, 3)
+    qk = (q * scale) @ (k * scale).transpose(-1, -2)
+    if key_mask is not None:
+        qk = qk + key_mask
+    qk = qk.float()
+    w = torch.softmax(qk, dim=-1).to(q.dtype)
+    out = (w @ v).permute(0, 2, 1, 3).flatten(start_dim=2)
+    return attn.out(out), qk.detach()
+
+
+@torch.no_grad()
+def batched_decoder_step(decoder, tokens: List[torch.Tensor], kv_caches: List[dict]):
+    """
+    One incremental decoding step for several independent sessions at once.
+
+    tokens: one (1, 1) tensor per session, the last emitted token.
+    kv_caches: one kv_cache dict per session, already filled by a previous
+        forward pass (self-attention keys of any length, cross-attention keys).
+
+    Self-attention caches of different lengths are left-padded to the longest
+    one and the padding is masked out. Every cache is updated in place exactly
+    as TextDecoder.forward would do it.
+
+    Returns, per session, the logits (1, 1, n_vocab) and the list of
+    cross-attention weights per layer, each (1, n_head, 1, n_audio_ctx).
+    """
+    n_batch = len(tokens)
+    first_key = decoder.blocks[0].attn.key_cache_id
+    offsets = [cache[first_key].shape[1] for cache in kv_caches]
+    max_len = max(offsets)
+    device = tokens[0].device
+
+    xa_dtype = kv_caches[0][decoder.blocks[0].cross_attn.key_cache_id].dtype
+    x = decoder.token_embedding(torch.cat(tokens, dim=0))
+    x = x + decoder.positional_embedding[torch.tensor(offsets, device=device)].unsqueeze(1)
+    x = x.to(xa_dtype)
+
+    # (batch, 1, 1, max_len + 1): -inf on the left padding of shorter caches
+    key_mask = None
+    if any(offset != max_len for offset in offsets):
+        key_mask = torch.zeros(n_batch, 1, 1, max_len + 1, device=device)
+        for i, offset in enumerate(offsets):
+            key_mask[i, :, :, :max_len - offset] = -float("inf")
+
+    def left_pad(cached: torch.Tensor) -> torch.Tensor:
+        missing = max_len - cached.shape[1]
+        if missing == 0:
+            return cached
+        return torch.cat([cached.new_zeros(1, missing, cached.shape[2]), cached], dim=1)
+
+    cross_attns: List[List[torch.Tensor]] = [[] for _ in range(n_batch)]
+    for block in decoder.blocks:
+        attn = block.attn
+        h = block.attn_ln(x)
+        q, k_new, v_new = attn.query(h), attn.key(h), attn.value(h)
+        k = torch.cat([torch.cat([left_pad(c[attn.key_cache_id]) for c in kv_caches], dim=0), k_new], dim=1)
+        v = torch.cat([torch.cat([left_pad(c[attn.value_cache_id]) for c in kv_caches], dim=0), v_new], dim=1)
+        for i, cache in enumerate(kv_caches):
+            cache[attn.key_cache_id] = torch.cat([cache[attn.key_cache_id], k_new[i:i + 1]], dim=1).detach()
+            cache[attn.value_cache_id] = torch.cat([cache[attn.value_cache_id], v_new[i:i + 1]], dim=1).detach()
+        out, _ = _attention(attn, q, k, v, key_mask)
+        x = x + out
+
+        cross = block.cross_attn
+        q = cross.query(block.cross_attn_ln(x))
+        k = torch.cat([c[cross.key_cache_id] for c in kv_caches], dim=0)
+        v = torch.cat([c[cross.value_cache_id] for c in kv_caches], dim=0)
+        out, qk = _attention(cross, q, k, v)
+        x = x + out
+        for i in range(n_batch):
+            cross_attns[i].append(qk[i:i + 1])
+
+        x = x + block.mlp(block.mlp_ln(x))
+
+    x = decoder.ln(x)
+    logits = (x @ torch.transpose(decoder.token_embedding.weight.to(x.dtype), 0, 1)).float()
+    return [(logits[i:i + 1], cross_attns[i]) for i in range(n_batch)]
+
+
+class DecoderStepBatcher:
+    """
+    Continuous batching of AlignAtt single-hypothesis decoding steps.
+
+    Sessions join and leave at every token: each step, the sessions that are
+    ready to emit a token within the window are stacked into one decoder call,
+    and each gets back its own logits and cross-attention weights so the
+    AlignAtt frame-threshold policy keeps running per session.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, window_ms: float = 2.0) -> None:
+        self.model = model
+        self.batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=max_batch_size,
+            window_s=window_ms / 1000.0,
+            name="decoder batcher",
+        )
+        logger.info(f"Continuous decoder batching enabled: batch size {max_batch_size}, window {window_ms}ms")
+
+    @torch.no_grad()
+    def _run_batch(self, requests: List[tuple]) -> List[tuple]:
+        if len(requests) == 1:
+            token, audio_features, kv_cache = requests[0]
+            return [self.model.decoder(token, audio_features, kv_cache=kv_cache, return_cross_attn=True)]
+        return batched_decoder_step(
+            self.model.decoder,
+            [token for token, _, _ in requests],
+            [kv_cache for _, _, kv_cache in requests],
+        )
+
+    def step(self, token: torch.Tensor, audio_features: torch.Tensor, kv_cache: dict, owner: Hashable = None):
+        """token: (1, 1). kv_cache must already hold this session's prompt and cross-attention keys."""
+        key = (audio_features.shape[1], audio_features.device, audio_features.dtype)
+        return self.batcher.submit((token, audio_features, kv_cache), key=key, owner=owner)
+
+    def forget(self, owner: Hashable) -> None:
+        self.batcher.forget(owner)
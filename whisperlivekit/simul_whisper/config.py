@@ -21,4 +21,5 @@ class AlignAttConfig():
     init_prompt: str = field(default=None)
     static_init_prompt: str = field(default=None)
     max_context_tokens: int = field(default=None)
+    encoder_bucket_s: float = field(default=0.0, metadata = {"help": "truncated encoder input, in multiples of this duration; 0 pads to 30 s"})
     
\ No newline at end of file
@@ -0,0 +1,118 @@
+from typing import List
+
+import torch
+import torch.nn.functional as F
+
+from whisperlivekit.whisper.audio import (HOP_LENGTH, N_FFT, N_FRAMES,
+                                          N_SAMPLES, log_mel_spectrogram,
+                                          mel_filters, pad_or_trim)
+
+HALF_WINDOW = N_FFT // 2
+
+
+class IncrementalLogMel:
+    """
+    Log-Mel spectrogram of the AlignAtt audio buffer, padded to N_FRAMES,
+    computed only for the frames that changed since the previous call.
+
+    A frame only depends on the N_FFT samples around it, so once the buffer
+    extends past its window it never changes, and is cached as an unnormalized
+    log10 mel frame. Each call computes the frames of newly arrived samples and
+    the few last frames whose window still reaches the zero padding. The
+    normalization of `log_mel_spectrogram` (clamp to 8 below the global max,
+    then scale) is applied to the assembled frames on every call, since the
+    max changes with the audio: the result is the same as `pad_or_trim(
+    log_mel_spectrogram(audio, padding=N_SAMPLES), N_FRAMES)`.
+
+    The cache follows the segment list of the buffer by identity: when the
+    first segments are dropped (buffer trimmed in `insert_audio`, or
+    `refresh_segment`), the cached frames slide by the removed samples, and
+    only the first two frames, which are reflect-padded, are recomputed. Any
+    other change of the segments (restore, full reset, a trim that is not a
+    whole number of hops) starts the cache over.
+    """
+
+    def __init__(self, n_mels: int, device) -> None:
+        self.n_mels = n_mels
+        self.device = device
+        self._window = torch.hann_window(N_FFT, device=device)
+        self._filters = mel_filters(device, n_mels)
+        # log10 of the clamped power of the zero padding
+        self._floor = torch.clamp(torch.zeros(1, device=device), min=1e-10).log10().item()
+        self._frames = torch.empty((n_mels, N_FRAMES), device=device)
+        self.reset()
+
+    def reset(self) -> None:
+        # segments the cached frames were computed from
+        self._segments: List[torch.Tensor] = []
+        self._n_stable = 0
+        self._head_stale = False
+
+    def __call__(self, segments: List[torch.Tensor], audio: torch.Tensor) -> torch.Tensor:
+        """Mel input of the encoder, shape (1, n_mels, N_FRAMES), for `audio`, the concatenation of `segments`."""
+        self._follow(segments)
+        n_samples = len(audio)
+        if n_samples > N_SAMPLES:
+            # more than 30 s: frames past N_FRAMES would count in the max, not worth caching
+            self.reset()
+            mel = log_mel_spectrogram(audio, n_mels=self.n_mels, padding=N_SAMPLES, device=self.device)
+            return pad_or_trim(mel, N_FRAMES).unsqueeze(0)
+
+        # frames whose window overlaps the audio, and those of them not reaching the padding
+        n_content = (n_samples + HALF_WINDOW + HOP_LENGTH - 1) // HOP_LENGTH
+        n_stable = max(0, (n_samples - HALF_WINDOW - 1) // HOP_LENGTH + 1) if n_samples > HALF_WINDOW else 0
+        if self._head_stale:
+            self._head_stale = False
+            if self._n_stable >= 2:
+                self._frames[:, :2] = self._log_mel(audio, 0, 2)
+            else:
+                self._n_stable = 0
+
+        out = torch.full((self.n_mels, N_FRAMES), self._floor, device=self.device)
+        out[:, :self._n_stable] = self._frames[:, :self._n_stable]
+        if n_content > self._n_stable:
+            out[:, self._n_stable:n_content] = self._log_mel(audio, self._n_stable, n_content)
+        if n_stable > self._n_stable:
+            self._frames[:, self._n_stable:n_stable] = out[:, self._n_stable:n_stable]
+            self._n_stable = n_stable
+
+        log_spec = torch.maximum(out, out.max() - 8.0)
+        return ((log_spec + 4.0) / 4.0).unsqueeze(0)
+
+    def _follow(self, segments: List[torch.Tensor]) -> None:
+        previous = self._segments
+        self._segments = list(segments)
+        if not previous:
+            return
+        first = next((i for i, s in enumerate(previous) if segments and s is segments[0]), None)
+        if first is None or any(a is not b for a, b in zip(previous[first:], segments)) or len(segments) < len(previous) - first:
+            self.reset()
+            self._segments = list(segments)
+            return
+        removed = sum(len(s) for s in previous[:first])
+        if removed % HOP_LENGTH:
+            self.reset()
+            self._segments = list(segments)
+        elif removed:
+            shift = removed // HOP_LENGTH
+            kept = max(0, self._n_stable - shift)
+            self._frames[:, :kept] = self._frames[:, shift:shift + kept].clone()
+            self._n_stable = kept
+            self._head_stale = True
+
+    def _log_mel(self, audio: torch.Tensor, first: int, end: int) -> torch.Tensor:
+        """Unnormalized log10 mel frames [first, end) of `audio`, as torch.stft(center=True) on the zero-padded audio frames them."""
+        start = first * HOP_LENGTH - HALF_WINDOW
+        stop = (end - 1) * HOP_LENGTH + HALF_WINDOW
+        parts = []
+        if start < 0:
+            # reflect padding at the start of the buffer
+            head = audio[1:1 - start]
+            parts.append(F.pad(head, (0, -start - len(head))).flip(0))
+        body = audio[max(start, 0):stop]
+        parts.append(body)
+        parts.append(audio.new_zeros(stop - max(start, 0) - len(body)))
+        piece = torch.cat(parts).to(self.device)
+        stft = torch.stft(piece, N_FFT, HOP_LENGTH, window=self._window, center=False, return_complex=True)
+        magnitudes = stft.abs() ** 2
+        return torch.clamp(self._filters @ magnitudes, min=1e-10).log10()
@@ -1,17 +1,20 @@
+import copy
 import logging
 import os
-from time import time
 from typing import List, Optional, Tuple
 
 import numpy as np
 import torch
 import torch.nn.functional as F
 
+from whisperlivekit import session_snapshot as snapshot
 from whisperlivekit.backend_support import (faster_backend_available,
                                             mlx_backend_available)
+from whisperlivekit.metrics import METRICS
 from whisperlivekit.timed_objects import ASRToken
 from whisperlivekit.whisper import DecodingOptions, tokenizer
-from whisperlivekit.whisper.audio import (N_FRAMES, N_SAMPLES,
+from whisperlivekit.whisper.audio import (FRAMES_PER_SECOND, HOP_LENGTH,
+                                          N_FRAMES, N_SAMPLES,
                                           TOKENS_PER_SECOND,
                                           log_mel_spectrogram, pad_or_trim)
 from whisperlivekit.whisper.decoding import (BeamSearchDecoder, GreedyDecoder,
@@ -23,9 +26,14 @@ from .beam import BeamPyTorchInference
 from .config import AlignAttConfig
 from .decoder_state import DecoderState
 from .eow_detection import fire_at_boundary, load_cif
+from .mel_cache import IncrementalLogMel
 from .token_buffer import TokenBuffer
 
 DEC_PAD = 50257
+# zero padding kept after the audio in truncated encoder mode, in mel frames: AlignAtt
+# stops decoding when the attention moves past the content, and whisper was only
+# trained on inputs ending with padding
+ENCODER_MIN_PADDING_FRAMES = 100
 logger = logging.getLogger(__name__)
 
 if mlx_backend_available():
@@ -85,11 +93,17 @@ class AlignAtt:
             loaded_model=None,
             mlx_encoder=None,
             fw_encoder=None,
+            encoder_batcher=None,
+            decoder_batcher=None,
         ) -> None:
         # Shared model reference (can be shared across sessions)
         self.model = loaded_model
         self.mlx_encoder = mlx_encoder
         self.fw_encoder = fw_encoder            
+        # Optional cross-session batching of the native whisper encoder
+        self.encoder_batcher = encoder_batcher
+        # Optional continuous batching of greedy decoding steps across sessions
+        self.decoder_batcher = decoder_batcher
         if fw_encoder:
             self.fw_feature_extractor = FeatureExtractor(feature_size=self.model.dims.n_mels)
         self.coreml_encoder_tuple = None
@@ -98,6 +112,8 @@ class AlignAtt:
         self.use_mlcore = self.coreml_encoder_tuple is not None
         
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        # mel frames of the audio buffer, computed as audio arrives (native encoder only)
+        self.mel_cache = IncrementalLogMel(self.model.dims.n_mels, self.device)
         
         logger.info(f"Model dimensions: {self.model.dims}")
         self.decode_options = DecodingOptions(
@@ -250,6 +266,11 @@ class AlignAtt:
         return_cross_attn: bool = False
     ):
         """Get logits from decoder, optionally returning cross-attention weights."""
+        if self.decoder_batcher is not None and return_cross_attn and tokens.shape == (1, 1):
+            kv_cache = self.state.kv_cache if self.state.decoder_type == "greedy" else self.state.inference.kv_cache
+            if kv_cache:
+                # incremental step of a single hypothesis: can share a forward pass with other sessions
+                return self.decoder_batcher.step(tokens, audio_features, kv_cache, owner=id(self))
         if self.state.decoder_type == "greedy":
             return self.model.decoder(
                 tokens, audio_features, 
@@ -279,6 +300,73 @@ class AlignAtt:
         self.state.log_segments += 1
         self.state.pending_incomplete_tokens = []
 
+    def snapshot_state(self) -> dict:
+        """
+        Per-session decoder state between two inference steps, for session_snapshot.
+        The kv cache is cleared after each step and the helpers (tokenizer, CIF,
+        token decoder) are rebuilt from the config, so only the audio segments,
+        the token context and the timing are kept.
+        """
+        state = self.state
+        return {
+            "segments": [snapshot.pcm16(segment) for segment in state.segments],
+            "tokens": [t.detach().cpu() for t in state.tokens],
+            "context_text": state.context.text,
+            "context_pending_token_ids": list(state.context.pending_token_ids),
+            "detected_language": state.detected_language,
+            "pending_incomplete_tokens": list(state.pending_incomplete_tokens),
+            "global_time_offset": state.global_time_offset,
+            "cumulative_time_offset": state.cumulative_time_offset,
+            "first_timestamp": state.first_timestamp,
+            "last_attend_frame": state.last_attend_frame,
+            "speaker": state.speaker,
+            "log_segments": state.log_segments,
+        }
+
+    def restore_state(self, saved: dict) -> None:
+        """Load a state produced by `snapshot_state` into this freshly initialized decoder."""
+        if self.cfg.language == "auto" and saved["detected_language"] is not None:
+            # same switch as after language detection in infer()
+            self.create_tokenizer(saved["detected_language"])
+            self.init_tokens()
+        self.init_context()
+        state = self.state
+        state.detected_language = saved["detected_language"]
+        state.segments = [torch.from_numpy(snapshot.from_pcm16(s)) for s in saved["segments"]]
+        state.tokens = [t.to(self.model.device) for t in saved["tokens"]]
+        state.context.text = saved["context_text"]
+        state.context.pending_token_ids = list(saved["context_pending_token_ids"])
+        state.pending_incomplete_tokens = list(saved["pending_incomplete_tokens"])
+        state.global_time_offset = saved["global_time_offset"]
+        state.cumulative_time_offset = saved["cumulative_time_offset"]
+        state.first_timestamp = saved["first_timestamp"]
+        state.last_attend_frame = saved["last_attend_frame"]
+        state.speaker = saved["speaker"]
+        state.log_segments = saved["log_segments"]
+
+    def checkpoint(self) -> dict:
+        """
+        In-memory copy of the per-session state, to roll back a speculative pass.
+        Segment and token tensors are never written in place, so they are shared:
+        after a rollback the segment list holds the same tensors, and the mel
+        cache still matches it. Only the containers and the context are copied.
+        """
+        state = copy.copy(self.state)
+        state.kv_cache = {}
+        state.tokens = list(self.state.tokens)
+        state.segments = list(self.state.segments)
+        state.pending_incomplete_tokens = list(self.state.pending_incomplete_tokens)
+        context = state.context = copy.copy(self.state.context)
+        context.pending_token_ids = list(context.pending_token_ids)
+        context.prefix_token_ids = list(context.prefix_token_ids)
+        return {"state": state, "tokenizer": self.tokenizer}
+
+    def rollback(self, saved: dict) -> None:
+        """Return to a state produced by `checkpoint`, which is consumed."""
+        self.tokenizer = saved["tokenizer"]
+        self.state = saved["state"]
+        self.state.clean_cache()
+
     def fire_at_boundary(self, chunked_encoder_feature: torch.Tensor):
         if self.state.always_fire: 
             return True
@@ -343,6 +431,13 @@ class AlignAtt:
                 self.state.tokens = [self.state.initial_tokens] + self.state.tokens[2:]
         return removed_len
 
+    def _encoder_frames(self, n_samples: int) -> int:
+        """Mel frames given to the encoder in truncated mode: the content and some padding, rounded up to a whole bucket."""
+        # even, since the encoder convolutions halve the frame rate
+        bucket = max(2, int(self.cfg.encoder_bucket_s * FRAMES_PER_SECOND) // 2 * 2)
+        needed = n_samples // HOP_LENGTH + ENCODER_MIN_PADDING_FRAMES
+        return min(N_FRAMES, -(-needed // bucket) * bucket)
+
     def _clean_cache(self):
         """Clean the kv_cache after each inference step."""
         self.state.clean_cache()
@@ -399,20 +494,21 @@ class AlignAtt:
         else:
             input_segments = self.state.segments[0]
 
-        beg_encode = time()
         if self.use_mlcore:
             coreml_encoder, coreml_input_name, coreml_output_name = self.coreml_encoder_tuple
-            mel_padded = log_mel_spectrogram(
-                input_segments,
-                n_mels=self.model.dims.n_mels,
-                padding=N_SAMPLES,
-                device="cpu",
-            ).unsqueeze(0)
-            mel = pad_or_trim(mel_padded, N_FRAMES)
+            with METRICS.timer("mel"):
+                mel_padded = log_mel_spectrogram(
+                    input_segments,
+                    n_mels=self.model.dims.n_mels,
+                    padding=N_SAMPLES,
+                    device="cpu",
+                ).unsqueeze(0)
+                mel = pad_or_trim(mel_padded, N_FRAMES)
             content_mel_len = int((mel_padded.shape[2] - mel.shape[2]) / 2)
             mel_np = np.ascontiguousarray(mel.numpy())
             ml_inputs = {coreml_input_name or "mel": mel_np}
-            coreml_outputs = coreml_encoder.predict(ml_inputs)
+            with METRICS.timer("encoder"):
+                coreml_outputs = coreml_encoder.predict(ml_inputs)
             if coreml_output_name and coreml_output_name in coreml_outputs:
                 encoder_feature_np = coreml_outputs[coreml_output_name]
             else:
@@ -422,17 +518,21 @@ class AlignAtt:
                 device=self.device,
             )
         if self.mlx_encoder:
-            mlx_mel_padded = mlx_log_mel_spectrogram(audio=input_segments.detach(), n_mels=self.model.dims.n_mels, padding=N_SAMPLES)
-            mlx_mel = mlx_pad_or_trim(mlx_mel_padded, N_FRAMES, axis=-2)
-            mlx_encoder_feature = self.mlx_encoder.encoder(mlx_mel[None])
-            encoder_feature = torch.as_tensor(mlx_encoder_feature)
+            with METRICS.timer("mel"):
+                mlx_mel_padded = mlx_log_mel_spectrogram(audio=input_segments.detach(), n_mels=self.model.dims.n_mels, padding=N_SAMPLES)
+                mlx_mel = mlx_pad_or_trim(mlx_mel_padded, N_FRAMES, axis=-2)
+            with METRICS.timer("encoder"):
+                mlx_encoder_feature = self.mlx_encoder.encoder(mlx_mel[None])
+                encoder_feature = torch.as_tensor(mlx_encoder_feature)
             content_mel_len = int((mlx_mel_padded.shape[0] - mlx_mel.shape[0])/2)
         elif self.fw_encoder:
             audio_length_seconds = len(input_segments) / 16000   
             content_mel_len = int(audio_length_seconds * 100)//2      
-            mel_padded_2 = self.fw_feature_extractor(waveform=input_segments.numpy(), padding=N_SAMPLES)[None, :]
-            mel = fw_pad_or_trim(mel_padded_2, N_FRAMES, axis=-1)
-            encoder_feature_ctranslate = self.fw_encoder.encode(mel)
+            with METRICS.timer("mel"):
+                mel_padded_2 = self.fw_feature_extractor(waveform=input_segments.numpy(), padding=N_SAMPLES)[None, :]
+                mel = fw_pad_or_trim(mel_padded_2, N_FRAMES, axis=-1)
+            with METRICS.timer("encoder"):
+                encoder_feature_ctranslate = self.fw_encoder.encode(mel)
             if self.device == 'cpu': #it seems that on gpu, passing StorageView to torch.as_tensor fails and wrapping in the array works
                 encoder_feature_ctranslate = np.array(encoder_feature_ctranslate)
             try:
@@ -440,16 +540,18 @@ class AlignAtt:
             except TypeError: # Normally the cpu condition should prevent having exceptions, but just in case:
                 encoder_feature = torch.as_tensor(np.array(encoder_feature_ctranslate), device=self.device)
         else:
-            # mel + padding to 30s
-            mel_padded = log_mel_spectrogram(input_segments, n_mels=self.model.dims.n_mels, padding=N_SAMPLES, 
-                                                device=self.device).unsqueeze(0)
-            # trim to 3000
-            mel = pad_or_trim(mel_padded, N_FRAMES)
+            with METRICS.timer("mel"):
+                # mel + padding to 30s, trimmed to 3000 frames
+                mel = self.mel_cache(self.state.segments, input_segments)
+                if self.cfg.encoder_bucket_s:
+                    mel = mel[:, :, :self._encoder_frames(len(input_segments))]
             # the len of actual audio
-            content_mel_len = int((mel_padded.shape[2] - mel.shape[2])/2)
-            encoder_feature = self.model.encoder(mel)
-        end_encode = time()
-        # print('Encoder duration:', end_encode-beg_encode)
+            content_mel_len = (len(input_segments) // HOP_LENGTH) // 2
+            with METRICS.timer("encoder"):
+                if self.encoder_batcher is not None:
+                    encoder_feature = self.encoder_batcher.encode(mel, owner=id(self))
+                else:
+                    encoder_feature = self.model.encoder(mel)
                 
         if self.cfg.language == "auto" and self.state.detected_language is None and self.state.first_timestamp:
             seconds_since_start = self.segments_len() - self.state.first_timestamp
@@ -503,7 +605,8 @@ class AlignAtt:
                 tokens_for_logits = current_tokens[:, -1:]
 
             # Get logits and cross-attention weights from decoder
-            result = self.logits(tokens_for_logits, encoder_feature, return_cross_attn=True)
+            with METRICS.timer("decoder_step"):
+                result = self.logits(tokens_for_logits, encoder_feature, return_cross_attn=True)
             logits, cross_attns = result
             
             # Accumulate cross-attention from this forward pass
@@ -528,11 +631,12 @@ class AlignAtt:
             logger.debug(f"Decoding completed: {completed}, sum_logprobs: {sum_logprobs.tolist()}, tokens: ")
             self.debug_print_tokens(current_tokens)
 
-            # Process accumulated cross-attention weights for alignment
-            attn_of_alignment_heads = self._process_cross_attention(accumulated_cross_attns, content_mel_len)
+            with METRICS.timer("cross_attention"):
+                # Process accumulated cross-attention weights for alignment
+                attn_of_alignment_heads = self._process_cross_attention(accumulated_cross_attns, content_mel_len)
 
-            # for each beam, the most attended frame is:
-            most_attended_frames = torch.argmax(attn_of_alignment_heads[:, -1, :], dim=-1)
+                # for each beam, the most attended frame is:
+                most_attended_frames = torch.argmax(attn_of_alignment_heads[:, -1, :], dim=-1)
             
             # Calculate absolute timestamps accounting for cumulative offset
             absolute_timestamps = [
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+from time import perf_counter
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from whisperlivekit.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# speculative final passes per outcome, over all sessions of the process
+SPECULATION_COUNTS: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def _speculation_samples() -> List[Tuple[str, str, str, float]]:
+    with _counts_lock:
+        counts = dict(SPECULATION_COUNTS)
+    return [
+        ("whisperlivekit_speculative_final_total", "counter", 'result="confirmed"', counts.get("confirmed", 0)),
+        ("whisperlivekit_speculative_final_total", "counter", 'result="cancelled"', counts.get("cancelled", 0)),
+    ]
+
+
+METRICS.add_collector(_speculation_samples)
+
+
+class SpeculativeFinal:
+    """
+    Final ASR pass of an utterance started before its end is confirmed.
+
+    The VAD confirms the end of speech only after `min_silence_duration_ms`
+    of non-speech. The final pass is started as soon as the speech probability
+    first drops, from an in-memory checkpoint of the transcription state. The audio that
+    arrives meanwhile is held back, since the pass mutates that state on the
+    inference thread. When the silence is confirmed, the final tokens are
+    usually ready already. When speech resumes, the result is discarded, the
+    checkpoint rolled back, and the held audio handed back to be transcribed as if
+    nothing had happened.
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Future] = None
+        self._saved: Any = None
+        self._held: List[Tuple[np.ndarray, float]] = []
+        self._started_at = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None
+
+    def start(self, transcription: Any, run_final: Callable[[], Awaitable[Any]]) -> None:
+        self._saved = transcription.checkpoint()
+        self._held = []
+        self._started_at = perf_counter()
+        self._task = asyncio.ensure_future(run_final())
+
+    def hold(self, pcm_array: np.ndarray, stream_time_end: float) -> None:
+        self._held.append((pcm_array, stream_time_end))
+
+    async def confirm(self) -> Tuple[Any, List[Tuple[np.ndarray, float]]]:
+        """Result of the final pass, and the audio held back since it started."""
+        task, held = self._task, self._held
+        self._clear()
+        with _counts_lock:
+            SPECULATION_COUNTS["confirmed"] += 1
+        return await task, held
+
+    async def cancel(self, transcription: Any) -> List[Tuple[np.ndarray, float]]:
+        """Discard the final pass and roll back to the state it started from. Returns the audio held back."""
+        task, saved, held = self._task, self._saved, self._held
+        self._clear()
+        try:
+            await task
+        except Exception as e:
+            logger.warning(f"Discarded speculative final pass failed: {e}")
+        transcription.rollback(saved)
+        with _counts_lock:
+            SPECULATION_COUNTS["cancelled"] += 1
+        logger.debug(f"Speculative final pass cancelled after {perf_counter() - self._started_at:.2f}s")
+        return held
+
+    def _clear(self) -> None:
+        self._task = None
+        self._saved = None
+        self._held = []
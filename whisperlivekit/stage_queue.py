@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from collections import deque
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from whisperlivekit.metrics import METRICS
+from whisperlivekit.timed_objects import AudioGap
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_POLICIES = ("drop_oldest", "merge", "reject")
+
+
+class QueueOverloadError(Exception):
+    """Raised by a StageQueue with the `reject` policy when its bound is exceeded."""
+
+
+class StageQueue(asyncio.Queue):
+    """
+    Queue between two AudioProcessor stages, bounded in seconds of queued audio.
+
+    Only audio chunks (numpy arrays) count towards the bound and are subject to
+    the overload policy; control items (sentinel, silences, tokens...) are
+    always accepted. When an incoming chunk would push the queued audio above
+    `max_seconds`:
+
+    - drop_oldest: the oldest queued audio is dropped and replaced by an
+      AudioGap of the same duration, so downstream timestamps stay aligned.
+    - merge: the chunk is concatenated onto the queued tail chunk. Nothing is
+      lost, but only the number of queued items is bounded, not the latency.
+    - reject: QueueOverloadError is raised and the caller ends the session.
+
+    `max_seconds <= 0` leaves the queue unbounded.
+
+    When metrics are enabled, the time each item waited in the queue is
+    recorded under the `<name>_queue_wait` stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_seconds: float = 0.0,
+        policy: str = "drop_oldest",
+        sample_rate: int = 16000,
+    ) -> None:
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"policy must be one of {OVERLOAD_POLICIES}, got {policy!r}")
+        super().__init__()
+        self.name = name
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate) if max_seconds and max_seconds > 0 else 0
+
+        self._queued_samples = 0
+        self._wait_stage = f"{name}_queue_wait"
+        self._put_times: deque = deque()
+        self.max_depth = 0
+        self.n_dropped = 0
+        self.dropped_seconds = 0.0
+        self.n_merged = 0
+        self.n_rejected = 0
+
+    # asyncio.Queue storage hooks, also tracking queued audio duration and put times
+    def _put(self, item: Any) -> None:
+        super()._put(item)
+        self._put_times.append(perf_counter())
+        if isinstance(item, np.ndarray):
+            self._queued_samples += len(item)
+
+    def _get(self) -> Any:
+        item = super()._get()
+        put_time = self._put_times.popleft()
+        METRICS.observe(self._wait_stage, perf_counter() - put_time)
+        if isinstance(item, np.ndarray):
+            self._queued_samples -= len(item)
+        return item
+
+    @property
+    def queued_seconds(self) -> float:
+        return self._queued_samples / self.sample_rate
+
+    @property
+    def oldest_wait(self) -> Optional[float]:
+        """Seconds the oldest queued item has been waiting, None if the queue is empty."""
+        return perf_counter() - self._put_times[0] if self._put_times else None
+
+    def put_nowait(self, item: Any) -> None:
+        if (
+            self.max_samples
+            and isinstance(item, np.ndarray)
+            and self._queued_samples + len(item) > self.max_samples
+        ):
+            if self.policy == "reject":
+                self.n_rejected += 1
+                raise QueueOverloadError(
+                    f"{self.name} queue overloaded: {self.queued_seconds:.2f}s of audio already queued "
+                    f"(limit {self.max_samples / self.sample_rate:.2f}s)"
+                )
+            if self.policy == "merge":
+                if self._queue and isinstance(self._queue[-1], np.ndarray):
+                    self._queued_samples += len(item)
+                    self._queue[-1] = np.concatenate([self._queue[-1], item])
+                    self.n_merged += 1
+                    return
+            else:
+                item = self._drop_oldest(item)
+        super().put_nowait(item)
+        self.max_depth = max(self.max_depth, self.qsize())
+
+    def _drop_oldest(self, incoming: np.ndarray) -> np.ndarray:
+        """Make room for `incoming` and return what is left of it to enqueue."""
+        excess = self._queued_samples + len(incoming) - self.max_samples
+        kept = []
+        kept_times = []
+        n_removed = 0
+        for item, put_time in zip(self._queue, self._put_times):
+            if excess > 0 and isinstance(item, np.ndarray):
+                excess -= len(item)
+                self._queued_samples -= len(item)
+                self._record_drop(len(item))
+                if kept and isinstance(kept[-1], AudioGap):
+                    kept[-1].duration += len(item) / self.sample_rate
+                    n_removed += 1
+                else:
+                    kept.append(AudioGap(duration=len(item) / self.sample_rate))
+                    kept_times.append(put_time)
+                continue
+            kept.append(item)
+            kept_times.append(put_time)
+        self._queue.clear()
+        self._queue.extend(kept)
+        self._put_times.clear()
+        self._put_times.extend(kept_times)
+        # dropped chunks are never got, keep join() accounting consistent
+        for _ in range(n_removed):
+            self.task_done()
+
+        if excess > 0:
+            # the incoming chunk alone is longer than the bound: keep its most recent part
+            self._record_drop(excess)
+            gap = excess / self.sample_rate
+            if self._queue and isinstance(self._queue[-1], AudioGap):
+                self._queue[-1].duration += gap
+            else:
+                super().put_nowait(AudioGap(duration=gap))
+            incoming = incoming[excess:]
+        return incoming
+
+    def _record_drop(self, n_samples: int) -> None:
+        self.n_dropped += 1
+        self.dropped_seconds += n_samples / self.sample_rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "queued_seconds": round(self.queued_seconds, 3),
+            "dropped": self.n_dropped,
+            "dropped_seconds": round(self.dropped_seconds, 3),
+            "merged": self.n_merged,
+            "rejected": self.n_rejected,
+        }
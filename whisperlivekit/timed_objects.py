@@ -107,6 +107,16 @@ class Silence():
         return True
 
 
+@dataclass
+class AudioGap(Silence):
+    """
+    Audio dropped by an overloaded stage queue. Processors advance their
+    stream time by its duration so that timestamps stay aligned; the ASR
+    finishes its buffer and resumes after the gap, without inserting samples.
+    """
+    has_ended: bool = True
+
+
 @dataclass
 class Segment(TimedText):
     """Generic contiguous span built from tokens or silence markers."""
@@ -185,12 +195,19 @@ class FrontData():
     buffer_translation: str = ''
     remaining_time_transcription: float = 0.
     remaining_time_diarization: float = 0.
+    effective_chunk_size: float = 0.
+    # leading entries of `lines` that will not change anymore, not sent to the client
+    n_final_lines: int = 0
+
+    def line_dicts(self, start: int = 0) -> List[Dict[str, Any]]:
+        """Serialize the displayed lines among `lines[start:]`."""
+        return [line.to_dict() for line in self.lines[start:] if (line.text or line.speaker == -2)]
     
     def to_dict(self) -> Dict[str, Any]:
         """Serialize the front-end data payload."""
         _dict: Dict[str, Any] = {
             'status': self.status,
-            'lines': [line.to_dict() for line in self.lines if (line.text or line.speaker == -2)],
+            'lines': self.line_dicts(),
             'buffer_transcription': self.buffer_transcription,
             'buffer_diarization': self.buffer_diarization,
             'buffer_translation': self.buffer_translation,
@@ -199,6 +216,8 @@ class FrontData():
         }
         if self.error:
             _dict['error'] = self.error
+        if self.effective_chunk_size:
+            _dict['effective_chunk_size'] = self.effective_chunk_size
         return _dict
 
 @dataclass  
@@ -206,6 +225,11 @@ class ChangeSpeaker:
     speaker: int
     start: int
 
+@dataclass
+class SpeechEndHint:
+    """VAD lookahead: speech probability has dropped (pending) or speech has resumed before the end was confirmed."""
+    pending: bool
+
 @dataclass  
 class State():
     """Unified state class for audio processing.
@@ -1,15 +1,16 @@
 from time import time
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from whisperlivekit.timed_objects import (ASRToken, Segment, PuncSegment, Silence,
                                           SilentSegment, SpeakerSegment,
-                                          TimedText)
+                                          TimedText, Translation)
 
 
 class TokensAlignment:
 
-    def __init__(self, state: Any, args: Any, sep: Optional[str]) -> None:
+    def __init__(self, state: Any, args: Any, sep: Optional[str], clock: Callable[[], float] = time) -> None:
         self.state = state
+        self.clock = clock
         self.diarization = args.diarization
         self._tokens_index: int = 0
         self._diarization_index: int = 0
@@ -28,6 +29,8 @@ class TokensAlignment:
         self.beg_loop: Optional[float] = None
 
         self.validated_segments: List[Segment] = []
+        # leading segments of the last get_lines result that will not change anymore
+        self.n_final_lines: int = 0
         self.current_line_tokens: List[ASRToken] = []
         self.diarization_buffer: List[ASRToken] = []
 
@@ -47,6 +50,25 @@ class TokensAlignment:
         self.all_translation_segments.extend(self.new_translation)
         self.new_translation_buffer = self.state.new_translation_buffer
 
+    def snapshot_state(self) -> dict:
+        """Everything the lines are rebuilt from, for session_snapshot."""
+        return {
+            "all_tokens": list(self.all_tokens),
+            "all_diarization_segments": list(self.all_diarization_segments),
+            # translation segments come from nllw: keep their timing and text only
+            "all_translation_segments": [
+                Translation(start=ts.start, end=ts.end, text=ts.text) for ts in self.all_translation_segments
+            ],
+            "new_translation_buffer": TimedText(text=getattr(self.new_translation_buffer, 'text', '') or ''),
+            "validated_segments": list(self.validated_segments),
+            "current_line_tokens": list(self.current_line_tokens),
+            "unvalidated_tokens": list(self.unvalidated_tokens),
+        }
+
+    def restore_state(self, saved: dict) -> None:
+        for key, value in saved.items():
+            setattr(self, key, value)
+
     def add_translation(self, segment: Segment) -> None:
         """Append translated text segments that overlap with a segment."""
         for ts in self.all_translation_segments:
@@ -180,6 +202,8 @@ class TokensAlignment:
         """Return the formatted segments plus buffers, optionally with diarization/translation."""
         if diarization:
             segments, diarization_buffer = self.get_lines_diarization()
+            # speakers are reassigned while diarization catches up
+            self.n_final_lines = 0
         else:
             diarization_buffer = ''
             for token in self.new_tokens:
@@ -188,7 +212,7 @@ class TokensAlignment:
                         self.validated_segments.append(Segment().from_tokens(self.current_line_tokens))
                         self.current_line_tokens = []
                     
-                    end_silence = token.end if token.has_ended else time() - self.beg_loop
+                    end_silence = token.end if token.has_ended else self.clock() - self.beg_loop
                     if self.validated_segments and self.validated_segments[-1].is_silence():
                         self.validated_segments[-1].end = end_silence
                     else:
@@ -200,11 +224,15 @@ class TokensAlignment:
                     self.current_line_tokens.append(token)
             
             segments = list(self.validated_segments)
+            # a trailing silence keeps growing until the next line starts
+            trailing_silence = bool(segments) and segments[-1].is_silence()
+            # translations are attached to every segment on each call
+            self.n_final_lines = 0 if translation else len(segments) - trailing_silence
             if self.current_line_tokens:
                 segments.append(Segment().from_tokens(self.current_line_tokens))
 
         if current_silence:
-            end_silence = current_silence.end if current_silence.has_ended else time() - self.beg_loop
+            end_silence = current_silence.end if current_silence.has_ended else self.clock() - self.beg_loop
             if segments and segments[-1].is_silence():
                 segments[-1] = SilentSegment(start=segments[-1].start, end=end_silence)
             else:
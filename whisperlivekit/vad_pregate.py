@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from whisperlivekit.metrics import METRICS
+
+# windows per outcome, over all sessions of the process
+PREGATE_COUNTS: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def _pregate_samples() -> List[Tuple[str, str, str, float]]:
+    with _counts_lock:
+        counts = dict(PREGATE_COUNTS)
+    return [
+        ("whisperlivekit_vad_pregate_windows_total", "counter", 'result="skipped"', counts.get("skipped", 0)),
+        ("whisperlivekit_vad_pregate_windows_total", "counter", 'result="evaluated"', counts.get("evaluated", 0)),
+        ("whisperlivekit_vad_pregate_audits_total", "counter", 'result="agree"', counts.get("agree", 0)),
+        ("whisperlivekit_vad_pregate_audits_total", "counter", 'result="disagree"', counts.get("disagree", 0)),
+    ]
+
+
+METRICS.add_collector(_pregate_samples)
+
+
+class EnergyPreGate:
+    """
+    Cheap silence detector run on VAD windows before Silero.
+
+    A window is clearly silent when its energy is below an absolute floor, or
+    when the energy of each speech band (250 Hz - 4 kHz, split in octaves) is
+    within `margin_db` of that band's noise floor. The floor is kept per band,
+    so coloured noise (pink, brown, fan noise) is matched by its own spectral
+    shape, and mains hum below the speech bands is ignored. It follows the band
+    energy down quickly and up slowly, so it tracks line noise without being
+    pulled up by speech.
+
+    One out of `audit_interval` windows judged silent is still given to the
+    model, and the agreement between both is counted, so the skip rate can be
+    weighed against its accuracy on live traffic.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 512,
+        sampling_rate: int = 16000,
+        margin_db: float = 9.0,
+        absolute_floor_db: float = -60.0,
+        band_edges_hz: Tuple[float, ...] = (250, 500, 1000, 2000, 4000),
+        floor_fall_s: float = 0.1,
+        floor_rise_s: float = 10.0,
+        audit_interval: int = 20,
+    ) -> None:
+        self.margin_db = margin_db
+        self.absolute_floor_db = absolute_floor_db
+        window_s = window_size / sampling_rate
+        self.fall_rate = min(1.0, window_s / floor_fall_s)
+        self.rise_rate = min(1.0, window_s / floor_rise_s)
+        self.audit_interval = audit_interval
+        self._hann = np.hanning(window_size).astype(np.float32)
+        # first rfft bin of each band, and the end of the last one
+        self._band_starts = np.searchsorted(np.fft.rfftfreq(window_size, 1 / sampling_rate), band_edges_hz)
+        self.noise_floor_db: Optional[np.ndarray] = None
+        self._silent_since_audit = 0
+        # windows of the last call judged silent but kept for the model, to measure agreement
+        self.audited: List[int] = []
+
+    def silent(self, windows: np.ndarray) -> np.ndarray:
+        """Mask of the clearly silent windows, updating the noise floor. Audited windows are not in it."""
+        energy_db = 10 * np.log10(np.mean(windows * windows, axis=1) + 1e-12)
+        spectrum = np.abs(np.fft.rfft(windows * self._hann, axis=1)) ** 2
+        band_db = 10 * np.log10(np.add.reduceat(spectrum, self._band_starts, axis=1)[:, :-1] + 1e-12)
+
+        silent = np.zeros(len(windows), dtype=bool)
+        self.audited = []
+        for i, bands in enumerate(band_db):
+            if self.noise_floor_db is None:
+                self.noise_floor_db = bands.copy()
+            if energy_db[i] < self.absolute_floor_db or np.all(bands < self.noise_floor_db + self.margin_db):
+                self._silent_since_audit += 1
+                if self.audit_interval and self._silent_since_audit >= self.audit_interval:
+                    self._silent_since_audit = 0
+                    self.audited.append(i)
+                else:
+                    silent[i] = True
+            rate = np.where(bands < self.noise_floor_db, self.fall_rate, self.rise_rate)
+            self.noise_floor_db += rate * (bands - self.noise_floor_db)
+        return silent
+
+    def record(self, n_skipped: int, n_evaluated: int, audit_agreements: List[bool]) -> None:
+        with _counts_lock:
+            PREGATE_COUNTS["skipped"] += n_skipped
+            PREGATE_COUNTS["evaluated"] += n_evaluated
+            PREGATE_COUNTS["agree"] += sum(audit_agreements)
+            PREGATE_COUNTS["disagree"] += len(audit_agreements) - sum(audit_agreements)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from whisperlivekit.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+STATE_SIZE = 128
+
+
+class VADStream:
+    """
+    RNN state of one audio stream evaluated by a VADService.
+
+    Has the model interface FixedVADIterator relies on (`reset_states`, and
+    the `_state` / `_context` attributes saved in session snapshots), so an
+    iterator can wrap a stream instead of the model itself.
+    """
+
+    def __init__(self, service: "VADService") -> None:
+        self.service = service
+        self.reset_states()
+
+    def reset_states(self, batch_size: int = 1) -> None:
+        self._state = torch.zeros((2, 1, STATE_SIZE))
+        self._context = torch.zeros((1, self.service.context_size))
+
+    async def submit(self, windows: np.ndarray) -> List[float]:
+        """Speech probabilities of consecutive windows of this stream, evaluated with the other streams' windows."""
+        return await self.service.submit(self, windows)
+
+
+class VADService:
+    """
+    One Silero VAD model (JIT or ONNX) serving every stream of the process.
+
+    The model keeps its RNN state on itself, so sharing it between sessions
+    would mix their states: each stream instead keeps its own state in a
+    VADStream. The windows submitted by all streams are evaluated by a worker
+    task, one batch per step: step k stacks the k-th pending window of every
+    stream, and their states, along the batch dimension of a single model call.
+    Windows submitted while a batch runs are taken by the next one.
+    """
+
+    def __init__(self, model, sampling_rate: int = 16000) -> None:
+        self.model = model
+        self.sampling_rate = sampling_rate
+        self.context_size = 64 if sampling_rate == 16000 else 32
+        self._pending: List[Tuple[VADStream, np.ndarray, asyncio.Future]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.windows = 0
+        METRICS.add_collector(self.metric_samples)
+
+    def open_stream(self) -> VADStream:
+        return VADStream(self)
+
+    async def submit(self, stream: VADStream, windows: np.ndarray) -> List[float]:
+        if len(windows) == 0:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # first use, or a new event loop (replay runs)
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._pending = []
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        # the caller may reuse its window buffer once we return
+        self._pending.append((stream, windows.copy(), future))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                requests, self._pending = self._pending, []
+                try:
+                    results = await asyncio.to_thread(self._evaluate, requests)
+                except Exception as e:
+                    logger.error(f"VAD batch failed: {e}")
+                    for _, _, future in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, _, future), probs in zip(requests, results):
+                    if not future.done():
+                        future.set_result(probs)
+
+    @torch.no_grad()
+    def _evaluate(self, requests: List[Tuple[VADStream, np.ndarray, asyncio.Future]]) -> List[List[float]]:
+        results: List[List[float]] = [[] for _ in requests]
+        n_steps = max(len(windows) for _, windows, _ in requests)
+        with self._lock:
+            for step in range(n_steps):
+                active = [i for i, (_, windows, _) in enumerate(requests) if len(windows) > step]
+                streams = [requests[i][0] for i in active]
+                x = torch.from_numpy(np.stack([requests[i][1][step] for i in active]))
+                probs, state, context = self._forward(
+                    x,
+                    torch.cat([stream._state for stream in streams], dim=1),
+                    torch.cat([stream._context for stream in streams], dim=0),
+                )
+                for j, (i, stream) in enumerate(zip(active, streams)):
+                    stream._state = state[:, j:j + 1].clone()
+                    stream._context = context[j:j + 1].clone()
+                    results[i].append(probs[j])
+                self.batches += 1
+                self.windows += len(active)
+        return results
+
+    def _forward(self, x: torch.Tensor, state: torch.Tensor, context: torch.Tensor) -> Tuple[List[float], torch.Tensor, torch.Tensor]:
+        # the JIT model and OnnxWrapper both read their state from these attributes,
+        # and keep it when the sample rate and batch size match the last call
+        model = self.model
+        model._state = state
+        model._context = context
+        model._last_sr = self.sampling_rate
+        model._last_batch_size = len(x)
+        with METRICS.timer("vad_batch"):
+            out = model(x, self.sampling_rate)
+        return out.flatten().tolist(), model._state, model._context
+
+    def metric_samples(self) -> List[Tuple[str, str, str, float]]:
+        return [
+            ("whisperlivekit_vad_batches_total", "counter", "", self.batches),
+            ("whisperlivekit_vad_windows_total", "counter", "", self.windows),
+        ]
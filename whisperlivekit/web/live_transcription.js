@@ -23,10 +23,14 @@ let waveCtx = waveCanvas.getContext("2d");
 let animationFrame = null;
 let waitingForStop = false;
 let lastReceivedData = null;
+let transcriptState = null;
+let lastDeltaSeq = null;
 let lastSignature = null;
 let availableMicrophones = [];
 let selectedMicrophoneId = null;
 let serverUseAudioWorklet = null;
+let serverUseOpusPackets = false;
+let opusEncoder = null;
 let configReadyResolve;
 const configReady = new Promise((r) => (configReadyResolve = r));
 let outputAudioContext = null;
@@ -253,6 +257,8 @@ function setupWebSocket() {
       waitingForStop = false;
       userClosing = false;
       lastReceivedData = null;
+      transcriptState = null;
+      lastDeltaSeq = null;
       websocket = null;
       updateUI();
     };
@@ -263,10 +269,13 @@ function setupWebSocket() {
     };
 
     websocket.onmessage = (event) => {
-      const data = JSON.parse(event.data);
+      let data = JSON.parse(event.data);
       if (data.type === "config") {
         serverUseAudioWorklet = !!data.useAudioWorklet;
-        statusText.textContent = serverUseAudioWorklet
+        serverUseOpusPackets = !!data.useOpusPackets;
+        statusText.textContent = serverUseOpusPackets
+          ? "Connected. Using WebCodecs (Opus packets)."
+          : serverUseAudioWorklet
           ? "Connected. Using AudioWorklet (PCM)."
           : "Connected. Using MediaRecorder (WebM).";
         if (configReadyResolve) configReadyResolve();
@@ -297,6 +306,11 @@ function setupWebSocket() {
         return;
       }
 
+      if (data.type === "snapshot" || data.type === "delta") {
+        data = applyTranscriptUpdate(data);
+        if (!data) return;
+      }
+
       lastReceivedData = data;
 
       const {
@@ -323,6 +337,47 @@ function setupWebSocket() {
   });
 }
 
+const DELTA_FIELDS = [
+  "status",
+  "buffer_transcription",
+  "buffer_diarization",
+  "buffer_translation",
+  "remaining_time_transcription",
+  "remaining_time_diarization",
+  "effective_chunk_size",
+];
+
+// Rebuilds the full transcript from the snapshot/delta messages sent with --delta-updates.
+// Returns null while waiting for a snapshot to resync.
+function applyTranscriptUpdate(message) {
+  if (message.type === "snapshot") {
+    transcriptState = { ...message, lines: [...(message.lines || [])] };
+    lastDeltaSeq = message.seq;
+    return transcriptState;
+  }
+  if (!transcriptState || message.seq !== lastDeltaSeq + 1) {
+    // ask once for a snapshot: final lines are not sent again otherwise
+    if (transcriptState !== null || lastDeltaSeq !== -1) {
+      lastDeltaSeq = -1;
+      if (websocket && websocket.readyState === WebSocket.OPEN) {
+        websocket.send(JSON.stringify({ type: "resync" }));
+      }
+    }
+    transcriptState = null;
+    return null;
+  }
+  lastDeltaSeq = message.seq;
+  transcriptState.lines.length = message.n_lines;
+  for (const { id, ...line } of message.lines || []) {
+    transcriptState.lines[id] = line;
+  }
+  for (const key of DELTA_FIELDS) {
+    if (key in message) transcriptState[key] = message[key];
+  }
+  transcriptState.error = message.error;
+  return transcriptState;
+}
+
 function renderLinesWithBuffer(
   lines,
   buffer_diarization,
@@ -551,13 +606,58 @@ async function startRecording() {
       stream = await navigator.mediaDevices.getUserMedia(audioConstraints);
     }
 
-    audioContext = new (window.AudioContext || window.webkitAudioContext)();
+    // Opus encodes 48 kHz natively
+    audioContext = new (window.AudioContext || window.webkitAudioContext)(
+      serverUseOpusPackets ? { sampleRate: 48000 } : undefined
+    );
     analyser = audioContext.createAnalyser();
     analyser.fftSize = 256;
     microphone = audioContext.createMediaStreamSource(stream);
     microphone.connect(analyser);
 
-    if (serverUseAudioWorklet) {
+    if (serverUseOpusPackets) {
+      if (!audioContext.audioWorklet || typeof AudioEncoder === "undefined") {
+        throw new Error("AudioWorklet and WebCodecs are required to send Opus packets");
+      }
+      await audioContext.audioWorklet.addModule("/web/pcm_worklet.js");
+      workletNode = new AudioWorkletNode(audioContext, "pcm-forwarder", { numberOfInputs: 1, numberOfOutputs: 0, channelCount: 1 });
+      microphone.connect(workletNode);
+
+      opusEncoder = new AudioEncoder({
+        output: (chunk) => {
+          if (websocket && websocket.readyState === WebSocket.OPEN) {
+            // each packet is prefixed with its length as a big-endian uint16
+            const message = new Uint8Array(2 + chunk.byteLength);
+            new DataView(message.buffer).setUint16(0, chunk.byteLength, false);
+            chunk.copyTo(message.subarray(2));
+            websocket.send(message.buffer);
+          }
+        },
+        error: (e) => console.error("Opus encoder error:", e),
+      });
+      opusEncoder.configure({
+        codec: "opus",
+        sampleRate: audioContext.sampleRate,
+        numberOfChannels: 1,
+        bitrate: 24000,
+      });
+
+      let timestamp = 0;
+      workletNode.port.onmessage = (e) => {
+        const samples = e.data instanceof Float32Array ? e.data : new Float32Array(e.data);
+        const audioData = new AudioData({
+          format: "f32-planar",
+          sampleRate: audioContext.sampleRate,
+          numberOfFrames: samples.length,
+          numberOfChannels: 1,
+          timestamp,
+          data: samples,
+        });
+        timestamp += (samples.length * 1e6) / audioContext.sampleRate;
+        opusEncoder.encode(audioData);
+        audioData.close();
+      };
+    } else if (serverUseAudioWorklet) {
       if (!audioContext.audioWorklet) {
         throw new Error("AudioWorklet is not supported in this browser");
       }
@@ -636,6 +736,18 @@ async function stopRecording() {
   userClosing = true;
   waitingForStop = true;
 
+  if (opusEncoder) {
+    if (workletNode) {
+      workletNode.port.onmessage = null;
+    }
+    try {
+      // send the last packets before the end-of-stream message
+      await opusEncoder.flush();
+      opusEncoder.close();
+    } catch (e) {}
+    opusEncoder = null;
+  }
+
   if (websocket && websocket.readyState === WebSocket.OPEN) {
     const emptyBlob = new Blob([], { type: "audio/webm" });
     websocket.send(emptyBlob);